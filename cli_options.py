@@ -0,0 +1,163 @@
+"""
+Shared command-line handling for the pipeline scripts.
+
+Every value a script used to prompt for can be given as a flag or in a job
+spec (--job-spec), a JSON or YAML mapping of option names to values:
+
+    network: beta
+    allocation_csv: NodeAllocation.csv
+    revshare_pct: 60
+    generate_supplier_config:      # options for one script only
+      operators_csv: operators.csv
+
+Top-level keys apply to every script that has that option, so one spec can
+drive the whole pipeline; a section named after the script applies to that
+script only. Flags on the command line win over the job spec. Values given
+neither way are still prompted for, unless --yes makes the run
+non-interactive.
+"""
+
+import argparse
+import os
+import sys
+from typing import Any, Callable, Optional
+
+import metrics
+import profiling
+
+
+def add_common_args(parser: argparse.ArgumentParser, network: bool = True) -> None:
+    """Add --job-spec, --yes, --metrics-dir and --profile (and --network unless `network` is False) to a script's parser."""
+    parser.add_argument('--job-spec',
+                        help="JSON or YAML file with option values (command-line flags take precedence)")
+    parser.add_argument('--yes', '-y', action='store_true',
+                        help="Run non-interactively: assume yes for confirmations and fail instead of "
+                             "prompting for missing values")
+    parser.add_argument('--metrics-dir', default=os.getenv('METRICS_DIR'),
+                        help="Write a Prometheus textfile and a JSON trace of stage timings here at exit "
+                             "(default: METRICS_DIR, off when unset)")
+    parser.add_argument('--profile', nargs='?', const='profiles', metavar='DIR',
+                        help="Profile the run per stage and write a hot-function report and collapsed stacks "
+                             "to DIR at exit (default DIR: profiles)")
+    if network:
+        parser.add_argument('--network',
+                            help="Network to use (alpha, beta, main); overrides NETWORK from the environment/.env")
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1 (workers, chunk sizes)."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def load_job_spec(path: str, script: str):
+    """Return (shared, script_options): the spec's top-level values and `script`'s own section."""
+    # Imported here so scripts that never see a job spec don't pay for yaml at startup
+    import yaml_io
+    try:
+        spec = yaml_io.load_yaml_file(path) or {}
+    except yaml_io.yaml.YAMLError as e:
+        raise ValueError(e)
+    if not isinstance(spec, dict):
+        raise ValueError(f"job spec {path} must be a mapping of option names to values")
+
+    def normalize(options):
+        # YAML 1.1 reads a bare `yes:` key as the boolean True
+        return {('yes' if key is True else str(key)).replace('-', '_'): value for key, value in options.items()}
+
+    shared = {key: value for key, value in spec.items() if not isinstance(value, dict)}
+    return normalize(shared), normalize(spec.get(script) or {})
+
+
+def check_spec_value(action: argparse.Action, value: Any) -> Any:
+    """Convert and check a job spec value like argparse would the flag's argument.
+
+    argparse applies neither `type` nor `choices` to defaults, so spec values
+    are run through them here. Raises ValueError for a value the flag would
+    reject.
+    """
+    name = action.dest
+    if action.nargs == 0:
+        # store_true / store_false flags
+        if not isinstance(value, bool):
+            raise ValueError(f"'{name}' must be true or false, got {value!r}")
+        return value
+    if action.type is not None:
+        if isinstance(value, (bool, list, dict)):
+            raise ValueError(f"'{name}' must be a single value, got {value!r}")
+        try:
+            # Through str() so e.g. 1.5 is rejected by an int option rather than truncated
+            value = action.type(str(value))
+        except (TypeError, ValueError, argparse.ArgumentTypeError):
+            raise ValueError(f"'{name}' has an invalid value {value!r}")
+    if action.choices is not None and value not in action.choices:
+        raise ValueError(f"'{name}' must be one of {', '.join(map(str, action.choices))}, got {value!r}")
+    return value
+
+
+def parse_args(parser: argparse.ArgumentParser, script: str, argv=None) -> argparse.Namespace:
+    """Parse arguments, using values from --job-spec as defaults for the flags.
+
+    Turns on metrics collection when --metrics-dir is set and profiling when
+    --profile is.
+    """
+    pre_args, _ = parser.parse_known_args(argv)
+    if pre_args.job_spec:
+        try:
+            shared, script_options = load_job_spec(pre_args.job_spec, script)
+        except (OSError, ValueError) as e:
+            parser.error(f"could not read job spec: {e}")
+        known = {action.dest for action in parser._actions} - {'help', 'job_spec'}
+        unknown = sorted(set(script_options) - known)
+        if unknown:
+            parser.error(f"unknown option(s) in the {script} section of {pre_args.job_spec}: {', '.join(unknown)}")
+        # Shared values are only applied where the script has a matching option
+        defaults = {key: value for key, value in shared.items() if key in known}
+        defaults.update(script_options)
+        actions = {action.dest: action for action in parser._actions}
+        try:
+            defaults = {key: check_spec_value(actions[key], value) for key, value in defaults.items()}
+        except ValueError as e:
+            parser.error(f"invalid value in {pre_args.job_spec}: {e}")
+        parser.set_defaults(**defaults)
+    args = parser.parse_args(argv)
+    if args.metrics_dir:
+        metrics.enable(script, args.metrics_dir)
+    if args.profile:
+        profiling.enable(script, args.profile)
+    return args
+
+
+def resolve_network(args: argparse.Namespace) -> Optional[str]:
+    """Return the network from --network, the job spec or NETWORK (.env is loaded if present).
+
+    The choice is exported as NETWORK so helpers that read the environment agree.
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
+    network = getattr(args, 'network', None) or os.getenv('NETWORK')
+    if network:
+        os.environ['NETWORK'] = network
+    return network
+
+
+def ask(args: argparse.Namespace, name: str, prompt: str, convert: Callable[[str], Any] = str) -> Any:
+    """Return option `name`, prompting for it when it was neither passed nor in the job spec.
+
+    With --yes a missing value is an error instead of a prompt.
+    """
+    value = getattr(args, name, None)
+    if value is not None:
+        return convert(value)
+    flag = '--' + name.replace('_', '-')
+    if args.yes:
+        print(f"Error: {flag} is required with --yes (or set '{name}' in the job spec)")
+        sys.exit(1)
+    try:
+        return convert(input(prompt))
+    except EOFError:
+        print(f"\nError: no value for {flag}; pass it as a flag or in the job spec")
+        sys.exit(1)
+
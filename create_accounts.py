@@ -1,13 +1,64 @@
+import argparse
 import csv
 from pathlib import Path
 from cosmpy.aerial.wallet import LocalWallet
-from cosmpy.aerial.client import LedgerClient, NetworkConfig
 from mnemonic import Mnemonic
-import json
 
-def generate_pocket_accounts(num_accounts, customer_prefix):
+import cli_options
+import profiling
+
+FIELDNAMES = ["customer_id", "operator_address", "mnemonic", "owner_address", "revshare_address", "publicly_exposed_url", "stake_amount"]
+
+# Accounts derived per worker task in parallel mode
+DEFAULT_CHUNK_SIZE = 100
+
+# Loading the BIP39 wordlist is not free, so each process builds it once
+_mnemonic = None
+
+def _wordlist():
+    global _mnemonic
+    if _mnemonic is None:
+        _mnemonic = Mnemonic("english")
+    return _mnemonic
+
+def _create_account(index, customer_prefix):
+    """Generate a mnemonic and derive its address. Returns the CSV row, or None on failure."""
+    try:
+        # Generate a new mnemonic
+        mnemonic = _wordlist().generate(256)
+        
+        # Create wallet from mnemonic
+        wallet = LocalWallet.from_mnemonic(mnemonic, "pokt")
+        
+        # Get account details
+        address = str(wallet.address())
+        
+        print(f"Account created with address: {address}")
+        
+        return {
+            "customer_id": f"{customer_prefix}_{index}",
+            "operator_address": address,
+            "mnemonic": mnemonic
+        }
+    except Exception as e:
+        print(f"Error during account creation: {e}")
+        return None
+
+def _create_chunk(task):
+    """Create the accounts with indexes [start, stop). Runs in a worker process in parallel mode."""
+    start, stop, customer_prefix = task
+    return [_create_account(i, customer_prefix) for i in range(start, stop)]
+
+def generate_pocket_accounts(num_accounts, customer_prefix, workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+                             output_file="pocket_accounts.csv"):
+    """Create `num_accounts` accounts and write them to `output_file` (pocket_accounts.csv).
+
+    With `workers` > 1, key derivation (PBKDF2 seed stretching and
+    secp256k1) runs in a process pool in chunks of `chunk_size` accounts.
+    Rows are written as each chunk finishes, in index order either way.
+    """
     # Resolve output file path to ~/pocket_accounts.csv
-    output_path = Path("pocket_accounts.csv").expanduser()
+    output_path = Path(output_file).expanduser()
     
     # Configure the network (using Pocket Network testnet)
     # network = NetworkConfig(
@@ -21,44 +72,58 @@ def generate_pocket_accounts(num_accounts, customer_prefix):
     # # Initialize the client
     # client = LedgerClient(network)
     
-    accounts = []
-    for i in range(num_accounts):
-        try:
-            print(f"Creating account {i + 1}/{num_accounts}...")
-            
-            # Generate a new mnemonic
-            mnemonic = Mnemonic("english").generate(256)
-            
-            # Create wallet from mnemonic
-            wallet = LocalWallet.from_mnemonic(mnemonic, "pokt")
-            
-            # Get account details
-            address = wallet.address()
-            
-            print(f"Account created with address: {address}")
-            
-            # Add the account details to the list
-            accounts.append({
-                "customer_id": f"{customer_prefix}_{i}",
-                "operator_address": address,
-                "mnemonic": mnemonic
-            })
-            
-        except Exception as e:
-            print(f"Error during account creation: {e}")
-            continue
+    tasks = [(start, min(start + chunk_size, num_accounts), customer_prefix)
+             for start in range(0, num_accounts, chunk_size)]
     
-    # Write the accounts to a CSV file
+    created = 0
     with open(output_path, mode="w", newline="") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=["customer_id", "operator_address", "mnemonic", "owner_address", "revshare_address", "publicly_exposed_url", "stake_amount"])
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
         writer.writeheader()
-        writer.writerows(accounts)
+        
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=workers)
+            chunks = executor.map(_create_chunk, tasks)
+        else:
+            executor = None
+            chunks = map(_create_chunk, tasks)
+        
+        try:
+            # map() yields chunks in submission order, so the file stays ordered by index
+            for (start, stop, _), rows in zip(tasks, chunks):
+                rows = [row for row in rows if row is not None]
+                writer.writerows(rows)
+                csvfile.flush()
+                created += len(rows)
+                print(f"Created accounts {start + 1}-{stop} of {num_accounts}")
+        finally:
+            if executor is not None:
+                executor.shutdown()
     
-    print(f"Accounts successfully generated and saved to {output_path}")
+    print(f"{created} accounts successfully generated and saved to {output_path}")
 
-# Inputs
-number_of_accounts = int(input("Enter the number of accounts to create: "))
-customer_prefix = input("Enter a prefix for customer_id: ")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate operator accounts into pocket_accounts.csv.")
+    parser.add_argument('--workers', type=cli_options.positive_int, default=1,
+                        help="Derive keys in this many processes (default: 1, serial)")
+    parser.add_argument('--chunk-size', type=cli_options.positive_int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Accounts per worker task in parallel mode (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument('--num-accounts', type=int,
+                        help="Number of accounts to create (prompted for if omitted)")
+    parser.add_argument('--customer-prefix',
+                        help="Prefix for the generated customer_id values (prompted for if omitted)")
+    parser.add_argument('--output', default="pocket_accounts.csv",
+                        help="CSV file to write the accounts to (default: pocket_accounts.csv)")
+    cli_options.add_common_args(parser, network=False)
+    return cli_options.parse_args(parser, 'create_accounts')
 
-# Run the function
-generate_pocket_accounts(number_of_accounts, customer_prefix)
\ No newline at end of file
+if __name__ == "__main__":
+    args = parse_args()
+    
+    # Inputs
+    number_of_accounts = cli_options.ask(args, 'num_accounts', "Enter the number of accounts to create: ", int)
+    customer_prefix = cli_options.ask(args, 'customer_prefix', "Enter a prefix for customer_id: ")
+    
+    # Run the function
+    with profiling.stage('derive_accounts'):
+        generate_pocket_accounts(number_of_accounts, customer_prefix, args.workers, args.chunk_size, args.output)
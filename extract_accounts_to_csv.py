@@ -1,61 +1,111 @@
+import argparse
 import json
 import csv
-from typing import List, Dict
+import os
+from typing import Dict, Iterable, Iterator, List
+
+import cli_options
+import profiling
+
+# ijson walks the export incrementally (with its C yajl2 backend when built);
+# without it the whole file is parsed with json.load
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+FIELDNAMES = ['shannon_address', 'shannon_private_key', 'morse_node_address']
+
+JSON_ERRORS = (json.JSONDecodeError,) + ((ijson.JSONError,) if ijson else ())
 
 def read_json_file(file_path: str) -> Dict:
     """Read and parse the JSON file."""
     with open(file_path, 'r') as file:
         return json.load(file)
 
-def extract_account_data(data: Dict) -> List[Dict]:
-    """Extract required fields from the JSON data."""
-    extracted_data = []
-    
-    for mapping in data.get('mappings', []):
+def iter_mappings(file_path: str) -> Iterator[Dict]:
+    """Yield the entries of the export's `mappings` array one at a time.
+
+    With ijson installed only one mapping is held in memory at a time;
+    otherwise this falls back to loading the whole file.
+    """
+    if ijson is None:
+        yield from read_json_file(file_path).get('mappings', [])
+        return
+    with open(file_path, 'rb') as file:
+        yield from ijson.items(file, 'mappings.item')
+
+def extract_account_rows(mappings: Iterable[Dict]) -> Iterator[Dict]:
+    """Yield the CSV row for each mapping that has a shannon account and a migration message."""
+    for mapping in mappings:
         if 'shannon' in mapping and 'migration_msg' in mapping:
-            account_data = {
+            yield {
                 'shannon_address': mapping['shannon']['address'],
                 'shannon_private_key': mapping['shannon']['private_key'],
                 'morse_node_address': mapping['migration_msg']['morse_node_address']
             }
-            extracted_data.append(account_data)
-    
-    return extracted_data
 
-def write_to_csv(data: List[Dict], output_file: str):
-    """Write the extracted data to a CSV file."""
-    if not data:
+def extract_account_data(data: Dict) -> List[Dict]:
+    """Extract required fields from the JSON data."""
+    return list(extract_account_rows(data.get('mappings', [])))
+
+def write_to_csv(data: Iterable[Dict], output_file: str) -> int:
+    """Write the extracted rows to a CSV file as they arrive. Returns the number of rows written.
+
+    Rows go to a temporary file that replaces `output_file` only once the
+    input has been read completely, so a malformed export never leaves a
+    truncated CSV behind.
+    """
+    rows = iter(data)
+    first = next(rows, None)
+    if first is None:
         print("No data to write to CSV")
-        return
+        return 0
 
-    fieldnames = ['shannon_address', 'shannon_private_key', 'morse_node_address']
-    
-    with open(output_file, 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(data)
+    count = 0
+    tmp_file = f"{output_file}.tmp"
+    try:
+        with open(tmp_file, 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerow(first)
+            count += 1
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+    except BaseException:
+        os.remove(tmp_file)
+        raise
+    os.replace(tmp_file, output_file)
+    return count
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract shannon accounts from a migration export into a CSV.")
+    parser.add_argument('--input-file',
+                        help="JSON file of migration exported customer accounts (prompted for if omitted)")
+    parser.add_argument('--output-file', default='extracted_accounts.csv',
+                        help="CSV file to write (default: extracted_accounts.csv)")
+    cli_options.add_common_args(parser, network=False)
+    return cli_options.parse_args(parser, 'extract_accounts_to_csv')
 
 def main():
-    input_file = input("Enter JSON File name of migration exported customer accounts: ")
-    output_file = 'extracted_accounts.csv'
-    
+    args = parse_args()
+    input_file = cli_options.ask(args, 'input_file', "Enter JSON File name of migration exported customer accounts: ")
+    output_file = args.output_file
+
     try:
-        # Read JSON data
-        json_data = read_json_file(input_file)
-        
-        # Extract required fields
-        account_data = extract_account_data(json_data)
-        
-        # Write to CSV
-        write_to_csv(account_data, output_file)
-        print(f"Successfully wrote data to {output_file}")
-        
+        # Stream mappings from the JSON export, extract the required fields and write them to CSV
+        with profiling.stage('extract'):
+            count = write_to_csv(extract_account_rows(iter_mappings(input_file)), output_file)
+        if count:
+            print(f"Successfully wrote {count} accounts to {output_file}")
+
     except FileNotFoundError:
         print(f"Error: Could not find input file {input_file}")
-    except json.JSONDecodeError:
+    except JSON_ERRORS:
         print(f"Error: Invalid JSON format in {input_file}")
     except Exception as e:
         print(f"An error occurred: {str(e)}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,13 +1,20 @@
 #!/usr/bin/env python3
 
+import argparse
 import csv
 import sys
 import time
 import os
-import subprocess
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
+import cli_options
+import profiling
+from job_journal import FAILED, STARTED, SUCCEEDED, JobJournal, default_journal_path
+from pocketd_cli import broadcast_result, run_pocketd, sequence_flags
+from sequence_manager import SequenceAllocator, rest_account_query, submit_ordered
+
 def read_addresses(csv_filename: str) -> List[Tuple[str, str]]:
     """Read owner and operator addresses from CSV file."""
     addresses = []
@@ -26,17 +33,8 @@ def read_addresses(csv_filename: str) -> List[Tuple[str, str]]:
         sys.exit(1)
     return addresses
 
-def send_funds(owner_address: str, operator_address: str, amount: int) -> None:
-    """Execute the pocketd send command."""
-    load_dotenv()
-    network = os.getenv('NETWORK')
-    amount = int(amount) * 1000000
-    
-    cmd = [
-        'pocketd', 'tx', 'bank', 'send',
-        owner_address,
-        operator_address,
-        f"{amount}upokt",
+def _tx_flags(owner_address: str, network: str, lease=None) -> List[str]:
+    return [
         f"--from={owner_address}",
         '--gas=auto',
         '--gas-prices=1upokt',
@@ -44,24 +42,139 @@ def send_funds(owner_address: str, operator_address: str, amount: int) -> None:
         '--yes',
         f"--network={network}",
         '--keyring-backend=test',
-        "--unordered",
-        "--timeout-duration=1m"
-    ]
+    ] + sequence_flags(lease)
+
+def _broadcast(args: List[str], description: str) -> Dict[str, Any]:
+    """Run a pocketd tx command and return a result dict with success flag, tx hash and error."""
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        print(result.stdout)
-        
-        if result.returncode == 0:
-            print(f"Successfully sent {amount} upokt from {owner_address} to {operator_address}")
+        process = run_pocketd(args)
+        print(process.stdout)
+        result = broadcast_result(process)
+        if result['success']:
+            print(f"Successfully sent {description}")
         else:
-            print(f"Error sending funds from {owner_address} to {operator_address}:")
-            print(result.stderr)
+            print(f"Error sending {description}: {result['error']}")
         # time.sleep(30)
     except Exception as e:
         print(f"Error executing command: {e}")
+        result = {'success': False, 'tx_hash': None, 'error': str(e)}
+    return result
+
+def _pocketd_send(args: List[str], owner_address: str, network: str, description: str,
+                  allocator: SequenceAllocator = None, on_broadcast: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """Broadcast with --unordered, or with sequences handed out by `allocator` when given.
+
+    `on_broadcast` is called right before each pocketd broadcast attempt.
+    """
+    def broadcast(lease=None):
+        if on_broadcast is not None:
+            on_broadcast()
+        return _broadcast(args + _tx_flags(owner_address, network, lease), description)
+    
+    if allocator is None:
+        return broadcast()
+    return submit_ordered(allocator, owner_address, broadcast)
+
+def _backend_send(backend, owner_address: str, operator_addresses: List[str], amount: int, description: str,
+                  on_broadcast: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """Send through an in-process backend, reporting like _broadcast."""
+    if on_broadcast is not None:
+        on_broadcast()
+    result = backend.send(owner_address, operator_addresses, amount)
+    if result['success']:
+        print(f"Successfully sent {description} (tx: {result['tx_hash']})")
+    else:
+        print(f"Error sending {description}: {result['error']}")
+    return result
+
+def send_funds(owner_address: str, operator_address: str, amount: int, network: str = None,
+               backend=None, allocator: SequenceAllocator = None,
+               on_broadcast: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """Execute the pocketd send command, or send in-process when `backend` is given.
+
+    `on_broadcast` is called right before the tx is broadcast. Returns a
+    result dict with the success flag, tx hash and error message.
+    """
+    if network is None:
+        load_dotenv()
+        network = os.getenv('NETWORK')
+    amount = int(amount) * 1000000
+    description = f"{amount} upokt from {owner_address} to {operator_address}"
+    if backend is not None:
+        return _backend_send(backend, owner_address, [operator_address], amount, description, on_broadcast)
+    
+    args = ['tx', 'bank', 'send', owner_address, operator_address, f"{amount}upokt"]
+    return _pocketd_send(args, owner_address, network, description, allocator, on_broadcast)
+
+def send_funds_batch(owner_address: str, operator_addresses: List[str], amount: int, network: str,
+                     backend=None, allocator: SequenceAllocator = None,
+                     on_broadcast: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """Send `amount` POKT to each operator in one MsgMultiSend transaction.
+
+    Returns a result dict with the success flag, tx hash and error message,
+    shared by every transfer in the batch.
+    """
+    amount = int(amount) * 1000000
+    description = f"{amount} upokt from {owner_address} to each of {len(operator_addresses)} operators"
+    if backend is not None:
+        return _backend_send(backend, owner_address, list(operator_addresses), amount, description, on_broadcast)
+    args = ['tx', 'bank', 'multi-send', owner_address] + list(operator_addresses) + [f"{amount}upokt"]
+    return _pocketd_send(args, owner_address, network, description, allocator, on_broadcast)
+
+def chunk_transfers(addresses: List[Tuple[str, str]], batch_size: int) -> List[Tuple[str, List[str]]]:
+    """Group transfers by owner (first-seen order) and split each group into chunks of `batch_size`."""
+    by_owner = {}
+    for owner_address, operator_address in addresses:
+        by_owner.setdefault(owner_address, []).append(operator_address)
+    
+    chunks = []
+    for owner_address, operators in by_owner.items():
+        for start in range(0, len(operators), batch_size):
+            chunks.append((owner_address, operators[start:start + batch_size]))
+    return chunks
+
+def journal_item(owner_address: str, operator_address: str, amount: int) -> str:
+    """Journal key for a transfer: sender, recipient and amount in POKT."""
+    return f"{owner_address}:{operator_address}:{amount}"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fund operator wallets from their owner accounts.")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip transfers the journal records as already sent")
+    parser.add_argument('--retry-in-flight', action='store_true',
+                        help="With --resume, also retry transfers that were in flight when the previous run stopped "
+                             "(check their tx first: retrying may send funds twice)")
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help="Send to up to this many operators of the same owner in one multi-send tx "
+                             "(default: 1, one bank send per operator)")
+    parser.add_argument('--ordered', action='store_true',
+                        help="Sign with locally allocated account sequences instead of --unordered, so several txs "
+                             "per owner can be in flight (pocketd backend)")
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help="Number of transfer txs to keep in flight at once (default: 1)")
+    parser.add_argument('--backend', choices=['pocketd', 'cosmpy'], default='pocketd',
+                        help="Submit txs via pocketd subprocesses (default) or sign and broadcast in-process with cosmpy")
+    parser.add_argument('--keys-csv',
+                        help="CSV with owner_address_mnemonic (or mnemonic/shannon_private_key) columns for the "
+                             "cosmpy backend (default: the wallets CSV)")
+    parser.add_argument('--journal', default=default_journal_path('fund_operator_wallets'),
+                        help="Path of the JSONL progress journal")
+    parser.add_argument('--wallets-csv',
+                        help="CSV with owner_address and operator_address columns (prompted for if omitted)")
+    parser.add_argument('--amount', type=int,
+                        help="Amount of POKT to send to each operator (prompted for if omitted)")
+    cli_options.add_common_args(parser)
+    return cli_options.parse_args(parser, 'fund_operator_wallets')
 
 def main():
-    csv_filename = input("Enter filename to read wallets from (Case-Sensitive): ")
+    args = parse_args()
+    
+    network = cli_options.resolve_network(args)
+    if not network:
+        print("Error: NETWORK environment variable must be set in .env file (or pass --network)")
+        sys.exit(1)
+    
+    csv_filename = cli_options.ask(args, 'wallets_csv', "Enter filename to read wallets from (Case-Sensitive): ")
     # csv_filename = sys.argv[1]
     addresses = read_addresses(csv_filename)
     
@@ -69,10 +182,14 @@ def main():
         print("No addresses found in the CSV file.")
         sys.exit(1)
 
+    if args.amount is not None and args.amount <= 0:
+        print("Amount must be greater than 0")
+        sys.exit(1)
+    
     # Get funding amount from user
     while True:
         try:
-            amount = input("Enter the amount of POKT to send to each operator: ")
+            amount = str(cli_options.ask(args, 'amount', "Enter the amount of POKT to send to each operator: "))
             # Validate that amount is a positive number
             amount_float = int(amount)
             if amount_float <= 0:
@@ -82,11 +199,64 @@ def main():
         except ValueError:
             print("Please enter a valid number")
 
+    journal = JobJournal(args.journal)
+    if args.resume:
+        entries = journal.entries()
+        skip_states = {SUCCEEDED} if args.retry_in_flight else {SUCCEEDED, STARTED}
+        remaining = []
+        for owner_address, operator_address in addresses:
+            entry = entries.get(journal_item(owner_address, operator_address, amount))
+            if entry and entry['state'] in skip_states:
+                if entry['state'] == STARTED:
+                    print(f"Warning: transfer to {operator_address} was in flight when the previous run stopped; "
+                          f"skipping it (verify on-chain, then use --retry-in-flight)")
+                continue
+            remaining.append((owner_address, operator_address))
+        print(f"Resuming: {len(addresses) - len(remaining)} transfer(s) skipped, {len(remaining)} remaining")
+        addresses = remaining
+    
+    backend = None
+    if args.backend == 'cosmpy':
+        from tx_backend import create_backend
+        backend = create_backend(network, args.keys_csv or csv_filename)
+    
+    allocator = None
+    if args.ordered and backend is None:
+        allocator = SequenceAllocator(rest_account_query(network))
+    
     print(f"\nSending {amount} upokt to {len(addresses)} operators...")
     
-    for owner_address, operator_address in addresses:
-        print(f"\nProcessing transfer from {owner_address} to {operator_address}")
-        send_funds(owner_address, operator_address, amount)
+    def fund_chunk(chunk):
+        owner_address, operators = chunk
+        items = [journal_item(owner_address, operator_address, amount) for operator_address in operators]
+        
+        # Marked in flight only once a broadcast is about to happen, so a failure
+        # before that is a plain FAILED that --resume retries
+        def mark_started():
+            for item in items:
+                journal.record(item, STARTED)
+        
+        try:
+            if args.batch_size > 1:
+                print(f"\nProcessing multi-send from {owner_address} to {len(operators)} operators")
+                result = send_funds_batch(owner_address, operators, amount, network, backend, allocator, mark_started)
+            else:
+                print(f"\nProcessing transfer from {owner_address} to {operators[0]}")
+                result = send_funds(owner_address, operators[0], amount, network, backend, allocator, mark_started)
+        except Exception as e:
+            print(f"Error funding operators of {owner_address}: {e}")
+            result = {'success': False, 'tx_hash': None, 'error': str(e)}
+        for item in items:
+            journal.record(item, SUCCEEDED if result['success'] else FAILED,
+                           tx_hash=result['tx_hash'], error=result['error'])
+    
+    if args.batch_size > 1:
+        chunks = chunk_transfers(addresses, args.batch_size)
+    else:
+        chunks = [(owner_address, [operator_address]) for owner_address, operator_address in addresses]
+    with profiling.stage('submit'):
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+            list(executor.map(fund_chunk, chunks))
 
 if __name__ == "__main__":
     main()
@@ -1,119 +1,270 @@
+import argparse
+import csv
 import os
+import re
 import sys
-import pandas as pd
-import yaml
 import requests
-import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cli_options
+import metrics
+import profiling
+from output_manifest import OutputManifest, hash_inputs
+from pokt_api import get_client
+from rate_limiter import TokenBucket
+from service_merge import DEFAULT_MERGE_POLICY, MERGE_POLICIES, merge_services
+from supplier_cache import SupplierCache
+from yaml_io import write_yaml_files
+
+# Defaults for concurrent supplier fetching (overridable via environment)
+DEFAULT_FETCH_CONCURRENCY = 8
+DEFAULT_FETCH_RATE = 5.0
+# Switch to the paginated supplier listing at this many uncached addresses
+DEFAULT_BULK_THRESHOLD = 100
+DEFAULT_PAGE_SIZE = 500
+
+# Morse chain IDs appear in the allocation sheet as e.g. 'Avalanche (F003)'
+MORSE_CHAIN_ID_PATTERN = r'\(([A-F0-9]{4})\)'
+_MORSE_CHAIN_ID_RE = re.compile(MORSE_CHAIN_ID_PATTERN)
 
 def load_service_mapping():
 	"""Load the Morse to Shannon service ID mapping."""
 	try:
-		mapping_df = pd.read_csv('morse_to_shannon_service_mapping.csv')
-		# Create a dictionary mapping Morse Chain IDs to Shannon Service IDs
-		return dict(zip(mapping_df['Morse_Chain_Id'], mapping_df['Shannon_Service_id']))
+		with open('morse_to_shannon_service_mapping.csv', 'r', newline='') as f:
+			# Create a dictionary mapping Morse Chain IDs to Shannon Service IDs
+			return {row['Morse_Chain_Id']: row['Shannon_Service_id'] for row in csv.DictReader(f)
+					if row['Shannon_Service_id']}
 	except Exception as e:
 		print(f"Error loading service mapping: {e}")
 		return {}
 
-def fetch_supplier_info(operator_address):
-	network = os.getenv('NETWORK')
-	"""Fetch supplier information from the API using operator address."""
-	base_url = f"https://shannon-testnet-grove-api.{network}.poktroll.com/pokt-network/poktroll/supplier/supplier"
-	url = f"{base_url}/{operator_address}"
-	
-	try:
-		response = requests.get(url, timeout=30)
-		response.raise_for_status()
-		data = response.json()
-		
-		if 'supplier' not in data:
-			print(f"Error: No supplier data found for operator {operator_address}")
+def fetch_supplier_record(operator_address, network, cache=None, bucket=None, cache_checked=False):
+	"""Return the raw supplier record for an operator, from the cache when possible.
+
+	`cache_checked` means the caller already missed the cache for this address,
+	so it is not queried again (the fetched record is still stored).
+	"""
+	if cache is not None:
+		if not cache_checked:
+			supplier = cache.get(network, operator_address)
+			if supplier is not None:
+				return supplier
+		if cache.offline:
+			print(f"Error: No cached supplier data for operator {operator_address} (offline mode)")
 			return None
+	
+	# Only requests that actually reach the API count against the rate limit
+	if bucket is not None:
+		bucket.acquire()
+	
+	# Shared client: pooled keep-alive connections, retries on 429/5xx
+	data = get_client(network).get_json(f"/pokt-network/poktroll/supplier/supplier/{operator_address}")
+	
+	if 'supplier' not in data:
+		print(f"Error: No supplier data found for operator {operator_address}")
+		return None
+	
+	if cache is not None:
+		cache.put(network, operator_address, data['supplier'])
+	return data['supplier']
+
+def parse_supplier_record(supplier):
+	"""Convert a raw supplier record into the wallet info used to build configs."""
+	# Extract revshare addresses from services, in first-seen order so the pick
+	# below (and with it the config's input and content hashes) is stable across runs
+	revshare_addresses = {}
+	for service in supplier.get('services', []):
+		for rev_share in service.get('rev_share', []):
+			revshare_addresses.setdefault(rev_share['address'])
+	
+	# Remove owner_address from revshare_addresses if present
+	revshare_addresses.pop(supplier['owner_address'], None)
+	revshare_addresses.pop(supplier['operator_address'], None)
+	
+	# Get the first revshare address (or use a default if none found)
+	revshare_address = next(iter(revshare_addresses), supplier['owner_address'])
+	
+	# Extract existing services data
+	existing_services = []
+	for service in supplier.get('services', []):
+		service_data = {
+			'service_id': service['service_id'],
+			'endpoints': []
+		}
 		
-		supplier = data['supplier']
-		
-		# Extract revshare addresses from services
-		revshare_addresses = set()
-		for service in supplier.get('services', []):
-			for rev_share in service.get('rev_share', []):
-				revshare_addresses.add(rev_share['address'])
-		
-		# Remove owner_address from revshare_addresses if present
-		revshare_addresses.discard(supplier['owner_address'])
-		revshare_addresses.discard(supplier['operator_address'])
-		
-		# Get the first revshare address (or use a default if none found)
-		revshare_address = list(revshare_addresses)[0] if revshare_addresses else supplier['owner_address']
-		
-		# Extract existing services data
-		existing_services = []
-		for service in supplier.get('services', []):
-			service_data = {
-				'service_id': service['service_id'],
-				'endpoints': []
+		# Add endpoints
+		for endpoint in service.get('endpoints', []):
+			endpoint_data = {
+				'publicly_exposed_url': endpoint.get('url', 'https://relayminer.example.com'),
+				'rpc_type': endpoint.get('rpc_type', 'JSON_RPC')
 			}
-			
-			# Add endpoints
-			for endpoint in service.get('endpoints', []):
-				endpoint_data = {
-					'publicly_exposed_url': endpoint.get('url', 'https://relayminer.example.com'),
-					'rpc_type': endpoint.get('rpc_type', 'JSON_RPC')
-				}
-				if endpoint.get('configs'):
-					endpoint_data['configs'] = endpoint['configs']
-				service_data['endpoints'].append(endpoint_data)
-			
-			# Add revenue sharing if present
-			if service.get('rev_share'):
-				rev_share_percent = {}
-				for rev_share in service['rev_share']:
-					rev_share_percent[rev_share['address']] = int(rev_share['rev_share_percentage'])
-				service_data['rev_share_percent'] = rev_share_percent
-			
-			existing_services.append(service_data)
+			if endpoint.get('configs'):
+				endpoint_data['configs'] = endpoint['configs']
+			service_data['endpoints'].append(endpoint_data)
 		
-		return {
-			'operator_address': supplier['operator_address'],
-			'owner_address': supplier['owner_address'],
-			'stake_amount': int(supplier['stake']['amount']) // 1000000,  # Convert from upokt to pokt
-			'revshare_address': revshare_address,
-			'publicly_exposed_url': 'https://relayminer.example.com',  # Default URL
-			'existing_services': existing_services
-		}
+		# Add revenue sharing if present
+		if service.get('rev_share'):
+			rev_share_percent = {}
+			for rev_share in service['rev_share']:
+				rev_share_percent[rev_share['address']] = int(rev_share['rev_share_percentage'])
+			service_data['rev_share_percent'] = rev_share_percent
 		
-	except requests.exceptions.RequestException as e:
-		print(f"Error fetching supplier info for {operator_address}: {e}")
-		return None
-	except Exception as e:
-		print(f"Error processing supplier data for {operator_address}: {e}")
-		return None
+		existing_services.append(service_data)
+	
+	return {
+		'operator_address': supplier['operator_address'],
+		'owner_address': supplier['owner_address'],
+		'stake_amount': int(supplier['stake']['amount']) // 1000000,  # Convert from upokt to pokt
+		'revshare_address': revshare_address,
+		'publicly_exposed_url': 'https://relayminer.example.com',  # Default URL
+		'existing_services': existing_services
+	}
+
+def fetch_supplier_info(operator_address, cache=None, bucket=None, cache_checked=False):
+	"""Fetch supplier information from the API using operator address."""
+	network = os.getenv('NETWORK')
+	
+	with metrics.timer('supplier_fetch') as span:
+		try:
+			supplier = fetch_supplier_record(operator_address, network, cache, bucket, cache_checked)
+			if supplier is None:
+				span.set(outcome='not_found')
+				return None
+			return parse_supplier_record(supplier)
+			
+		except requests.exceptions.RequestException as e:
+			span.set(outcome='request_error')
+			print(f"Error fetching supplier info for {operator_address}: {e}")
+			return None
+		except Exception as e:
+			span.set(outcome='parse_error')
+			print(f"Error processing supplier data for {operator_address}: {e}")
+			return None
+
+def _fetch_one(operator_address, cache, bucket, cache_checked):
+	print(f"Fetching supplier info for operator: {operator_address}")
+	return fetch_supplier_info(operator_address, cache, bucket, cache_checked)
+
+def fetch_suppliers_concurrently(operator_addresses, max_in_flight=None, rate=None, cache=None, cache_checked=False):
+	"""Fetch supplier info for many operators with a bounded thread pool.
+
+	`max_in_flight` caps concurrent requests and `rate` caps requests per second
+	(token bucket). Both default to the SUPPLIER_FETCH_CONCURRENCY and
+	SUPPLIER_FETCH_RATE environment variables. Records found in `cache` skip
+	the API entirely (pass `cache_checked` when the caller already looked them
+	up and only misses are left). Returns a list of results in the same order as
+	`operator_addresses` (None for failures).
+	"""
+	max_in_flight = max_in_flight or int(os.getenv('SUPPLIER_FETCH_CONCURRENCY', DEFAULT_FETCH_CONCURRENCY))
+	rate = rate or float(os.getenv('SUPPLIER_FETCH_RATE', DEFAULT_FETCH_RATE))
+	bucket = TokenBucket(rate)
+	
+	with ThreadPoolExecutor(max_workers=max(1, max_in_flight)) as executor:
+		# executor.map yields results in submission order, so CSV row order is kept
+		return list(executor.map(lambda address: _fetch_one(address, cache, bucket, cache_checked),
+			operator_addresses))
+
+def fetch_suppliers_bulk(operator_addresses, cache=None):
+	"""Resolve operator addresses against the paginated list of all suppliers.
 
-def load_operator_addresses():
+	Streams `/supplier/supplier` page by page, keeping only the records that
+	were asked for, and stops as soon as every address has been found.
+	Returns a dict of operator_address -> parsed supplier info.
+	"""
+	network = os.getenv('NETWORK')
+	page_size = int(os.getenv('SUPPLIER_PAGE_SIZE', DEFAULT_PAGE_SIZE))
+	wanted = set(operator_addresses)
+	index = {}
+	pages = 0
+	
+	for page in get_client(network).iter_pages("/pokt-network/poktroll/supplier/supplier", page_size=page_size):
+		pages += 1
+		for supplier in page.get('supplier', page.get('suppliers', [])):
+			operator_address = supplier.get('operator_address')
+			if operator_address not in wanted or operator_address in index:
+				continue
+			if cache is not None:
+				cache.put(network, operator_address, supplier)
+			try:
+				index[operator_address] = parse_supplier_record(supplier)
+			except Exception as e:
+				print(f"Error processing supplier data for {operator_address}: {e}")
+				index[operator_address] = None
+		print(f"Fetched supplier page {pages}: resolved {len(index)}/{len(wanted)} operators")
+		if len(index) == len(wanted):
+			break
+	
+	return index
+
+def resolve_supplier_infos(operator_addresses, cache=None):
+	"""Fetch supplier info for every operator address, in order.
+
+	Cached records are served first. If the remaining misses reach
+	SUPPLIER_BULK_THRESHOLD the full supplier list is streamed once (bulk
+	mode); otherwise, or for anything bulk mode did not find, records are
+	fetched per address through the concurrent fetcher.
+	"""
+	network = os.getenv('NETWORK')
+	threshold = int(os.getenv('SUPPLIER_BULK_THRESHOLD', DEFAULT_BULK_THRESHOLD))
+	
+	resolved = {}
+	if cache is not None and cache.mode != 'refresh':
+		for operator_address in operator_addresses:
+			supplier = cache.get(network, operator_address)
+			if supplier is not None:
+				resolved[operator_address] = parse_supplier_record(supplier)
+		metrics.inc('suppliers_resolved', len(resolved), source='cache')
+	
+	missing = list(dict.fromkeys(a for a in operator_addresses if a not in resolved))
+	if missing and not (cache is not None and cache.offline) and len(missing) >= threshold:
+		print(f"Using bulk supplier listing for {len(missing)} operators")
+		try:
+			with metrics.timer('supplier_bulk_fetch'):
+				bulk = fetch_suppliers_bulk(missing, cache)
+			resolved.update(bulk)
+			metrics.inc('suppliers_resolved', len(bulk), source='bulk')
+		except requests.exceptions.RequestException as e:
+			print(f"Error listing suppliers, falling back to per-address fetching: {e}")
+		missing = [a for a in missing if a not in resolved]
+	
+	if missing:
+		# Every address left was already looked up in the cache above (or the cache is in refresh mode)
+		results = fetch_suppliers_concurrently(missing, cache=cache, cache_checked=True)
+		resolved.update(zip(missing, results))
+	
+	return [resolved.get(operator_address) for operator_address in operator_addresses]
+
+def load_operator_addresses(cache=None, filename=None):
 	"""Load operator addresses from CSV file."""
 	try:
-		filename = input("Enter the CSV filename with operator_address column (Case-sensitive): ")
-		df = pd.read_csv(filename)
+		if filename is None:
+			filename = input("Enter the CSV filename with operator_address column (Case-sensitive): ")
+		with open(filename, 'r', newline='') as f:
+			reader = csv.DictReader(f)
+			if 'operator_address' not in (reader.fieldnames or []):
+				print("Error: CSV file must contain 'operator_address' column")
+				return {}
+			operator_addresses = [row['operator_address'] for row in reader]
 		
-		if 'operator_address' not in df.columns:
-			print("Error: CSV file must contain 'operator_address' column")
-			return {}
+		results = resolve_supplier_infos(operator_addresses, cache)
+		print(f"Supplier API stats: {get_client(os.getenv('NETWORK')).latency_summary()}")
+		if cache is not None:
+			print(f"Supplier cache stats: {cache.stats()}")
 		
 		wallet_data = {}
-		for index, row in df.iterrows():
-			operator_address = row['operator_address']
-			print(f"Fetching supplier info for operator: {operator_address}")
-			
-			supplier_info = fetch_supplier_info(operator_address)
+		failed = []
+		for index, (operator_address, supplier_info) in enumerate(zip(operator_addresses, results)):
 			if supplier_info:
 				# Use operator address as customer_id for consistency
 				customer_id = f"customer_{index + 1}"
 				wallet_data[customer_id] = supplier_info
 				print(f"Successfully fetched info for {operator_address}")
 			else:
+				failed.append(operator_address)
 				print(f"Failed to fetch info for {operator_address}, skipping...")
-			
-			# Add a small delay to avoid overwhelming the API
-			time.sleep(0.5)
+		
+		if failed:
+			print(f"Warning: {len(failed)} operator(s) could not be fetched and were skipped: {', '.join(failed)}")
 		
 		return wallet_data
 		
@@ -123,17 +274,89 @@ def load_operator_addresses():
 
 def extract_morse_chain_id(service_id):
 	"""Extract Morse Chain ID from service ID string (e.g., 'Avalanche (F003)' -> 'F003')."""
-	import re
-	match = re.search(r'\(([A-F0-9]{4})\)', service_id)
+	match = _MORSE_CHAIN_ID_RE.search(service_id)
 	return match.group(1) if match else None
 
+def read_allocation_sheet(filename):
+	"""Read the PNF allocation CSV, dropping its Total column and totals row, with blanks as 0."""
+	with metrics.timer('allocation_read'):
+		# pandas is only needed for the allocation sheet, so keep it off the startup path
+		import pandas as pd
+		df = pd.read_csv(filename)
+		
+		# drop last column from df
+		df = df.iloc[:, :-1]
+		# drop last row from df
+		df = df.iloc[:-1, :]
+		# replace all NaN with 0
+		return df.fillna(0)
+
+def build_allocation_matrix(df, customer_columns, service_mapping):
+	"""Parse the allocation sheet once into chain metadata plus a boolean allocation matrix.
+
+	Returns (chains, allocated): `chains` is a list with one
+	(morse_chain_id, service_id, node_type) tuple per sheet row, service_id
+	being None when the chain has no Shannon mapping; `allocated` is a boolean
+	DataFrame (sheet rows x customer columns) marking non-zero allocations.
+	"""
+	morse_chain_ids = df['Chains'].astype(str).str.extract(MORSE_CHAIN_ID_PATTERN, expand=False)
+	service_ids = morse_chain_ids.map(service_mapping)
+	
+	chains = list(zip(
+		morse_chain_ids.astype(object).where(morse_chain_ids.notna(), None),
+		service_ids.astype(object).where(service_ids.notna(), None),
+		df['Node Type'],
+	))
+	allocated = df[customer_columns].ne(0)
+	return chains, allocated
+
+def allocated_chains(chains, allocated, column):
+	"""Return the chain tuples allocated to one customer column, in sheet order."""
+	return [chains[i] for i in allocated[column].to_numpy().nonzero()[0]]
+
+def parse_args():
+	parser = argparse.ArgumentParser(description="Generate supplier config YAML files from node allocations.")
+	cache_mode = parser.add_mutually_exclusive_group()
+	cache_mode.add_argument('--refresh', action='store_true',
+		help="Ignore cached supplier records and re-fetch everything from the API")
+	cache_mode.add_argument('--offline', action='store_true',
+		help="Use only cached supplier records, never contact the API")
+	cache_mode.add_argument('--no-cache', action='store_true',
+		help="Disable the on-disk supplier cache for this run")
+	parser.add_argument('--force', action='store_true',
+		help="Rewrite every customer file even if its inputs are unchanged")
+	parser.add_argument('--merge-policy', choices=MERGE_POLICIES, default=DEFAULT_MERGE_POLICY,
+		help="How to resolve allocated services that already exist on the supplier with a different definition")
+	parser.add_argument('--operators-csv',
+		help="CSV file with an operator_address column (prompted for if omitted)")
+	parser.add_argument('--allocation-csv',
+		help="Node allocation CSV received from PNF (prompted for if omitted)")
+	parser.add_argument('--revshare-pct', type=int,
+		help="Revshare percentage for the revshare address (prompted for if omitted)")
+	parser.add_argument('--output-dir', default='output',
+		help="Directory for the generated supplier configs (default: output)")
+	cli_options.add_common_args(parser)
+	return cli_options.parse_args(parser, 'generate_supplier_config')
+
 def main():
+	args = parse_args()
+	cli_options.resolve_network(args)
+	output_dir = args.output_dir
+	
 	# Create output directory if it doesn't exist
-	os.makedirs('output', exist_ok=True)
+	os.makedirs(output_dir, exist_ok=True)
+	
+	cache = None
+	if not args.no_cache:
+		mode = 'refresh' if args.refresh else 'offline' if args.offline else 'normal'
+		cache = SupplierCache.from_env(mode)
 	
 	# Load service ID mapping and operator addresses
 	service_mapping = load_service_mapping()
-	wallet_data = load_operator_addresses()
+	operators_csv = cli_options.ask(args, 'operators_csv',
+		"Enter the CSV filename with operator_address column (Case-sensitive): ")
+	with profiling.stage('load_suppliers'):
+		wallet_data = load_operator_addresses(cache, operators_csv)
 	
 	if not service_mapping:
 		print("Warning: Could not load service mapping. Using original service IDs.")
@@ -142,17 +365,12 @@ def main():
 		sys.exit(1)
 	
 	# Read NodeAllocation.csv
-	filename = input("Enter the csv received from PNF with the F-Chains node allocations (Case-sensitive): ")
-	revshare_pct = int(input("Enter revshare percentage for the REVSHARE ADDRESS:"))
-	
-	df = pd.read_csv(filename)
- 
-	# drop last column from df
-	df = df.iloc[:, :-1]
-	# drop last row from df
-	df = df.iloc[:-1, :]
-	# replace all NaN with 0
-	df = df.fillna(0)
+	filename = cli_options.ask(args, 'allocation_csv',
+		"Enter the csv received from PNF with the F-Chains node allocations (Case-sensitive): ")
+	revshare_pct = cli_options.ask(args, 'revshare_pct', "Enter revshare percentage for the REVSHARE ADDRESS:", int)
+	
+	with profiling.stage('read_allocation'):
+		df = read_allocation_sheet(filename)
 	
 	# Get the numeric columns (excluding 'Chains', 'Node Type', 'StakeNodes')
 	numeric_columns = [col for col in df.columns[3:] if col.isdigit()]
@@ -178,69 +396,95 @@ def main():
 		print("Error: No valid column to row mappings found. Exiting.")
 		sys.exit(1)
 	
-	# Iterate over each mapped column and create YAML for corresponding customer
-	for col_num, customer_id in column_to_row.items():
-		wallet_info = wallet_data[customer_id]
-		
-		# Create base YAML structure for this customer
-		yaml_data = {
-			'owner_address': wallet_info['owner_address'],
-			'operator_address': wallet_info['operator_address'],
-			'stake_amount': f"{int(wallet_info['stake_amount']) * 1000000}upokt",
-			'default_rev_share_percent': {
-				wallet_info['owner_address']: 0 if revshare_pct == 100 else (99 - revshare_pct),
-				wallet_info['revshare_address']: revshare_pct,
-				wallet_info['operator_address']: 0 if revshare_pct == 100 else 1
-			},
-			'services': []
-		}
+	with profiling.stage('build_configs'):
+		# Parse the sheet once; each customer then reads its own column slice
+		with metrics.timer('allocation_parse'):
+			chains, allocated = build_allocation_matrix(df, list(column_to_row), service_mapping)
 		
-		# Add existing services from API response
-		if 'existing_services' in wallet_info:
-			yaml_data['services'].extend(wallet_info['existing_services'])
-		
-		# Add new services for this customer from node allocation
-		for index, row in df.iterrows():
-			if row[col_num] != 0:
-				original_service_id = row['Chains']
-				morse_chain_id = extract_morse_chain_id(original_service_id)
-				
-				node_type = row['Node Type']
-				
-				# Use Shannon service ID if mapping exists, otherwise use original
-				service_id = service_mapping.get(morse_chain_id, None)
-				
+		# Iterate over each mapped column and create YAML for corresponding customer
+		output_files = []
+		manifest = OutputManifest(output_dir)
+		input_hashes = {}
+		unchanged = []
+		for col_num, customer_id in column_to_row.items():
+			wallet_info = wallet_data[customer_id]
+			customer_chains = allocated_chains(chains, allocated, col_num)
+			
+			# Skip customers whose inputs and previously written file are unchanged.
+			# The chain tuples carry the mapped service IDs, so mapping edits count too.
+			input_hash = hash_inputs({
+				'supplier': wallet_info,
+				'allocation': customer_chains,
+				'revshare_pct': revshare_pct,
+				'merge_policy': args.merge_policy,
+			})
+			filename = f'{customer_id}.yml'
+			if not args.force and manifest.is_unchanged(customer_id, input_hash, filename):
+				unchanged.append(customer_id)
+				continue
+			input_hashes[customer_id] = input_hash
+			
+			# Create base YAML structure for this customer
+			yaml_data = {
+				'owner_address': wallet_info['owner_address'],
+				'operator_address': wallet_info['operator_address'],
+				'stake_amount': f"{int(wallet_info['stake_amount']) * 1000000}upokt",
+				'default_rev_share_percent': {
+					wallet_info['owner_address']: 0 if revshare_pct == 100 else (99 - revshare_pct),
+					wallet_info['revshare_address']: revshare_pct,
+					wallet_info['operator_address']: 0 if revshare_pct == 100 else 1
+				},
+				'services': []
+			}
+			
+			# Build new services for this customer from node allocation
+			allocated_services = []
+			for morse_chain_id, service_id, node_type in customer_chains:
 				if service_id is None:
 					print(f"Morse to Shannon service mapping is missing for {morse_chain_id}: Linked Operator Address: {wallet_info['operator_address']}")
 					continue
 				
-				# Check if this service already exists in the services list
-				service_exists = any(service['service_id'] == service_id for service in yaml_data['services'])
+				service = {
+					'service_id': service_id,
+					'endpoints': [{
+						'publicly_exposed_url': wallet_info['publicly_exposed_url'],
+						'rpc_type': 'JSON_RPC'  # Default
+					}]
+				}
 				
-				if not service_exists:
-					service = {
-						'service_id': service_id,
-						'endpoints': [{
-							'publicly_exposed_url': wallet_info['publicly_exposed_url'],
-							'rpc_type': 'JSON_RPC'  # Default
-						}]
+				# Set revenue share based on node type
+				if node_type == 'HTC':
+					pass
+				else:  # LTailC
+					service['rev_share_percent'] = {
+						wallet_info['revshare_address']: 100
 					}
-					
-					# Set revenue share based on node type
-					if node_type == 'HTC':
-						pass
-					else:  # LTailC
-						service['rev_share_percent'] = {
-							wallet_info['revshare_address']: 100
-						}
-					
-					yaml_data['services'].append(service)
-		
-		# Write YAML file for this customer
-		output_file = os.path.join('output', f'{customer_id}.yml')
-		with open(output_file, 'w') as f:
-			yaml.dump(yaml_data, f, sort_keys=False, default_flow_style=False)
-		print(f"Generated {output_file}")
+				
+				allocated_services.append(service)
+			
+			# Merge with existing services from API response
+			yaml_data['services'], report = merge_services(
+				wallet_info.get('existing_services', []), allocated_services, args.merge_policy)
+			if report['conflicted']:
+				print(f"{customer_id}: conflicting definitions for {', '.join(report['conflicted'])} resolved with {args.merge_policy}")
+			print(f"{customer_id}: {len(report['added'])} services added, {len(report['kept'])} kept, {len(report['conflicted'])} conflicted")
+			
+			output_files.append((os.path.join(output_dir, filename), yaml_data))
+	
+	with profiling.stage('write_yaml'):
+		# Serialize across a process pool and write each file atomically
+		for output_file in write_yaml_files(output_files):
+			print(f"Generated {output_file}")
+	
+	with profiling.stage('manifest'):
+		changed = list(input_hashes)
+		for customer_id, input_hash in input_hashes.items():
+			manifest.record(customer_id, input_hash, f'{customer_id}.yml')
+		manifest.save(changed, unchanged)
+	
+	print(f"\n{len(changed)} customer(s) changed, {len(unchanged)} unchanged")
+	if changed:
+		print(f"Changed: {', '.join(changed)}")
 
 if __name__ == "__main__":
 	main()
\ No newline at end of file
@@ -1,58 +1,105 @@
 #!/usr/bin/env python3
 
+import argparse
 import csv
-import subprocess
+import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def import_accounts_to_keyring(csv_file):
+import cli_options
+import metrics
+import profiling
+from pocketd_cli import run_pocketd
+
+# Parallel `pocketd keys add` processes; each key is its own file in the test keyring
+DEFAULT_IMPORT_WORKERS = 8
+
+def list_keyring_keys():
+    """Return the names and addresses already in the test keyring (one pocketd call)."""
+    process = run_pocketd(['keys', 'list', '--keyring-backend=test', '--output=json'])
+    if process.returncode != 0:
+        print(f"Warning: could not list existing keys: {process.stderr.strip()}")
+        return set(), set()
+    try:
+        keys = json.loads(process.stdout or '[]') or []
+    except ValueError:
+        print("Warning: could not parse `pocketd keys list` output; importing every account")
+        return set(), set()
+    return {key.get('name') for key in keys}, {key.get('address') for key in keys}
+
+def import_account(customer_id, mnemonic):
+    """Import one mnemonic under `customer_id`. Returns 'imported', 'skipped' or 'failed'."""
+    # Construct the command
+    cmd = [
+        'keys', 'add',
+        customer_id,
+        '--recover',
+        '--keyring-backend=test',
+        # '--yes'  # Automatically answer yes to prompts
+    ]
+
+    try:
+        # Run the command and provide the mnemonic through stdin
+        process = run_pocketd(cmd, input_text=mnemonic)
+
+        if process.returncode == 0:
+            print(f"Successfully imported {customer_id}")
+            return 'imported'
+        if 'already exists' in process.stderr:
+            print(f"Skipping {customer_id}: key already exists")
+            return 'skipped'
+        print(f"Error importing {customer_id}:")
+        print(process.stderr)
+    except Exception as e:
+        print(f"Error running command for {customer_id}: {str(e)}")
+    return 'failed'
+
+def import_accounts_to_keyring(csv_file, workers=DEFAULT_IMPORT_WORKERS):
     """
     Read the CSV file and import each account to the keyring using pocketd
+
+    Accounts whose name or address is already in the keyring are skipped, and
+    the remaining imports run `workers` at a time.
     """
     if not Path(csv_file).exists():
         print(f"Error: {csv_file} not found!")
         sys.exit(1)
 
     with open(csv_file, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            customer_id = row['customer_id']
-            mnemonic = row['mnemonic']
-            
-            # Construct the command
-            cmd = [
-                'pocketd', 'keys', 'add',
-                customer_id,
-                '--recover',
-                '--keyring-backend=test',
-                # '--yes'  # Automatically answer yes to prompts
-            ]
-            
-            print(f"\nImporting account {customer_id}...")
-            try:
-                # Run the command and provide the mnemonic through stdin
-                process = subprocess.Popen(
-                    cmd,
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-                
-                # Send the mnemonic to the process
-                stdout, stderr = process.communicate(input=mnemonic)
-                
-                if process.returncode == 0:
-                    print(f"Successfully imported {customer_id}")
-                else:
-                    print(f"Error importing {customer_id}:")
-                    print(stderr)
-                    
-            except Exception as e:
-                print(f"Error running command for {customer_id}: {str(e)}")
+        rows = list(csv.DictReader(f))
+
+    with profiling.stage('list_keys'):
+        names, addresses = list_keyring_keys()
+    pending = []
+    for row in rows:
+        if row['customer_id'] in names or row.get('operator_address') in addresses:
+            continue
+        pending.append((row['customer_id'], row['mnemonic']))
+    skipped = len(rows) - len(pending)
+    print(f"{skipped} account(s) already in the keyring, importing {len(pending)}")
+
+    with profiling.stage('import'):
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            outcomes = list(executor.map(lambda account: import_account(*account), pending))
+    metrics.inc('items', skipped, outcome='skipped')
+    for outcome in ('imported', 'skipped', 'failed'):
+        metrics.inc('items', outcomes.count(outcome), outcome=outcome)
+
+    print(f"\nImported {outcomes.count('imported')}, skipped {skipped + outcomes.count('skipped')}, "
+          f"failed {outcomes.count('failed')}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Import operator mnemonics into the pocketd test keyring.")
+    parser.add_argument('--csv-file', default="pocket_accounts.csv",
+                        help="CSV with customer_id, operator_address and mnemonic columns (default: pocket_accounts.csv)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_IMPORT_WORKERS,
+                        help=f"Number of keys imported in parallel (default: {DEFAULT_IMPORT_WORKERS})")
+    cli_options.add_common_args(parser, network=False)
+    return cli_options.parse_args(parser, 'import_operator_to_keyring')
 
 if __name__ == "__main__":
-    csv_file = "pocket_accounts.csv"
+    args = parse_args()
     print("Starting account import process...")
-    import_accounts_to_keyring(csv_file)
+    import_accounts_to_keyring(args.csv_file, args.workers)
     print("\nAccount import process completed!")
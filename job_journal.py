@@ -0,0 +1,76 @@
+"""
+Append-only JSONL journal of per-item progress for batch runs.
+
+Each staking/funding item gets a 'started' line before its transaction is
+submitted and a 'succeeded' or 'failed' line (with tx hash or error) once it
+finishes. With --resume a script replays the journal and skips items whose
+latest state is 'succeeded'. Items left at 'started' were in flight when the
+previous run died: their transaction may or may not have landed.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import metrics
+
+STARTED = 'started'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+
+class JobJournal:
+    """Thread-safe append-only journal stored as one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.run_id = uuid.uuid4().hex[:12]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        """Replay the journal and return the latest entry for each item."""
+        latest = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A crash mid-write can leave a partial last line
+                        continue
+                    latest[entry['item']] = entry
+        except FileNotFoundError:
+            pass
+        return latest
+
+    def items_in_state(self, state: str) -> set:
+        return {item for item, entry in self.entries().items() if entry['state'] == state}
+
+    def record(self, item: str, state: str, tx_hash: Optional[str] = None,
+               error: Optional[str] = None, **extra: Any) -> None:
+        """Append one state transition and flush it to disk (finished items are counted by outcome in metrics)."""
+        if state != STARTED:
+            metrics.inc('items', outcome=state)
+        entry = {'ts': time.time(), 'run': self.run_id, 'item': item, 'state': state}
+        if tx_hash:
+            entry['tx_hash'] = tx_hash
+        if error:
+            entry['error'] = error
+        entry.update(extra)
+        line = json.dumps(entry, separators=(',', ':')) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def default_journal_path(script_name: str) -> str:
+    """Return the default journal location for a script, e.g. .journal/fund_operator_wallets.jsonl."""
+    return os.path.join('.journal', f"{script_name}.jsonl")
@@ -0,0 +1,227 @@
+"""
+Lightweight timers and counters for the pipeline scripts.
+
+Instrumented code wraps its stages in `timer()` spans and bumps counters with
+`inc()`:
+
+    import metrics
+
+    with metrics.timer('supplier_fetch') as span:
+        ...
+        span.set(outcome='not_found')
+    metrics.inc('api_retries', status='503')
+
+Collection is off unless a script is run with --metrics-dir (or METRICS_DIR
+is set); until then `timer()` hands back a shared no-op span and `inc()`
+returns immediately, so instrumented code pays only a function call. When
+enabled, the script writes two files into the directory at exit:
+
+- `<script>.prom`: a Prometheus textfile (node_exporter textfile collector
+  format) with a latency histogram per timer, labelled by outcome, and a
+  counter per `inc()` name.
+- `<script>-<timestamp>.trace.json`: every span as a Chrome trace event,
+  viewable in chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import atexit
+import os
+import threading
+import time
+from typing import Dict, List, Tuple
+
+METRIC_PREFIX = 'pokt_pipeline'
+# Histogram bucket upper bounds in seconds, from a cached lookup to a slow tx
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Spans beyond this are still counted in the histograms but left out of the trace
+MAX_TRACE_EVENTS = 200000
+
+_registry = None
+
+
+class _NoopSpan:
+    """Stand-in span returned while metrics are disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **labels):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """A timed section. The outcome label defaults to 'ok', or 'error' if the block raises."""
+
+    def __init__(self, registry: 'Registry', name: str, labels: Dict[str, str]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def set(self, **labels) -> None:
+        """Set or override labels (typically `outcome`) before the span ends."""
+        self.labels.update((key, str(value)) for key, value in labels.items())
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        if exc_type is not None:
+            self.labels['outcome'] = 'error'
+        self.labels.setdefault('outcome', 'ok')
+        self.registry.observe(self.name, self.start, elapsed, self.labels)
+        return False
+
+
+class Registry:
+    """Histograms, counters and trace events for one script run."""
+
+    def __init__(self, script: str, directory: str):
+        self.script = script
+        self.directory = directory
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+        # (name, sorted labels) -> [bucket counts..., sum, count]
+        self.histograms: Dict[Tuple[str, Tuple], List[float]] = {}
+        self.counters: Dict[Tuple[str, Tuple], float] = {}
+        self.events: List[dict] = []
+        self.dropped_events = 0
+
+    def observe(self, name: str, start: float, elapsed: float, labels: Dict[str, str]) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * len(BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if elapsed <= bound:
+                    histogram[i] += 1
+            histogram[-2] += elapsed
+            histogram[-1] += 1
+            if len(self.events) < MAX_TRACE_EVENTS:
+                self.events.append({
+                    'name': name,
+                    'ph': 'X',
+                    'ts': round((start - self.origin) * 1e6, 1),
+                    'dur': round(elapsed * 1e6, 1),
+                    'pid': os.getpid(),
+                    'tid': threading.get_ident(),
+                    'args': labels,
+                })
+            else:
+                self.dropped_events += 1
+
+    def inc(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def prometheus_text(self) -> str:
+        """Render the histograms and counters in the Prometheus text exposition format."""
+
+        def label_text(labels, extra=()):
+            pairs = [('script', self.script)] + list(labels) + list(extra)
+            escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                       for _, value in pairs)
+            return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+        lines = []
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+        for name in sorted({name for (name, _), _ in histograms}):
+            metric = f"{METRIC_PREFIX}_{name}_seconds"
+            lines.append(f"# HELP {metric} Duration of {name} operations.")
+            lines.append(f"# TYPE {metric} histogram")
+            for (series_name, labels), values in histograms:
+                if series_name != name:
+                    continue
+                for bound, count in zip(BUCKETS, values):
+                    lines.append(f"{metric}_bucket{label_text(labels, [('le', repr(bound))])} {count}")
+                lines.append(f"{metric}_bucket{label_text(labels, [('le', '+Inf')])} {values[-1]}")
+                lines.append(f"{metric}_sum{label_text(labels)} {values[-2]:.6f}")
+                lines.append(f"{metric}_count{label_text(labels)} {values[-1]}")
+        for name in sorted({name for (name, _), _ in counters}):
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            lines.append(f"# HELP {metric} Number of {name.replace('_', ' ')}.")
+            lines.append(f"# TYPE {metric} counter")
+            for (series_name, labels), value in counters:
+                if series_name == name:
+                    lines.append(f"{metric}{label_text(labels)} {value:g}")
+        lines.append(f"# HELP {METRIC_PREFIX}_run_duration_seconds Wall time of the last run.")
+        lines.append(f"# TYPE {METRIC_PREFIX}_run_duration_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_run_duration_seconds{label_text(())} "
+                     f"{time.perf_counter() - self.origin:.6f}")
+        lines.append(f"# HELP {METRIC_PREFIX}_run_timestamp_seconds Unix time the last run started.")
+        lines.append(f"# TYPE {METRIC_PREFIX}_run_timestamp_seconds gauge")
+        lines.append(f"{METRIC_PREFIX}_run_timestamp_seconds{label_text(())} {self.started_at:.3f}")
+        return '\n'.join(lines) + '\n'
+
+    def trace(self) -> dict:
+        with self._lock:
+            events = list(self.events)
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'script': self.script, 'started_at': self.started_at,
+                          'dropped_events': self.dropped_events},
+        }
+
+    def export(self) -> Tuple[str, str]:
+        """Write the Prometheus textfile and the JSON trace; returns their paths."""
+        import json
+        # Imported here because yaml_io itself imports metrics at load time
+        from yaml_io import write_atomic
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))
+        prom_path = os.path.join(self.directory, f"{self.script}.prom")
+        trace_path = os.path.join(self.directory, f"{self.script}-{stamp}.trace.json")
+        # The textfile collector may read at any moment, so replace it atomically
+        write_atomic(prom_path, self.prometheus_text())
+        write_atomic(trace_path, json.dumps(self.trace()))
+        return prom_path, trace_path
+
+
+def enable(script: str, directory: str) -> 'Registry':
+    """Start collecting for `script`; the files are written to `directory` when the process exits."""
+    global _registry
+    _registry = Registry(script, directory)
+    atexit.register(_export_at_exit, _registry)
+    return _registry
+
+
+def _export_at_exit(registry: Registry) -> None:
+    try:
+        prom_path, trace_path = registry.export()
+        print(f"Metrics written to {prom_path} and {trace_path}")
+    except OSError as e:
+        print(f"Warning: could not write metrics to {registry.directory}: {e}")
+
+
+def timer(name: str, **labels):
+    """Context manager timing one `name` operation; a no-op while metrics are disabled."""
+    if _registry is None:
+        return _NOOP_SPAN
+    return Span(_registry, name, {key: str(label) for key, label in labels.items()})
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    """Record an operation that was timed by the caller and just finished."""
+    if _registry is None:
+        return
+    _registry.observe(name, time.perf_counter() - seconds, seconds,
+                      {key: str(label) for key, label in labels.items()})
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    """Add `value` to counter `name`; a no-op while metrics are disabled."""
+    if _registry is None:
+        return
+    _registry.inc(name, value, {key: str(label) for key, label in labels.items()})
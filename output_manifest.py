@@ -0,0 +1,147 @@
+"""
+Content-hash manifest for generated supplier config files.
+
+generate_supplier_config.py stores, per customer, a hash of every input that
+shapes the customer's file (supplier record, allocation column, service
+mapping, revshare percentage, merge policy) plus a hash of the file it wrote.
+On the next run a customer whose inputs and file are both unchanged is
+skipped. Customers whose file changed are added to a pending set that
+carries over between runs until stake_from_supplier_config.py stakes them, so
+--changed-only restakes everything changed since the last staking run, not
+just what the most recent generation run touched.
+override_customer_services_config_files.py adds the files it rewrites to the
+pending set too.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from yaml_io import write_atomic
+
+MANIFEST_NAME = '.manifest.json'
+MANIFEST_VERSION = 1
+
+
+def hash_inputs(inputs: Any) -> str:
+    """Return a stable sha256 of JSON-serializable inputs (dict key order does not matter)."""
+    encoded = json.dumps(inputs, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def file_sha256(path: str) -> Optional[str]:
+    """Return the sha256 of a file's contents, or None if it does not exist."""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+class OutputManifest:
+    """Per-directory record of input and output hashes for each customer file."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.customers: Dict[str, Dict[str, str]] = {}
+        self.pending: Set[str] = set()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.customers = data.get('customers', {})
+                self.pending = set(_pending(data))
+        except FileNotFoundError:
+            pass
+        except (ValueError, AttributeError) as e:
+            print(f"Warning: Ignoring unreadable manifest {self.path}: {e}")
+
+    def is_unchanged(self, customer_id: str, input_hash: str, filename: str) -> bool:
+        """True if the inputs match the last run and the file on disk is the one we wrote."""
+        entry = self.customers.get(customer_id)
+        if not entry or entry.get('input_hash') != input_hash or entry.get('file') != filename:
+            return False
+        return file_sha256(os.path.join(self.directory, filename)) == entry.get('output_hash')
+
+    def record(self, customer_id: str, input_hash: str, filename: str) -> None:
+        """Remember the inputs and the freshly written file for a customer."""
+        self.customers[customer_id] = {
+            'file': filename,
+            'input_hash': input_hash,
+            'output_hash': file_sha256(os.path.join(self.directory, filename)),
+        }
+
+    def save(self, changed: List[str], unchanged: List[str]) -> None:
+        """Write the manifest atomically, adding this run's changed customers to the pending set."""
+        self.pending.update(changed)
+        data = {
+            'version': MANIFEST_VERSION,
+            'customers': self.customers,
+            'pending': sorted(self.pending),
+            'last_run': {
+                'timestamp': int(time.time()),
+                'changed': sorted(changed),
+                'unchanged': sorted(unchanged),
+            },
+        }
+        write_atomic(self.path, json.dumps(data, indent=2, sort_keys=True) + '\n')
+
+
+def _pending(data: Dict[str, Any]) -> List[str]:
+    # Manifests written before the pending set existed only know the last run's changes
+    if 'pending' in data:
+        return data['pending']
+    return data.get('last_run', {}).get('changed', [])
+
+
+def load_changed_files(directory: str) -> Optional[List[str]]:
+    """Return the file names changed since the last staking run, or None if there is no manifest."""
+    path = os.path.join(directory, MANIFEST_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    customers = data.get('customers', {})
+    return [customers[customer_id]['file'] for customer_id in _pending(data) if customer_id in customers]
+
+
+def _update_pending(directory: str, filenames: List[str],
+                    update: Callable[[Set[str], Set[str]], Set[str]]) -> Optional[int]:
+    """Apply `update(pending, customers owning filenames)` to a manifest's pending set.
+
+    Returns how many of the files belong to customers in the manifest, or
+    None if the directory has no manifest.
+    """
+    path = os.path.join(directory, MANIFEST_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    by_file = {entry.get('file'): customer_id for customer_id, entry in data.get('customers', {}).items()}
+    touched = {by_file[name] for name in filenames if name in by_file}
+    data['pending'] = sorted(update(set(_pending(data)), touched))
+    write_atomic(path, json.dumps(data, indent=2, sort_keys=True) + '\n')
+    return len(touched)
+
+
+def add_changed_files(directory: str, filenames: List[str]) -> Optional[int]:
+    """Add the customers owning `filenames` to the pending set, for edits made after generation.
+
+    Returns how many of the files belong to customers in the manifest, or None
+    if the directory has no manifest.
+    """
+    return _update_pending(directory, filenames, lambda pending, touched: pending | touched)
+
+
+def clear_changed_files(directory: str, filenames: List[str]) -> Optional[int]:
+    """Drop the customers owning `filenames` from the pending set once they are staked (or already match the chain).
+
+    Returns how many of the files belong to customers in the manifest, or None
+    if the directory has no manifest.
+    """
+    return _update_pending(directory, filenames, lambda pending, touched: pending - touched)
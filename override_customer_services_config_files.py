@@ -3,24 +3,40 @@
 Script to override services in customer config YAML files.
 
 This script prompts the user for a folder containing customer config YAML files and an override YAML file,
-then updates all config files by replacing their services section with the services from the override file.
+then updates the config files with it. An override either replaces the whole services section (`services`)
+or patches individual service_ids (`patch` with `remove`, `replace` and `add`), and can be limited to some
+customers by operator address or file name glob (`select`, or the --operators/--operators-csv/--files flags).
+Files are loaded and patched across a process pool, and only files whose content changes are rewritten.
 
 Usage:
     python override_customer_services_config_files.py
+    python override_customer_services_config_files.py --config-folder output --override-file override.yml --yes
+    python override_customer_services_config_files.py --config-folder output --override-file patch.yml \\
+        --operators-csv operators.csv --yes
 """
 
+import argparse
+import csv
 import os
 import sys
 import yaml
+from fnmatch import fnmatch
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, FrozenSet, List, Any, Optional, Tuple
+
+import cli_options
+import metrics
+import profiling
+import yaml_io
+from output_manifest import add_changed_files
+from service_merge import apply_service_patch, validate_service_patch
 
 
 def load_yaml_file(file_path: str) -> Dict[str, Any]:
     """Load and parse a YAML file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return yaml.safe_load(file)
+        return yaml_io.load_yaml_file(file_path)
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
         sys.exit(1)
@@ -32,39 +48,136 @@ def load_yaml_file(file_path: str) -> Dict[str, Any]:
 def save_yaml_file(file_path: str, data: Dict[str, Any]) -> None:
     """Save data to a YAML file with proper formatting."""
     try:
-        with open(file_path, 'w', encoding='utf-8') as file:
-            yaml.dump(data, file, default_flow_style=False, sort_keys=False, indent=2)
+        yaml_io.write_yaml_file(file_path, data, indent=2)
     except Exception as e:
         print(f"Error saving file '{file_path}': {e}")
         sys.exit(1)
 
 
-def update_config_with_override(config_data: Dict[str, Any], override_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Update config data with override services."""
+def load_override(override_file: str) -> Dict[str, Any]:
+    """Load and check an override file: either a full `services` list or a `patch`, plus an optional `select`."""
+    override_data = load_yaml_file(override_file)
+    if not isinstance(override_data, dict):
+        print(f"Error: Override file '{override_file}' must be a mapping")
+        sys.exit(1)
+    if 'services' in override_data and 'patch' in override_data:
+        print(f"Error: Override file '{override_file}' has both 'services' and 'patch'; use one of them")
+        sys.exit(1)
+    if 'services' not in override_data and 'patch' not in override_data:
+        print(f"Error: No 'services' or 'patch' section found in override file '{override_file}'")
+        sys.exit(1)
+    try:
+        if 'patch' in override_data:
+            validate_service_patch(override_data['patch'])
+        select = override_data.get('select') or {}
+        if not isinstance(select, dict) or set(select) - {'operator_addresses', 'files'}:
+            raise ValueError("select may only have 'operator_addresses' and 'files'")
+    except ValueError as e:
+        print(f"Error: Invalid override file '{override_file}': {e}")
+        sys.exit(1)
+    return override_data
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def describe_service_changes(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """service_ids 'added', 'removed' or 'replaced' (different definition) going from `old` to `new`."""
+    old_by_id = {service.get('service_id'): service for service in old}
+    new_by_id = {service.get('service_id'): service for service in new}
+    return {
+        'added': [service_id for service_id in new_by_id if service_id not in old_by_id],
+        'removed': [service_id for service_id in old_by_id if service_id not in new_by_id],
+        'replaced': [service_id for service_id in new_by_id
+                     if service_id in old_by_id and old_by_id[service_id] != new_by_id[service_id]],
+    }
+
+
+def update_config_with_override(config_data: Dict[str, Any],
+                                override_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    """Return config data with the override applied, and a report of the service_ids it touched.
+
+    A `services` override replaces the whole list; a `patch` removes, replaces
+    or adds individual service_ids (see service_merge.apply_service_patch).
+    """
     # Create a copy of the config data
     updated_config = config_data.copy()
-    
-    # Replace the services section with the override services
-    if 'services' in override_data:
-        updated_config['services'] = override_data['services']
-        print(f"  - Updated services section with {len(override_data['services'])} services")
+    existing = config_data.get('services') or []
+
+    if 'patch' in override_data:
+        updated_config['services'], report = apply_service_patch(existing, override_data['patch'])
     else:
-        print(f"  - Warning: No 'services' section found in override file")
-    
-    return updated_config
+        # Replace the services section with the override services
+        updated_config['services'] = override_data['services']
+        report = describe_service_changes(existing, override_data['services'] or [])
+    return updated_config, report
 
 
-def get_user_input(prompt: str, default: str = "") -> str:
-    """Get user input with optional default value."""
-    if default:
-        user_input = input(f"{prompt} (default: {default}): ").strip()
-        return user_input if user_input else default
-    else:
-        return input(f"{prompt}: ").strip()
+def plan_config_update(path: str, override_data: Dict[str, Any],
+                       operators: Optional[FrozenSet[str]] = None) -> Tuple[str, str, Any, Any]:
+    """Load one config file and apply the override in memory (runs in pool workers).
+
+    Returns (path, status, updated config, report or error). status is
+    'changed', 'unchanged' (the override would not change the file's data),
+    'not_selected' (operator_address not in `operators`), 'no_services' or
+    'error'; the updated config is only returned for 'changed'.
+    """
+    try:
+        config_data = yaml_io.load_yaml_file(path)
+    except (OSError, yaml.YAMLError) as e:
+        return path, 'error', None, str(e)
+    if not isinstance(config_data, dict) or 'services' not in config_data:
+        return path, 'no_services', None, None
+    if operators is not None and config_data.get('operator_address') not in operators:
+        return path, 'not_selected', None, None
+
+    updated_config, report = update_config_with_override(config_data, override_data)
+    if updated_config == config_data:
+        return path, 'unchanged', None, report
+    return path, 'changed', updated_config, report
 
 
-def confirm_action(message: str) -> bool:
-    """Ask user to confirm an action."""
+def plan_config_updates(paths: List[str], override_data: Dict[str, Any], operators: Optional[FrozenSet[str]] = None,
+                        workers: Optional[int] = None) -> List[Tuple[str, str, Any, Any]]:
+    """plan_config_update for every path, across a process pool for large folders; results in input order."""
+    workers = workers or int(os.getenv('YAML_WRITE_WORKERS', 0)) or os.cpu_count() or 1
+    plan = partial(plan_config_update, override_data=override_data, operators=operators)
+    if workers <= 1 or len(paths) < yaml_io.PARALLEL_WRITE_THRESHOLD:
+        return [plan(path) for path in paths]
+
+    # Imported here: multiprocessing is only needed for large folders
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(plan, paths, chunksize=max(1, len(paths) // (workers * 4))))
+
+
+def read_operator_addresses(csv_file: str) -> List[str]:
+    """Read the operator_address column of a CSV file."""
+    try:
+        with open(csv_file, 'r', newline='') as f:
+            reader = csv.DictReader(f)
+            if 'operator_address' not in (reader.fieldnames or []):
+                print(f"Error: CSV file '{csv_file}' must contain 'operator_address' column")
+                sys.exit(1)
+            return [row['operator_address'].strip() for row in reader if row['operator_address'].strip()]
+    except FileNotFoundError:
+        print(f"Error: File '{csv_file}' not found.")
+        sys.exit(1)
+
+
+def matches_file_globs(file_name: str, globs: List[str]) -> bool:
+    """True if the file name, with or without its extension, matches any of the globs."""
+    stem = os.path.splitext(file_name)[0]
+    return any(fnmatch(file_name, pattern) or fnmatch(stem, pattern) for pattern in globs)
+
+
+def confirm_action(message: str, assume_yes: bool = False) -> bool:
+    """Ask user to confirm an action (always confirmed when `assume_yes`)."""
+    if assume_yes:
+        return True
     while True:
         response = input(f"{message} (y/n): ").strip().lower()
         if response in ['y', 'yes']:
@@ -75,8 +188,14 @@ def confirm_action(message: str) -> bool:
             print("Please enter 'y' or 'n'")
 
 
-def process_config_files(config_folder: str, override_file: str) -> None:
-    """Process all YAML files in the config folder and apply override."""
+def process_config_files(config_folder: str, override_file: str, assume_yes: bool = False,
+                         operators: Optional[List[str]] = None, file_globs: Optional[List[str]] = None,
+                         workers: Optional[int] = None) -> None:
+    """Apply an override to the YAML files in the config folder, rewriting only the files it changes.
+
+    `operators` and `file_globs` select the customers to update and take
+    precedence over the override file's own `select` section.
+    """
     
     # Validate inputs
     config_path = Path(config_folder)
@@ -96,60 +215,127 @@ def process_config_files(config_folder: str, override_file: str) -> None:
     
     # Load override data
     print(f"Loading override file: {override_file}")
-    override_data = load_yaml_file(override_file)
+    override_data = load_override(override_file)
+    select = override_data.get('select') or {}
+    if operators is None and select.get('operator_addresses') is not None:
+        operators = _as_list(select['operator_addresses'])
+    if file_globs is None and select.get('files') is not None:
+        file_globs = _as_list(select['files'])
+    if 'patch' in override_data:
+        patch = override_data['patch']
+        print(f"Patching services: remove {len(patch.get('remove') or [])}, "
+              f"replace {len(patch.get('replace') or [])}, add {len(patch.get('add') or [])}")
+    else:
+        print(f"Replacing the services section with {len(override_data['services'] or [])} services")
     
     # Find all YAML files in the config folder
-    yaml_files = list(config_path.glob("*.yml")) + list(config_path.glob("*.yaml"))
+    yaml_files = sorted(list(config_path.glob("*.yml")) + list(config_path.glob("*.yaml")))
     
     if not yaml_files:
         print(f"No YAML files found in '{config_folder}'")
         return
     
-    print(f"Found {len(yaml_files)} YAML files to process")
+    print(f"Found {len(yaml_files)} YAML files")
+    if file_globs:
+        yaml_files = [yaml_file for yaml_file in yaml_files if matches_file_globs(yaml_file.name, file_globs)]
+        print(f"  {len(yaml_files)} match {', '.join(file_globs)}")
+    if operators is not None:
+        print(f"  Selecting customers by {len(operators)} operator address(es)")
+    
+    with profiling.stage('apply_override'):
+        # Load and patch in memory, across a process pool for large folders; nothing is written yet
+        results = plan_config_updates([str(yaml_file) for yaml_file in yaml_files], override_data,
+                                      frozenset(operators) if operators is not None else None, workers)
     
-    # Show preview of files that will be processed
-    print("\nFiles that will be processed:")
-    for yaml_file in yaml_files:
-        print(f"  - {yaml_file.name}")
+    updates = []
+    counts = {'changed': 0, 'unchanged': 0, 'not_selected': 0, 'no_services': 0, 'error': 0}
+    missing, present = {}, {}
+    for path, status, updated_config, report in results:
+        counts[status] += 1
+        name = Path(path).name
+        if status == 'error':
+            print(f"Error parsing YAML file '{path}': {report}")
+        elif status == 'no_services':
+            print(f"  - Warning: No 'services' section found in {name}")
+        if report and status in ('changed', 'unchanged'):
+            for service_id in report.get('missing', []):
+                missing[service_id] = missing.get(service_id, 0) + 1
+            for service_id in report.get('present', []):
+                present[service_id] = present.get(service_id, 0) + 1
+        if status == 'changed':
+            updates.append((path, updated_config))
+            summary = '; '.join(f"{key} {', '.join(report[key])}"
+                                for key in ('added', 'replaced', 'removed') if report[key])
+            print(f"  - {name}: {summary or 'services reordered'}")
+    for status, count in counts.items():
+        metrics.inc('override_files', count, outcome=status)
+    for service_id, count in sorted(missing.items()):
+        print(f"  - Warning: '{service_id}' not replaced in {count} file(s) that do not have it")
+    for service_id, count in sorted(present.items()):
+        print(f"  - Note: '{service_id}' not added to {count} file(s) that already have it")
+    if counts['error']:
+        print(f"Error: {counts['error']} file(s) could not be read; nothing was written")
+        sys.exit(1)
+    
+    print(f"\n{counts['changed']} file(s) to update, {counts['unchanged']} unchanged, "
+          f"{counts['not_selected']} not selected, {counts['no_services']} without services")
+    if not updates:
+        print("Nothing to update.")
+        return
     
     # Ask for confirmation
-    if not confirm_action(f"\nDo you want to proceed with updating {len(yaml_files)} files?"):
+    if not confirm_action(f"\nDo you want to proceed with updating {len(updates)} files?", assume_yes):
         print("Operation cancelled.")
         return
     
-    # Process each YAML file
-    for yaml_file in yaml_files:
-        print(f"\nProcessing: {yaml_file.name}")
-        
-        # Load config file
-        config_data = load_yaml_file(str(yaml_file))
-        
-        # Check if config has services section
-        if 'services' not in config_data:
-            print(f"  - Warning: No 'services' section found in {yaml_file.name}")
-            continue
-        
-        # Update config with override
-        updated_config = update_config_with_override(config_data, override_data)
-        
-        # Save updated config
-        save_yaml_file(str(yaml_file), updated_config)
-        print(f"  - Successfully updated {yaml_file.name}")
-    
-    print(f"\nCOMPLETED: {len(yaml_files)} files updated successfully")
+    with profiling.stage('write_yaml'):
+        # Save updated configs: serialized across a process pool, each written atomically
+        try:
+            for path in yaml_io.write_yaml_files(updates, workers=workers, indent=2):
+                print(f"  - Successfully updated {Path(path).name}")
+        except Exception as e:
+            print(f"Error saving updated config files: {e}")
+            sys.exit(1)
+    
+    # Queue the changed files for `stake_from_supplier_config.py --changed-only`
+    recorded = add_changed_files(config_folder, [Path(path).name for path, _ in updates])
+    if recorded is not None:
+        print(f"Recorded {recorded} changed customer(s) in the generation manifest for --changed-only")
+    
+    print(f"\nCOMPLETED: {len(updates)} files updated successfully, {counts['unchanged']} left untouched")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replace the services of customer config YAML files with an override.")
+    parser.add_argument('--config-folder',
+                        help="Folder containing the customer config YAML files (prompted for if omitted)")
+    parser.add_argument('--override-file',
+                        help="Override YAML file with the services to apply (prompted for if omitted)")
+    parser.add_argument('--operators',
+                        help="Only update customers with these comma-separated operator addresses")
+    parser.add_argument('--operators-csv',
+                        help="Only update customers listed in this CSV's operator_address column")
+    parser.add_argument('--files',
+                        help="Only update files matching these comma-separated globs, e.g. 'customer_1*.yml'")
+    parser.add_argument('--workers', type=int,
+                        help="Worker processes for large folders (default: YAML_WRITE_WORKERS, then CPU count)")
+    cli_options.add_common_args(parser, network=False)
+    return cli_options.parse_args(parser, 'override_customer_services_config_files')
 
 
 def main():
     """Main function to handle user input and execute the script."""
+    args = parse_args()
     print("Customer Services Config Override Tool")
     print("=" * 50)
     print()
     
     # Get config folder from user
-    config_folder = get_user_input("Enter the folder path containing customer config YAML files")
+    config_folder = cli_options.ask(
+        args, 'config_folder', "Enter the folder path containing customer config YAML files: ").strip()
     
     # Get override file from user
-    override_file = get_user_input("Enter the path to the override YAML file")
+    override_file = cli_options.ask(args, 'override_file', "Enter the path to the override YAML file: ").strip()
     
     print()
     print("Configuration:")
@@ -157,7 +343,14 @@ def main():
     print(f"  Override file: {override_file}")
     print()
     
-    process_config_files(config_folder, override_file)
+    operators = None
+    if args.operators or args.operators_csv:
+        operators = [address.strip() for address in (args.operators or '').split(',') if address.strip()]
+        if args.operators_csv:
+            operators += read_operator_addresses(args.operators_csv)
+    file_globs = [pattern.strip() for pattern in args.files.split(',') if pattern.strip()] if args.files else None
+    
+    process_config_files(config_folder, override_file, args.yes, operators, file_globs, args.workers)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,126 @@
+"""
+Protobuf message classes for the poktroll transactions the scripts submit in-process.
+
+cosmpy ships the Cosmos SDK protos but none of the poktroll modules, so the
+handful of types needed for MsgStakeSupplier are declared here from their
+.proto definitions (pocket/shared/service.proto, pocket/supplier/tx.proto)
+and built into a private descriptor pool at import time. Only field numbers
+and types matter on the wire, so this stays compatible with the chain.
+"""
+
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+
+_F = descriptor_pb2.FieldDescriptorProto
+
+# RPCType enum values from pocket/shared/service.proto
+RPC_TYPES = {'UNKNOWN_RPC': 0, 'GRPC': 1, 'WEBSOCKET': 2, 'JSON_RPC': 3, 'REST': 4, 'COMET_BFT': 5}
+# ConfigOptions enum values from pocket/shared/service.proto
+CONFIG_OPTIONS = {'UNKNOWN_CONFIG': 0, 'TIMEOUT': 1}
+
+
+def _field(name, number, field_type, label=_F.LABEL_OPTIONAL, type_name=None):
+    field = _F(name=name, number=number, type=field_type, label=label)
+    if type_name:
+        field.type_name = type_name
+    return field
+
+
+def _enum(name, values):
+    enum = descriptor_pb2.EnumDescriptorProto(name=name)
+    for value_name, number in values.items():
+        enum.value.add(name=value_name, number=number)
+    return enum
+
+
+def _build_pool():
+    pool = descriptor_pool.DescriptorPool()
+
+    # Wire-compatible subset of cosmos/base/v1beta1/coin.proto (without the gogoproto options)
+    coin_file = descriptor_pb2.FileDescriptorProto(
+        name='cosmos/base/v1beta1/coin.proto', package='cosmos.base.v1beta1', syntax='proto3')
+    coin_file.message_type.add(name='Coin').field.extend([
+        _field('denom', 1, _F.TYPE_STRING),
+        _field('amount', 2, _F.TYPE_STRING),
+    ])
+    pool.Add(coin_file)
+
+    shared = descriptor_pb2.FileDescriptorProto(
+        name='pocket/shared/service.proto', package='pocket.shared', syntax='proto3')
+    shared.enum_type.extend([_enum('RPCType', RPC_TYPES), _enum('ConfigOptions', CONFIG_OPTIONS)])
+    shared.message_type.add(name='ConfigOption').field.extend([
+        _field('key', 1, _F.TYPE_ENUM, type_name='.pocket.shared.ConfigOptions'),
+        _field('value', 2, _F.TYPE_STRING),
+    ])
+    shared.message_type.add(name='SupplierEndpoint').field.extend([
+        _field('url', 1, _F.TYPE_STRING),
+        _field('rpc_type', 2, _F.TYPE_ENUM, type_name='.pocket.shared.RPCType'),
+        _field('configs', 3, _F.TYPE_MESSAGE, _F.LABEL_REPEATED, '.pocket.shared.ConfigOption'),
+    ])
+    # Field 2 is reserved (the former float percentage)
+    shared.message_type.add(name='ServiceRevenueShare').field.extend([
+        _field('address', 1, _F.TYPE_STRING),
+        _field('rev_share_percentage', 3, _F.TYPE_UINT64),
+    ])
+    shared.message_type.add(name='SupplierServiceConfig').field.extend([
+        _field('service_id', 1, _F.TYPE_STRING),
+        _field('endpoints', 2, _F.TYPE_MESSAGE, _F.LABEL_REPEATED, '.pocket.shared.SupplierEndpoint'),
+        _field('rev_share', 3, _F.TYPE_MESSAGE, _F.LABEL_REPEATED, '.pocket.shared.ServiceRevenueShare'),
+    ])
+    pool.Add(shared)
+
+    supplier = descriptor_pb2.FileDescriptorProto(
+        name='pocket/supplier/tx.proto', package='pocket.supplier', syntax='proto3',
+        dependency=[coin_file.name, shared.name])
+    supplier.message_type.add(name='MsgStakeSupplier').field.extend([
+        _field('signer', 1, _F.TYPE_STRING),
+        _field('owner_address', 2, _F.TYPE_STRING),
+        _field('operator_address', 3, _F.TYPE_STRING),
+        _field('stake', 4, _F.TYPE_MESSAGE, type_name='.cosmos.base.v1beta1.Coin'),
+        _field('services', 5, _F.TYPE_MESSAGE, _F.LABEL_REPEATED, '.pocket.shared.SupplierServiceConfig'),
+    ])
+    pool.Add(supplier)
+    return pool
+
+
+_pool = _build_pool()
+
+MsgStakeSupplier = message_factory.GetMessageClass(_pool.FindMessageTypeByName('pocket.supplier.MsgStakeSupplier'))
+
+
+def _parse_coin(value):
+    """Split a coin string such as '1000000upokt' into (amount, denom)."""
+    text = str(value).strip()
+    digits = len(text) - len(text.lstrip('0123456789'))
+    return text[:digits], text[digits:] or 'upokt'
+
+
+def _endpoint_configs(configs):
+    # Stake files give endpoint configs as a mapping, e.g. {timeout: 30}
+    items = configs.items() if isinstance(configs, dict) else ((c['key'], c['value']) for c in configs or [])
+    return [{'key': CONFIG_OPTIONS[str(key).upper()], 'value': str(value)} for key, value in items]
+
+
+def stake_supplier_msg(config_data, signer):
+    """Build a MsgStakeSupplier from a supplier stake config (the YAML pocketd --config reads)."""
+    msg = MsgStakeSupplier(
+        signer=signer,
+        owner_address=config_data['owner_address'],
+        operator_address=config_data['operator_address'],
+    )
+    if config_data.get('stake_amount'):
+        msg.stake.amount, msg.stake.denom = _parse_coin(config_data['stake_amount'])
+
+    default_rev_share = config_data.get('default_rev_share_percent') or {}
+    for service in config_data.get('services') or []:
+        config = msg.services.add(service_id=service['service_id'])
+        for endpoint in service.get('endpoints', []):
+            added = config.endpoints.add(
+                url=endpoint['publicly_exposed_url'],
+                rpc_type=RPC_TYPES[str(endpoint.get('rpc_type', 'JSON_RPC')).upper()],
+            )
+            for option in _endpoint_configs(endpoint.get('configs')):
+                added.configs.add(**option)
+        # As with pocketd, services without their own rev share use the default one
+        for address, pct in (service.get('rev_share_percent') or default_rev_share).items():
+            config.rev_share.add(address=address, rev_share_percentage=int(pct))
+    return msg
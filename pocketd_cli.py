@@ -0,0 +1,145 @@
+"""
+Helpers for running the pocketd CLI and reading its transaction output.
+
+All scripts that shell out to `pocketd` go through `run_pocketd()` so command
+execution and tx-result parsing live in one place.
+"""
+
+import json
+import math
+import os
+import re
+import subprocess
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import metrics
+import yaml_io
+
+_TX_HASH_RE = re.compile(r'"?txhash"?\s*:\s*"?([0-9A-Fa-f]{64})')
+_TX_CODE_RE = re.compile(r'^"?code"?\s*:\s*(\d+)', re.MULTILINE)
+
+
+def command_label(args: List[str]) -> str:
+    """The subcommand part of a pocketd invocation for metrics, e.g. 'tx bank multi-send' or 'keys add'."""
+    words = []
+    for arg in args:
+        if arg.startswith('-') or len(words) == 3:
+            break
+        words.append(arg)
+        # Arguments after `tx sign`/`tx broadcast`/`keys add` are files and names
+        if words[-1] in ('sign', 'broadcast', 'add', 'list'):
+            break
+    return ' '.join(words)
+
+
+def run_pocketd(args: List[str], input_text: Optional[str] = None,
+                timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+    """Run `pocketd <args>` and capture its output. Does not raise on a non-zero exit."""
+    with metrics.timer('pocketd_call', command=command_label(args)) as span:
+        process = subprocess.run(['pocketd'] + list(args), input=input_text, capture_output=True,
+                                 text=True, timeout=timeout)
+        if process.returncode != 0:
+            span.set(outcome='failed')
+    return process
+
+
+def parse_tx_response(output: str) -> dict:
+    """Extract the tx hash, result code and raw log from pocketd tx output (YAML or JSON)."""
+    response = None
+    for loader in (json.loads, yaml_io.load_yaml):
+        try:
+            parsed = loader(output)
+        except Exception:
+            continue
+        if isinstance(parsed, dict):
+            response = parsed
+            break
+
+    if response is not None:
+        return {
+            'tx_hash': response.get('txhash'),
+            'code': int(response.get('code', 0) or 0),
+            'raw_log': response.get('raw_log', ''),
+        }
+
+    # Output mixed with other text (e.g. gas estimates): fall back to regexes
+    tx_hash = _TX_HASH_RE.search(output)
+    code = _TX_CODE_RE.search(output)
+    return {
+        'tx_hash': tx_hash.group(1) if tx_hash else None,
+        'code': int(code.group(1)) if code else 0,
+        'raw_log': '',
+    }
+
+
+def tx_result(tx: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a parse_tx_response() dict into a result dict with the success flag, tx hash and error."""
+    if tx['code'] != 0:
+        return {'success': False, 'tx_hash': tx['tx_hash'], 'error': f"code {tx['code']}: {tx['raw_log']}"}
+    return {'success': True, 'tx_hash': tx['tx_hash'], 'error': None}
+
+
+def broadcast_result(process: subprocess.CompletedProcess) -> Dict[str, Any]:
+    """Result dict for a finished `pocketd tx` command; a non-zero exit fails with its stderr."""
+    if process.returncode != 0:
+        return {'success': False, 'tx_hash': None,
+                'error': process.stderr.strip() or f"pocketd exited with code {process.returncode}"}
+    return tx_result(parse_tx_response(process.stdout))
+
+
+def sequence_flags(lease=None) -> List[str]:
+    """Replay-protection flags: --unordered with a timeout, or the explicit account number and sequence of `lease`."""
+    if lease is None:
+        return ['--unordered', "--timeout-duration=1m"]
+    return [f"--account-number={lease.account_number}", f"--sequence={lease.sequence}"]
+
+
+def generate_unsigned_tx(args: List[str]) -> Dict[str, Any]:
+    """Run a `pocketd tx ...` command with --generate-only and return the unsigned tx JSON."""
+    process = run_pocketd(list(args) + ['--generate-only', '--output=json'])
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip() or f"pocketd exited with code {process.returncode}")
+    return json.loads(process.stdout)
+
+
+def combine_unsigned_txs(txs: List[Dict[str, Any]], gas_per_msg: int, gas_price: float = 1.0,
+                         denom: str = 'upokt') -> Dict[str, Any]:
+    """Merge the messages of several unsigned txs into one tx with a fee sized for all of them."""
+    combined = json.loads(json.dumps(txs[0]))
+    combined['body']['messages'] = [msg for tx in txs for msg in tx['body']['messages']]
+    gas_limit = gas_per_msg * len(combined['body']['messages'])
+    fee = combined['auth_info']['fee']
+    fee['gas_limit'] = str(gas_limit)
+    fee['amount'] = [{'denom': denom, 'amount': str(math.ceil(gas_limit * gas_price))}]
+    combined['signatures'] = []
+    return combined
+
+
+def sign_and_broadcast(unsigned_tx: Dict[str, Any], from_address: str, network: str,
+                       keyring_backend: str = 'test') -> Dict[str, Any]:
+    """Sign an unsigned tx with the local keyring and broadcast it.
+
+    Returns the parse_tx_response() dict. Raises RuntimeError if signing or
+    broadcasting fails before a tx response is produced.
+    """
+    with tempfile.TemporaryDirectory(prefix='pocketd-tx-') as workdir:
+        unsigned_path = os.path.join(workdir, 'unsigned.json')
+        signed_path = os.path.join(workdir, 'signed.json')
+        with open(unsigned_path, 'w') as f:
+            json.dump(unsigned_tx, f)
+
+        process = run_pocketd([
+            'tx', 'sign', unsigned_path,
+            f"--from={from_address}",
+            f"--network={network}",
+            f"--keyring-backend={keyring_backend}",
+            f"--output-document={signed_path}",
+        ])
+        if process.returncode != 0:
+            raise RuntimeError(f"signing failed: {process.stderr.strip()}")
+
+        process = run_pocketd(['tx', 'broadcast', signed_path, f"--network={network}"])
+        if process.returncode != 0:
+            raise RuntimeError(f"broadcast failed: {process.stderr.strip()}")
+        return parse_tx_response(process.stdout)
@@ -0,0 +1,167 @@
+"""
+Shared HTTP client for the poktroll REST API.
+
+Every script that talks to the REST gateway should go through `get_client()`
+so requests reuse a keep-alive connection pool, transient failures (429/5xx,
+connection resets, timeouts) are retried with exponential backoff, and
+per-request latency is captured for reporting.
+
+Usage:
+    from pokt_api import get_client
+
+    client = get_client(network)
+    data = client.get_json(f"/pokt-network/poktroll/supplier/supplier/{address}")
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def api_base_url(network: str) -> str:
+    """Return the REST gateway base URL for a network (alpha, beta, main).
+
+    POKT_API_URL overrides it, e.g. to point at tools/mock_pokt_api.py.
+    """
+    return os.getenv('POKT_API_URL') or f"https://shannon-testnet-grove-api.{network}.poktroll.com"
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as an HTTP date."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class PoktApiClient:
+    """Pooled, retrying REST client bound to a single base URL."""
+
+    def __init__(self, base_url: str, pool_size: int = 32, max_retries: int = 5,
+                 backoff_factor: float = 0.5, max_backoff: float = 30.0, timeout: float = 30.0):
+        self.base_url = base_url.rstrip('/')
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.retries = 0
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        if response is not None:
+            retry_after = _retry_after_seconds(response)
+            if retry_after is not None:
+                return min(retry_after, self.max_backoff)
+        delay = self.backoff_factor * (2 ** attempt)
+        # Full jitter keeps concurrent workers from retrying in lockstep
+        return random.uniform(0, min(delay, self.max_backoff))
+
+    def _record(self, elapsed: float, retried: bool, outcome: str) -> None:
+        with self._lock:
+            self.latencies.append(elapsed)
+            if retried:
+                self.retries += 1
+        metrics.observe('api_request', elapsed, outcome=outcome)
+        if retried:
+            metrics.inc('api_retries', reason=outcome)
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """GET `path`, retrying transient failures. Raises RequestException when retries run out."""
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(time.perf_counter() - start, attempt < self.max_retries, 'connection_error')
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            retryable = response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries
+            self._record(time.perf_counter() - start, retryable, str(response.status_code))
+            if retryable:
+                time.sleep(self._backoff(attempt, response))
+                attempt += 1
+                continue
+
+            response.raise_for_status()
+            return response
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """GET `path` and decode the JSON body."""
+        return self.get(path, params=params).json()
+
+    def iter_pages(self, path: str, page_size: int = 500,
+                   params: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield each page of a paginated Cosmos list endpoint, following pagination.next_key."""
+        params = dict(params or {})
+        params['pagination.limit'] = page_size
+        while True:
+            page = self.get_json(path, params=params)
+            yield page
+            next_key = (page.get('pagination') or {}).get('next_key')
+            if not next_key:
+                return
+            params['pagination.key'] = next_key
+
+    def latency_summary(self) -> Dict[str, float]:
+        """Return request count, retry count and latency percentiles in milliseconds."""
+        with self._lock:
+            samples = sorted(self.latencies)
+            retries = self.retries
+        if not samples:
+            return {'requests': 0, 'retries': retries}
+
+        def percentile(pct: float) -> float:
+            return samples[min(len(samples) - 1, int(pct * len(samples)))] * 1000
+
+        return {
+            'requests': len(samples),
+            'retries': retries,
+            'p50_ms': round(percentile(0.50), 1),
+            'p95_ms': round(percentile(0.95), 1),
+            'max_ms': round(samples[-1] * 1000, 1),
+        }
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_clients: Dict[str, PoktApiClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(network: str) -> PoktApiClient:
+    """Return the shared client for `network`, creating it on first use."""
+    with _clients_lock:
+        if network not in _clients:
+            _clients[network] = PoktApiClient(api_base_url(network))
+        return _clients[network]
@@ -0,0 +1,219 @@
+"""
+Opt-in profiling for the pipeline scripts (--profile).
+
+A profiled run is split into stages: the script's own `profiling.stage()`
+blocks, with everything outside them counted under 'main'. Two profilers run
+side by side:
+
+- cProfile, one profile per stage, for exact call counts and times on the
+  main thread;
+- a wall-clock sampler that walks every thread's stack every few
+  milliseconds, so worker pools and time spent waiting on pocketd or the
+  API show up too.
+
+At exit the profile directory gets, per run:
+
+    <script>-<timestamp>.profile.txt    per-stage wall time, hottest functions by
+                                        own and cumulative time, hottest sampled frames
+    <script>-<timestamp>.collapsed      "stage;frame;frame... count" lines for
+                                        flamegraph.pl, inferno or speedscope
+    <script>-<timestamp>-<stage>.pstats raw cProfile data (e.g. for snakeviz)
+
+Stage blocks cost nothing while profiling is off.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+# cProfile, pstats and io are imported on first use: every script imports this
+# module for its stage markers, but only profiled runs need them
+
+DEFAULT_PROFILE_DIR = 'profiles'
+SAMPLE_INTERVAL = 0.005
+REPORT_LIMIT = 25
+ROOT_STAGE = 'main'
+
+_profiler = None
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle_worker(stack) -> bool:
+    """True for a pool thread blocked waiting for its next work item."""
+    for caller, callee in zip(stack, stack[1:]):
+        if (caller.co_name == '_worker' and caller.co_filename.endswith(os.path.join('concurrent', 'futures', 'thread.py'))
+                and callee.co_name == 'get' and callee.co_filename.endswith('queue.py')):
+            return True
+    return False
+
+
+class Profiler:
+    """Per-stage cProfile plus a wall-clock stack sampler for one script run."""
+
+    def __init__(self, script: str, directory: str, interval: float = SAMPLE_INTERVAL):
+        self.script = script
+        self.directory = directory
+        self.interval = interval
+        self.started_at = time.time()
+        self.profiles: Dict[str, 'cProfile.Profile'] = {}
+        self.wall: Counter = Counter()
+        self.stack: List[List] = []
+        # (stage, frame labels root -> leaf) -> sample count
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name='profiling-sampler', daemon=True)
+
+    def start(self) -> None:
+        self._enter(ROOT_STAGE)
+        self._sampler.start()
+
+    # Stack entries are [name, profile, resumed_at]: a stage's wall time only
+    # runs while it is the innermost one, so nested stages are not double counted
+    def _enter(self, name: str) -> None:
+        import cProfile
+        now = time.perf_counter()
+        if self.stack:
+            parent = self.stack[-1]
+            parent[1].disable()
+            self.wall[parent[0]] += now - parent[2]
+        profile = self.profiles.setdefault(name, cProfile.Profile())
+        self.stack.append([name, profile, now])
+        profile.enable()
+
+    def _exit(self) -> None:
+        name, profile, resumed_at = self.stack.pop()
+        profile.disable()
+        now = time.perf_counter()
+        self.wall[name] += now - resumed_at
+        if self.stack:
+            parent = self.stack[-1]
+            parent[2] = now
+            parent[1].enable()
+
+    @contextmanager
+    def stage(self, name: str):
+        # cProfile only sees the thread that enabled it; stages opened on other threads are left to the sampler
+        if threading.current_thread() is not threading.main_thread():
+            yield
+            return
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def current_stage(self) -> str:
+        try:
+            return self.stack[-1][0]
+        except IndexError:
+            # The main thread popped the last stage between our check and read
+            return ROOT_STAGE
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            stage = self.current_stage()
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                codes = []
+                while frame is not None:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                codes.reverse()
+                if _is_idle_worker(codes):
+                    continue
+                self.samples[(stage, tuple(_frame_label(code) for code in codes))] += 1
+
+    def stop(self) -> None:
+        while self.stack:
+            self._exit()
+        self._stop.set()
+        self._sampler.join()
+
+    def report(self) -> str:
+        """The text report: stages by wall time, then each stage's hot functions."""
+        import io
+        import pstats
+        out = io.StringIO()
+        total = sum(self.wall.values())
+        out.write(f"Profile of {self.script} started {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at))}\n")
+        out.write(f"Sampling every {self.interval * 1000:g} ms across all threads; cProfile on the main thread.\n")
+        out.write("Wall time excludes nested stages; 'main' is everything outside a stage.\n\n")
+        out.write(f"{'stage':<28} {'wall_s':>9} {'share':>7} {'samples':>8}\n")
+        stage_samples = Counter()
+        for (stage, _), count in self.samples.items():
+            stage_samples[stage] += count
+        for name, seconds in self.wall.most_common():
+            share = seconds / total if total else 0.0
+            out.write(f"{name:<28} {seconds:>9.3f} {share:>7.1%} {stage_samples[name]:>8}\n")
+
+        for name, _ in self.wall.most_common():
+            out.write(f"\n{'=' * 78}\nStage: {name} ({self.wall[name]:.3f}s wall)\n{'=' * 78}\n")
+            leaves = Counter()
+            for (stage, frames), count in self.samples.items():
+                if stage == name and frames:
+                    leaves[frames[-1]] += count
+            if leaves:
+                out.write("\nHottest sampled frames (all threads, including waits):\n")
+                for label, count in leaves.most_common(REPORT_LIMIT):
+                    out.write(f"  {count:>7}  {count / stage_samples[name]:>6.1%}  {label}\n")
+            stats = pstats.Stats(self.profiles[name], stream=out)
+            if not stats.stats:
+                continue
+            stats.strip_dirs()
+            out.write("\ncProfile, by own time:\n")
+            stats.sort_stats('tottime').print_stats(REPORT_LIMIT)
+            out.write("cProfile, by cumulative time:\n")
+            stats.sort_stats('cumulative').print_stats(REPORT_LIMIT)
+        return out.getvalue()
+
+    def collapsed(self) -> str:
+        return ''.join(f"{';'.join((stage,) + frames)} {count}\n"
+                       for (stage, frames), count in sorted(self.samples.items()))
+
+    def export(self) -> str:
+        """Write the report, collapsed stacks and per-stage pstats; returns the report path."""
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at))
+        base = os.path.join(self.directory, f"{self.script}-{stamp}")
+        with open(f"{base}.profile.txt", 'w', encoding='utf-8') as f:
+            f.write(self.report())
+        with open(f"{base}.collapsed", 'w', encoding='utf-8') as f:
+            f.write(self.collapsed())
+        for name, profile in self.profiles.items():
+            profile.dump_stats(f"{base}-{name}.pstats")
+        return f"{base}.profile.txt"
+
+
+def enable(script: str, directory: Optional[str] = None) -> Profiler:
+    """Start profiling the rest of the run; results are written to `directory` at exit."""
+    import atexit
+    global _profiler
+    _profiler = Profiler(script, directory or DEFAULT_PROFILE_DIR)
+    atexit.register(_export_at_exit, _profiler)
+    _profiler.start()
+    return _profiler
+
+
+def _export_at_exit(profiler: Profiler) -> None:
+    profiler.stop()
+    try:
+        path = profiler.export()
+        print(f"Profile written to {path} (collapsed stacks and pstats alongside)")
+    except OSError as e:
+        print(f"Warning: could not write profile to {profiler.directory}: {e}")
+
+
+def stage(name: str):
+    """Context manager marking a pipeline stage; a no-op unless --profile is on."""
+    if _profiler is None:
+        return nullcontext()
+    return _profiler.stage(name)
@@ -0,0 +1,39 @@
+"""
+Thread-safe token-bucket rate limiter shared by the pipeline scripts.
+
+Used wherever many workers talk to the same remote (the poktroll REST API,
+the pocketd CLI) and a fixed `time.sleep()` between calls used to be the only
+throttle.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Allow at most `rate` acquisitions per second, with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until `tokens` tokens are available, then consume them."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
@@ -0,0 +1,130 @@
+"""
+Local account-sequence allocation for pipelined transaction submission.
+
+Every `pocketd tx` invocation normally queries the signer's account sequence
+itself, so concurrent txs from one signer collide and the scripts fall back to
+--unordered. A SequenceAllocator queries the account number and sequence once
+per signer, hands out consecutive sequences to concurrent submitters, and
+resyncs from the chain's "account sequence mismatch, expected X, got Y" error
+when a tx is rejected.
+"""
+
+import re
+import threading
+import time
+from collections import namedtuple
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import metrics
+
+_MISMATCH_RE = re.compile(r'account sequence mismatch,? expected (\d+),? got (\d+)', re.IGNORECASE)
+
+# A handed-out sequence; `epoch` identifies the allocator state it came from
+Lease = namedtuple('Lease', ['account_number', 'sequence', 'epoch'])
+
+DEFAULT_MAX_ATTEMPTS = 4
+# How long to wait for earlier in-flight sequences before resyncing
+DEFAULT_AHEAD_WAIT = 1.0
+
+
+def parse_sequence_mismatch(error: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Return (expected, got) from a sequence mismatch error, or None for any other error."""
+    match = _MISMATCH_RE.search(error or '')
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+
+def rest_account_query(network: str) -> Callable[[str], Tuple[int, int]]:
+    """Return a query function reading (account_number, sequence) from the network's REST API."""
+    from pokt_api import get_client
+
+    def query(address: str) -> Tuple[int, int]:
+        account = get_client(network).get_json(f"/cosmos/auth/v1beta1/accounts/{address}")['account']
+        # Vesting and module accounts nest the fields under base_account
+        account = account.get('base_account', account)
+        return int(account.get('account_number', 0)), int(account.get('sequence', 0))
+
+    return query
+
+
+class SequenceAllocator:
+    """Thread-safe per-signer sequence counter backed by `query(address) -> (account_number, sequence)`."""
+
+    def __init__(self, query: Callable[[str], Tuple[int, int]]):
+        self.query = query
+        self._accounts: Dict[str, Dict[str, int]] = {}
+        self._signer_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _signer_lock(self, address: str) -> threading.Lock:
+        with self._lock:
+            return self._signer_locks.setdefault(address, threading.Lock())
+
+    def allocate(self, address: str) -> Lease:
+        """Hand out the next sequence for `address`, querying the chain on first use."""
+        with self._signer_lock(address):
+            account = self._accounts.get(address)
+            if account is None:
+                number, sequence = self.query(address)
+                account = self._accounts[address] = {'number': number, 'next': sequence, 'epoch': 0}
+            lease = Lease(account['number'], account['next'], account['epoch'])
+            account['next'] += 1
+            return lease
+
+    def resync(self, address: str, lease: Lease, expected: Optional[int] = None) -> None:
+        """Reset the counter after `lease` was rejected.
+
+        Uses the sequence the chain reported when known, otherwise re-queries
+        the account. Ignored if another submitter already resynced since
+        `lease` was handed out, so one bad sequence does not reset the
+        counter once per in-flight tx.
+        """
+        with self._signer_lock(address):
+            account = self._accounts.get(address)
+            if account is None or account['epoch'] != lease.epoch:
+                return
+            if expected is None:
+                account['number'], expected = self.query(address)
+            account['next'] = expected
+            account['epoch'] += 1
+
+
+def submit_ordered(allocator: SequenceAllocator, address: str, submit: Callable[[Lease], Dict[str, Any]],
+                   max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                   ahead_wait: float = DEFAULT_AHEAD_WAIT) -> Dict[str, Any]:
+    """Run `submit(lease)` with an allocated sequence, retrying on sequence mismatches.
+
+    `submit` returns a result dict with an 'error' entry. A tx that arrived
+    ahead of earlier in-flight sequences is retried with the same sequence
+    after `ahead_wait`; a stale sequence (or a gap that does not close)
+    resyncs the allocator and retries with a fresh one. A failed account
+    query ends the attempt with a failed result instead of raising.
+    """
+    try:
+        lease = allocator.allocate(address)
+    except Exception as e:
+        return _query_failed(address, e)
+    result = {'success': False, 'tx_hash': None, 'error': None}
+    for attempt in range(max_attempts):
+        result = submit(lease)
+        mismatch = parse_sequence_mismatch(result.get('error'))
+        if result.get('success') or mismatch is None or attempt == max_attempts - 1:
+            return result
+        expected, got = mismatch
+        if got > expected and attempt < max_attempts - 2:
+            metrics.inc('tx_sequence_retries', reason='ahead')
+            time.sleep(ahead_wait)
+            continue
+        metrics.inc('tx_sequence_retries', reason='stale')
+        try:
+            allocator.resync(address, lease, expected)
+            lease = allocator.allocate(address)
+        except Exception as e:
+            return _query_failed(address, e)
+    return result
+
+
+def _query_failed(address: str, error: Exception) -> Dict[str, Any]:
+    print(f"Error getting the account sequence for {address}: {error}")
+    return {'success': False, 'tx_hash': None, 'error': f"account sequence query failed: {error}"}
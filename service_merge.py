@@ -0,0 +1,156 @@
+"""
+Merge allocated services into a supplier's existing services.
+
+Services are matched by service_id through an index, so merging stays linear
+no matter how many services a supplier already has on-chain.
+
+Policies (for a service_id present on both sides with different definitions):
+    keep-existing    - keep the existing definition (default)
+    allocation-wins  - replace it with the allocated definition
+    union-endpoints  - keep the existing definition and append any allocated
+                       endpoints it does not already list
+
+Service patches (used by override_customer_services_config_files.py) go
+through the same index: they remove, replace or add individual service_ids
+and leave every other service as it was.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+MERGE_POLICIES = ('keep-existing', 'allocation-wins', 'union-endpoints')
+DEFAULT_MERGE_POLICY = 'keep-existing'
+PATCH_OPERATIONS = ('remove', 'replace', 'add')
+
+
+def _endpoint_key(endpoint: Dict[str, Any]) -> Tuple[Any, Any]:
+    return endpoint.get('publicly_exposed_url'), endpoint.get('rpc_type')
+
+
+def _union_endpoints(existing: Dict[str, Any], allocated: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(existing)
+    endpoints = list(existing.get('endpoints', []))
+    seen = {_endpoint_key(endpoint) for endpoint in endpoints}
+    for endpoint in allocated.get('endpoints', []):
+        if _endpoint_key(endpoint) not in seen:
+            seen.add(_endpoint_key(endpoint))
+            endpoints.append(endpoint)
+    merged['endpoints'] = endpoints
+    if 'rev_share_percent' not in merged and 'rev_share_percent' in allocated:
+        merged['rev_share_percent'] = allocated['rev_share_percent']
+    return merged
+
+
+def merge_services(existing: List[Dict[str, Any]], allocated: List[Dict[str, Any]],
+                   policy: str = DEFAULT_MERGE_POLICY) -> Tuple[List[Dict[str, Any]], Dict[str, List[str]]]:
+    """Merge `allocated` services into `existing` according to `policy`.
+
+    Existing services keep their order and new services are appended in
+    allocation order. When the allocation lists a service_id more than once,
+    the first entry is used. Returns the merged list and a report with the
+    service_ids that were 'added', 'kept' (already present and identical) or
+    'conflicted' (present with a different definition, resolved by `policy`).
+    """
+    if policy not in MERGE_POLICIES:
+        raise ValueError(f"Unknown merge policy '{policy}', expected one of {MERGE_POLICIES}")
+
+    services = list(existing)
+    index = {}
+    for position, service in enumerate(services):
+        index.setdefault(service['service_id'], position)
+
+    report = {'added': [], 'kept': [], 'conflicted': []}
+    allocated_ids = set()
+    for service in allocated:
+        service_id = service['service_id']
+        if service_id in allocated_ids:
+            continue
+        allocated_ids.add(service_id)
+
+        position = index.get(service_id)
+        if position is None:
+            index[service_id] = len(services)
+            services.append(service)
+            report['added'].append(service_id)
+            continue
+
+        current = services[position]
+        if current == service:
+            report['kept'].append(service_id)
+            continue
+
+        report['conflicted'].append(service_id)
+        if policy == 'allocation-wins':
+            services[position] = service
+        elif policy == 'union-endpoints':
+            services[position] = _union_endpoints(current, service)
+
+    return services, report
+
+
+def validate_service_patch(patch: Any) -> None:
+    """Raise ValueError unless `patch` is a mapping of PATCH_OPERATIONS to lists.
+
+    'remove' lists service_ids; 'replace' and 'add' list service definitions.
+    """
+    if not isinstance(patch, dict):
+        raise ValueError("patch must be a mapping with 'remove', 'replace' and/or 'add'")
+    unknown = set(patch) - set(PATCH_OPERATIONS)
+    if unknown:
+        raise ValueError(f"unknown patch operation(s) {', '.join(sorted(map(str, unknown)))}, "
+                         f"expected {PATCH_OPERATIONS}")
+    for operation in PATCH_OPERATIONS:
+        entries = patch.get(operation) or []
+        if not isinstance(entries, list):
+            raise ValueError(f"patch '{operation}' must be a list")
+        for entry in entries:
+            if operation == 'remove':
+                if not isinstance(entry, str):
+                    raise ValueError(f"patch 'remove' must list service_ids, got {entry!r}")
+            elif not isinstance(entry, dict) or not entry.get('service_id'):
+                raise ValueError(f"every service in patch '{operation}' needs a service_id")
+
+
+def apply_service_patch(existing: List[Dict[str, Any]],
+                        patch: Dict[str, List[Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, List[str]]]:
+    """Apply a validated service patch to `existing`.
+
+    Operations run in the order remove, replace, add:
+        remove   - drop these service_ids
+        replace  - swap in a new definition for service_ids already present
+                   (missing ones are left out and reported as 'missing')
+        add      - append services whose service_id is not present yet
+                   (present ones are left alone and reported as 'present')
+    Listing a service under both 'replace' and 'add' upserts it. Returns the
+    patched list and a report of the service_ids per outcome; 'removed',
+    'replaced' and 'added' only list real changes.
+    """
+    report = {'removed': [], 'replaced': [], 'added': [], 'missing': [], 'present': []}
+    remove_ids = set(patch.get('remove') or [])
+    services = []
+    for service in existing:
+        if service['service_id'] in remove_ids:
+            report['removed'].append(service['service_id'])
+        else:
+            services.append(service)
+
+    index = {}
+    for position, service in enumerate(services):
+        index.setdefault(service['service_id'], position)
+
+    for service in patch.get('replace') or []:
+        position = index.get(service['service_id'])
+        if position is None:
+            report['missing'].append(service['service_id'])
+        elif services[position] != service:
+            services[position] = service
+            report['replaced'].append(service['service_id'])
+
+    for service in patch.get('add') or []:
+        if service['service_id'] in index:
+            report['present'].append(service['service_id'])
+            continue
+        index[service['service_id']] = len(services)
+        services.append(service)
+        report['added'].append(service['service_id'])
+
+    return services, report
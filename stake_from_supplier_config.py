@@ -1,26 +1,79 @@
 #!/usr/bin/env python3
 
-import csv
+import argparse
 import os
-import yaml
-import subprocess
-from google.protobuf.message import Message
 import json
-from dotenv import load_dotenv
-import time
+from concurrent.futures import ThreadPoolExecutor
 
+import cli_options
+import profiling
+from job_journal import FAILED, STARTED, SUCCEEDED, JobJournal, default_journal_path
+from output_manifest import clear_changed_files, file_sha256, load_changed_files
+from pocketd_cli import broadcast_result, run_pocketd, sequence_flags
+from rate_limiter import TokenBucket
+from sequence_manager import SequenceAllocator, rest_account_query, submit_ordered
+from supplier_cache import SupplierCache
+from yaml_io import load_yaml_file
 
-def stake_wallet(config_file, network, is_owner):
-    """Execute the stake supplier command using the CLI."""
+# One stake command every 2 seconds unless --rate says otherwise
+DEFAULT_STAKE_RATE = 0.5
+
+
+def submit_stake(config_file, from_address, network, lease=None):
+    """Run `pocketd tx supplier stake-supplier` for one config file.
+
+    Uses --unordered, or the account number and sequence of `lease` when
+    given. Returns a result dict with the success flag, tx hash and error.
+    """
+    args = [
+        "tx", "supplier", "stake-supplier",
+        f"--config={config_file}",
+        f"--from={from_address}",
+        "--gas=auto",
+        "--gas-prices=1upokt",
+        "--gas-adjustment=1.5",
+        "--yes",
+        f"--network={network}",
+        "--keyring-backend=test"
+    ] + sequence_flags(lease)
+    
+    try:
+        print(f"Executing stake command for {config_file} using address: {from_address}")
+        print("Command:", " ".join(["pocketd"] + args))
+        process = run_pocketd(args)
+        result = broadcast_result(process)
+        if process.returncode != 0:
+            print(f"Error executing stake command for {config_file}")
+            print(f"Command output: {process.stdout}")
+            print(f"Command error: {process.stderr}")
+        elif not result['success']:
+            print(f"Stake transaction for {config_file} failed with {result['error']}")
+        else:
+            print(f"Successfully staked using {from_address} (tx: {result['tx_hash']})")
+        return result
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return {'success': False, 'tx_hash': None, 'error': str(e)}
+
+def stake_wallet(config_file, network, is_owner, backend=None, allocator=None):
+    """Execute the stake supplier command using the CLI, or in-process when `backend` is given.
+
+    With `allocator`, pocketd txs are signed with locally allocated
+    sequences instead of --unordered. Returns a result dict with the file,
+    signing address, success flag, tx hash (when broadcast) and error
+    message (on failure).
+    """
+    result = {'file': config_file, 'from_address': None, 'success': False, 'tx_hash': None, 'error': None}
+    
     # Read the config file to get the addresses
-    with open(config_file, 'r') as f:
-        config_data = yaml.safe_load(f)
+    config_data = load_yaml_file(config_file)
     
     # Get the addresses from default_rev_share_percent
     rev_share_addresses = list(config_data['default_rev_share_percent'].keys())
     if len(rev_share_addresses) != 2:
         print(f"Error: Expected exactly 2 addresses in default_rev_share_percent for {config_file}")
-        return False
+        result['error'] = "Expected exactly 2 addresses in default_rev_share_percent"
+        return result
     
     # First address is owner, second address is revshare
     owner_address = rev_share_addresses[0]
@@ -28,56 +81,205 @@ def stake_wallet(config_file, network, is_owner):
     
     # Use owner address if user is owner, otherwise use revshare address
     from_address = owner_address if is_owner else revshare_address
+    result['from_address'] = from_address
     
-    cmd = [
-        "pocketd", "tx", "supplier", "stake-supplier",
-        f"--config={config_file}",
-        f"--from={from_address}",
-        "--gas=auto",
-        "--gas-prices=1upokt",
-        "--gas-adjustment=1.5",
-        "--yes",
-        f"--network={network}",
-        "--keyring-backend=test", "--unordered", "--timeout-duration=1m"
-    ]
+    if backend is not None:
+        print(f"Staking {config_file} in-process using address: {from_address}")
+        tx = backend.stake_suppliers(from_address, [config_data])
+        result.update(tx)
+        if tx['success']:
+            print(f"Successfully staked using {from_address} (tx: {tx['tx_hash']})")
+        else:
+            print(f"Error staking {config_file}: {tx['error']}")
+        return result
     
-    try:
-        print(f"Executing stake command for {config_file} using address: {from_address}")
-        print("Command:", " ".join(cmd))
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        print(f"Successfully staked using {from_address}")
-        print(result.stdout)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing stake command: {e}")
-        print(f"Command output: {e.stdout}")
-        print(f"Command error: {e.stderr}")
-        return False
-    except Exception as e:
-        print(f"Unexpected error: {e}")
-        return False
+    if allocator is not None:
+        tx = submit_ordered(allocator, from_address,
+                            lambda lease: submit_stake(config_file, from_address, network, lease))
+    else:
+        tx = submit_stake(config_file, from_address, network)
+    result.update(tx)
+    return result
+
+def journal_item(config_file):
+    """Journal key for a config file: its name plus a content hash, so edited files are restaked.
+
+    Returns None if the file does not exist.
+    """
+    digest = file_sha256(config_file)
+    if digest is None:
+        return None
+    return f"{os.path.basename(config_file)}:{digest[:16]}"
+
+def stake_files(config_files, network, is_owner, concurrency=1, rate=DEFAULT_STAKE_RATE, journal=None, backend=None,
+                allocator=None):
+    """Stake every config file with up to `concurrency` pocketd processes in flight.
+
+    `rate` caps how many stake commands start per second. Each attempt is
+    recorded in `journal` when given. Returns the result dicts in the same
+    order as `config_files`.
+    """
+    bucket = TokenBucket(rate, capacity=1)
+    
+    def stake_one(config_file):
+        item = journal_item(config_file) if journal else None
+        if journal and item is None:
+            print(f"Error: {config_file} not found")
+            return {'file': config_file, 'from_address': None, 'success': False, 'tx_hash': None,
+                    'error': "config file not found"}
+        bucket.acquire()
+        if journal:
+            journal.record(item, STARTED)
+        try:
+            result = stake_wallet(config_file, network, is_owner, backend, allocator)
+        except Exception as e:
+            print(f"Error processing {config_file}: {e}")
+            result = {'file': config_file, 'from_address': None, 'success': False, 'tx_hash': None, 'error': str(e)}
+        if journal:
+            journal.record(item, SUCCEEDED if result['success'] else FAILED,
+                           tx_hash=result['tx_hash'], error=result['error'])
+        return result
+    
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        return list(executor.map(stake_one, config_files))
+
+def _normalize_services(services, default_rev_share=None):
+    """Key services by service_id with order-insensitive endpoints and effective rev share."""
+    normalized = {}
+    for service in services or []:
+        endpoints = sorted(json.dumps(endpoint, sort_keys=True) for endpoint in service.get('endpoints', []))
+        # On-chain, a service without its own rev share gets the default one
+        rev_share = service.get('rev_share_percent') or default_rev_share or {}
+        normalized[service['service_id']] = {
+            'endpoints': endpoints,
+            'rev_share_percent': {address: int(pct) for address, pct in rev_share.items() if int(pct) != 0},
+        }
+    return normalized
+
+def normalize_config(config_data):
+    """Reduce a supplier config YAML to the comparable fields of fetch_supplier_info's output."""
+    return {
+        'owner_address': config_data['owner_address'],
+        'operator_address': config_data['operator_address'],
+        'stake_amount': int(str(config_data['stake_amount']).replace('upokt', '')) // 1000000,
+        'services': _normalize_services(config_data.get('services'), config_data.get('default_rev_share_percent')),
+    }
+
+def normalize_supplier_info(supplier_info):
+    """Reduce fetch_supplier_info output to the same comparable shape as normalize_config."""
+    return {
+        'owner_address': supplier_info['owner_address'],
+        'operator_address': supplier_info['operator_address'],
+        'stake_amount': int(supplier_info['stake_amount']),
+        'services': _normalize_services(supplier_info.get('existing_services')),
+    }
+
+def filter_converged(config_paths, cache=None):
+    """Drop configs whose on-chain supplier already matches them.
+
+    Supplier records are fetched in one pass (bulk listing or concurrent
+    per-address fetches, reusing `cache` when given). Configs that cannot be
+    read or compared are kept, so they are still broadcast.
+    """
+    # Deferred import: only this pre-flight check needs the supplier fetcher
+    from generate_supplier_config import resolve_supplier_infos
+    
+    configs = {}
+    for path in config_paths:
+        try:
+            configs[path] = normalize_config(load_yaml_file(path))
+        except Exception as e:
+            print(f"Warning: Could not normalize {path} for comparison ({e}); it will be staked")
+    
+    operator_addresses = list(dict.fromkeys(c['operator_address'] for c in configs.values()))
+    on_chain = dict(zip(operator_addresses, resolve_supplier_infos(operator_addresses, cache)))
+    
+    remaining = []
+    for path in config_paths:
+        config = configs.get(path)
+        supplier_info = on_chain.get(config['operator_address']) if config else None
+        if supplier_info and normalize_supplier_info(supplier_info) == config:
+            print(f"Skipping {os.path.basename(path)}: on-chain supplier already matches")
+            continue
+        remaining.append(path)
+    return remaining
+
+def write_summary(results, summary_file):
+    """Print and save a summary of successes, failures and tx hashes."""
+    succeeded = [r for r in results if r['success']]
+    failed = [r for r in results if not r['success']]
+    summary = {
+        'total': len(results),
+        'succeeded': len(succeeded),
+        'failed': len(failed),
+        'results': results,
+    }
+    with open(summary_file, 'w') as f:
+        json.dump(summary, f, indent=2)
+    
+    print(f"\nStaked {len(succeeded)}/{len(results)} suppliers successfully")
+    for r in failed:
+        print(f"  FAILED {r['file']}: {r['error']}")
+    print(f"Summary written to {summary_file}")
+    return summary
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stake suppliers from generated supplier config YAML files.")
+    parser.add_argument('--changed-only', action='store_true',
+                        help="Only stake files changed (by generation or an override) since the last staking run")
+    parser.add_argument('--skip-converged', action='store_true',
+                        help="Compare each config with the on-chain supplier and only stake those that differ")
+    parser.add_argument('--use-cache', action='store_true',
+                        help="With --skip-converged, accept cached supplier records younger than "
+                             "SUPPLIER_CACHE_TTL instead of re-fetching them")
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help="Number of pocketd stake commands to run at once (default: 1)")
+    parser.add_argument('--rate', type=float, default=DEFAULT_STAKE_RATE,
+                        help=f"Maximum stake commands started per second (default: {DEFAULT_STAKE_RATE})")
+    parser.add_argument('--ordered', action='store_true',
+                        help="Sign with locally allocated account sequences instead of --unordered, so several stake "
+                             "txs per signer can be in flight (pocketd backend)")
+    parser.add_argument('--backend', choices=['pocketd', 'cosmpy'], default='pocketd',
+                        help="Submit txs via pocketd subprocesses (default) or sign and broadcast in-process with cosmpy")
+    parser.add_argument('--keys-csv',
+                        help="CSV with the signers' mnemonic / owner_address_mnemonic / shannon_private_key "
+                             "columns (required for the cosmpy backend)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip files the journal records as already staked (unchanged since)")
+    parser.add_argument('--journal', default=default_journal_path('stake_from_supplier_config'),
+                        help="Path of the JSONL progress journal")
+    parser.add_argument('--summary-file', default='stake_summary.json',
+                        help="Where to write the JSON summary of results (default: stake_summary.json)")
+    parser.add_argument('--role', choices=['owner', 'operator'],
+                        help="Stake as the owner or the operator (prompted for if omitted)")
+    parser.add_argument('--config-dir',
+                        help="Folder with the supplier config YAML files (prompted for if omitted)")
+    cli_options.add_common_args(parser)
+    return cli_options.parse_args(parser, 'stake_from_supplier_config')
 
 def main():
-    # Load environment variables from .env file
-    load_dotenv()
+    args = parse_args()
     
-    # Get network from env
-    network = os.getenv('NETWORK')
+    # Get network from --network or the environment (.env)
+    network = cli_options.resolve_network(args)
     
     if not network:
-        print("Error: NETWORK environment variable must be set in .env file")
+        print("Error: NETWORK environment variable must be set in .env file (or pass --network)")
         return
     
     # Ask user if they are the owner
-    while True:
-        user_input = input("Are you the owner? (yes/no): ").lower().strip()
-        if user_input in ['yes', 'no']:
-            is_owner = user_input == 'yes'
-            break
-        print("Please answer 'yes' or 'no'")
+    if args.role:
+        is_owner = args.role == 'owner'
+    else:
+        while True:
+            user_input = cli_options.ask(args, 'role', "Are you the owner? (yes/no): ").lower().strip()
+            if user_input in ['yes', 'no']:
+                is_owner = user_input == 'yes'
+                break
+            print("Please answer 'yes' or 'no'")
     
     # Get list of YAML files in the output directory
-    foldername = input("Enter foldername to read supplier config yaml files from: ")
+    foldername = cli_options.ask(args, 'config_dir', "Enter foldername to read supplier config yaml files from: ")
     output_dir = foldername
     if not os.path.exists(output_dir):
         print(f"Error: {output_dir} directory not found")
@@ -85,26 +287,60 @@ def main():
     
     yaml_files = [f for f in os.listdir(output_dir) if f.endswith('.yml') or f.endswith('.yaml')]
     
+    if args.changed_only:
+        changed_files = load_changed_files(output_dir)
+        if changed_files is None:
+            print(f"Error: No generation manifest found in {output_dir}; run without --changed-only")
+            return
+        changed_files = set(changed_files)
+        yaml_files = [f for f in yaml_files if f in changed_files]
+        print(f"Restricting to {len(yaml_files)} file(s) changed since the last staking run")
+    
     if not yaml_files:
         print(f"No YAML files found in {output_dir} directory")
         return
     
     print(f"\nFound {len(yaml_files)} configuration files to process")
     
-    # Process each YAML file
-    for yaml_file in yaml_files:
-        config_path = os.path.join(output_dir, yaml_file)
-        print(f"\nProcessing {yaml_file}...")
-        
-        try:
-            success = stake_wallet(config_path, network, is_owner)
-            if not success:
-                print(f"Failed to stake using {yaml_file}")
-            # Add a small delay between stakes to avoid rate limiting
-            time.sleep(2)
-        except Exception as e:
-            print(f"Error processing {yaml_file}: {e}")
-            continue
+    config_paths = [os.path.join(output_dir, yaml_file) for yaml_file in yaml_files]
+    
+    journal = JobJournal(args.journal)
+    if args.resume:
+        completed = journal.items_in_state(SUCCEEDED)
+        config_paths = [path for path in config_paths if journal_item(path) not in completed]
+        print(f"Resuming: {len(yaml_files) - len(config_paths)} file(s) already staked, {len(config_paths)} remaining")
+    
+    converged = []
+    if args.skip_converged:
+        cache = SupplierCache.from_env('normal' if args.use_cache else 'refresh')
+        before = config_paths
+        with profiling.stage('filter_converged'):
+            config_paths = filter_converged(config_paths, cache)
+        converged = sorted(set(before) - set(config_paths))
+        print(f"{len(converged)} supplier(s) already converged, {len(config_paths)} to stake")
+    
+    backend = None
+    if args.backend == 'cosmpy':
+        if not args.keys_csv:
+            print("Error: --keys-csv is required with --backend cosmpy")
+            return
+        from tx_backend import create_backend
+        backend = create_backend(network, args.keys_csv)
+    
+    allocator = None
+    if args.ordered and backend is None:
+        allocator = SequenceAllocator(rest_account_query(network))
+    
+    # Process the YAML files through a bounded worker pool
+    with profiling.stage('stake'):
+        results = stake_files(config_paths, network, is_owner, args.concurrency, args.rate, journal, backend, allocator)
+    with profiling.stage('summary'):
+        write_summary(results, args.summary_file)
+    
+    # Staked (or already converged) files are no longer pending for --changed-only; failed ones stay
+    done = [os.path.basename(path) for path in converged] + [os.path.basename(r['file']) for r in results if r['success']]
+    if done:
+        clear_changed_files(output_dir, done)
 
 if __name__ == "__main__":
     main()
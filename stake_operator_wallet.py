@@ -1,13 +1,19 @@
 #!/usr/bin/env python3
 
+import argparse
 import csv
 import os
 import yaml
-import subprocess
-from google.protobuf.message import Message
-import json
-from dotenv import load_dotenv
-import time
+
+import cli_options
+import profiling
+from job_journal import FAILED, STARTED, SUCCEEDED, JobJournal, default_journal_path
+from yaml_io import load_yaml_file
+from pocketd_cli import (broadcast_result, combine_unsigned_txs, generate_unsigned_tx, run_pocketd, sign_and_broadcast,
+                         tx_result)
+
+# Batched stake txs use a fixed gas budget per message instead of --gas=auto
+DEFAULT_GAS_PER_MSG = 250000
 
 def read_wallets(csv_file):
     wallets = []
@@ -45,34 +51,92 @@ def generate_stake_config(wallet_data, template_file, stake_amount):
     
     return output_path
 
-def stake_wallet(wallet_data, config_file, network):
-    """Execute the stake supplier command using the CLI."""
-    cmd = [
-        "pocketd", "tx", "supplier", "stake-supplier",
-        f"--config={config_file}",
-        f"--from={wallet_data['owner_address']}",
-        "--gas=auto",
-        "--gas-prices=1upokt",
-        "--gas-adjustment=1.5",
-        "--yes",
-        f"--network={network}",
-        "--keyring-backend=test", "--unordered", "--timeout-duration=1m"
-    ]
-    
+def stake_wallet(wallet_data, config_file, network, backend=None):
+    """Execute the stake supplier command using the CLI, or in-process when `backend` is given.
+
+    Returns a result dict with the success flag, tx hash and error message.
+    """
+    result = {'success': False, 'tx_hash': None, 'error': None}
     try:
-        print(cmd)
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        print(f"Successfully staked for {wallet_data['operator_address']}")
-        print(result.stdout)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error executing stake command: {e}")
-        print(f"Command output: {e.stdout}")
-        print(f"Command error: {e.stderr}")
-        return False
+        if backend is not None:
+            result = backend.stake_suppliers(wallet_data['owner_address'], [load_yaml_file(config_file)])
+            if result['success']:
+                print(f"Successfully staked for {wallet_data['operator_address']} (tx: {result['tx_hash']})")
+            else:
+                print(f"Error staking for {wallet_data['operator_address']}: {result['error']}")
+            return result
+        
+        args = [
+            "tx", "supplier", "stake-supplier",
+            f"--config={config_file}",
+            f"--from={wallet_data['owner_address']}",
+            "--gas=auto",
+            "--gas-prices=1upokt",
+            "--gas-adjustment=1.5",
+            "--yes",
+            f"--network={network}",
+            "--keyring-backend=test", "--unordered", "--timeout-duration=1m"
+        ]
+        
+        print(["pocketd"] + args)
+        process = run_pocketd(args)
+        result = broadcast_result(process)
+        if process.returncode != 0:
+            print(f"Error executing stake command for {wallet_data['operator_address']}")
+            print(f"Command output: {process.stdout}")
+            print(f"Command error: {process.stderr}")
+        elif not result['success']:
+            print(f"Stake transaction for {wallet_data['operator_address']} failed with {result['error']}")
+        else:
+            print(f"Successfully staked for {wallet_data['operator_address']}")
+            print(process.stdout)
+        return result
     except Exception as e:
         print(f"Unexpected error: {e}")
-        return False
+        result['error'] = str(e)
+        return result
+
+def stake_wallets_batch(owner_address, config_files, network, gas_per_msg=DEFAULT_GAS_PER_MSG, backend=None):
+    """Stake several suppliers owned by `owner_address` in one multi-message transaction.
+
+    Each config is turned into an unsigned MsgStakeSupplier with
+    --generate-only, the messages are merged into a single tx, then signed
+    and broadcast once. With `backend`, the messages are built, signed and
+    broadcast in-process instead. Returns a result dict shared by the whole batch.
+    """
+    result = {'success': False, 'tx_hash': None, 'error': None}
+    try:
+        if backend is not None:
+            result = backend.stake_suppliers(owner_address, [load_yaml_file(path) for path in config_files])
+            if result['success']:
+                print(f"Successfully staked {len(config_files)} suppliers from {owner_address} (tx: {result['tx_hash']})")
+            else:
+                print(f"Error staking batch from {owner_address}: {result['error']}")
+            return result
+        unsigned_txs = [
+            generate_unsigned_tx([
+                "tx", "supplier", "stake-supplier",
+                f"--config={config_file}",
+                f"--from={owner_address}",
+                f"--gas={gas_per_msg}",
+                f"--network={network}",
+                "--keyring-backend=test", "--unordered", "--timeout-duration=5m"
+            ])
+            for config_file in config_files
+        ]
+        result = tx_result(sign_and_broadcast(combine_unsigned_txs(unsigned_txs, gas_per_msg), owner_address, network))
+        if not result['success']:
+            print(f"Batched stake transaction from {owner_address} failed with {result['error']}")
+            return result
+        print(f"Successfully staked {len(config_files)} suppliers from {owner_address} (tx: {result['tx_hash']})")
+    except Exception as e:
+        print(f"Error staking batch from {owner_address}: {e}")
+        result['error'] = str(e)
+    return result
+
+def journal_item(wallet_data, stake_amount):
+    """Journal key for a wallet stake: operator address plus stake amount."""
+    return f"{wallet_data['operator_address']}:{stake_amount}"
 
 def update_csv_stake_amounts(csv_file, stake_amount):
     """Update the stake_amount column in the CSV file for all rows."""
@@ -91,43 +155,103 @@ def update_csv_stake_amounts(csv_file, stake_amount):
         writer.writeheader()
         writer.writerows(rows)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate stake files and stake operator wallets.")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip wallets the journal records as already staked with the same amount")
+    parser.add_argument('--backend', choices=['pocketd', 'cosmpy'], default='pocketd',
+                        help="Submit txs via pocketd subprocesses (default) or sign and broadcast in-process with cosmpy")
+    parser.add_argument('--keys-csv',
+                        help="CSV with an owner_address_mnemonic column for the cosmpy backend (default: the wallets CSV)")
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help="Pack up to this many MsgStakeSupplier messages from the same owner into one tx "
+                             "(default: 1, one stake-supplier tx per wallet)")
+    parser.add_argument('--gas-per-msg', type=int, default=DEFAULT_GAS_PER_MSG,
+                        help=f"Gas budgeted per stake message in batched txs (default: {DEFAULT_GAS_PER_MSG})")
+    parser.add_argument('--journal', default=default_journal_path('stake_operator_wallet'),
+                        help="Path of the JSONL progress journal")
+    parser.add_argument('--wallets-csv',
+                        help="CSV with the operator wallets to stake (prompted for if omitted)")
+    parser.add_argument('--stake-amount', type=int,
+                        help="Stake amount in POKT (prompted for if omitted)")
+    cli_options.add_common_args(parser)
+    return cli_options.parse_args(parser, 'stake_operator_wallet')
+
 def main():
-    # Load environment variables from .env file
-    load_dotenv()
+    args = parse_args()
     
-    # Get network and RPC endpoint from env
-    network = os.getenv('NETWORK')
+    # Get network from --network or the environment (.env)
+    network = cli_options.resolve_network(args)
     
     if not network:
-        print("Error: NETWORK environment variable must be set in .env file")
+        print("Error: NETWORK environment variable must be set in .env file (or pass --network)")
         return
     
     # Read wallets
-    filename = input("Enter filename to read wallets from (Case-Sensitive): ")
-    stake_amount = int(input("Enter stake amount in POKT: "))
+    filename = cli_options.ask(args, 'wallets_csv', "Enter filename to read wallets from (Case-Sensitive): ")
+    stake_amount = cli_options.ask(args, 'stake_amount', "Enter stake amount in POKT: ", int)
     
     # Update CSV with stake amounts
-    update_csv_stake_amounts(filename, stake_amount)
-    print(f"Updated stake amounts in {filename}")
+    with profiling.stage('prepare_wallets'):
+        update_csv_stake_amounts(filename, stake_amount)
+        print(f"Updated stake amounts in {filename}")
+        
+        wallets = read_wallets(filename)
+    
+    journal = JobJournal(args.journal)
+    if args.resume:
+        completed = journal.items_in_state(SUCCEEDED)
+        remaining = [w for w in wallets if journal_item(w, stake_amount) not in completed]
+        print(f"Resuming: {len(wallets) - len(remaining)} wallet(s) already staked, {len(remaining)} remaining")
+        wallets = remaining
     
-    wallets = read_wallets(filename)
+    backend = None
+    if args.backend == 'cosmpy':
+        from tx_backend import create_backend
+        backend = create_backend(network, args.keys_csv or filename)
     
-    # Process each wallet
-    for wallet in wallets:
-        config_file = generate_stake_config(wallet, 'sample.yml', stake_amount)
-        print(f"Generated config file: {config_file}")
+    with profiling.stage('stake'):
+        if args.batch_size > 1:
+            # Generate every stake file, then pack them per owner into chunked multi-message txs
+            by_owner = {}
+            for wallet in wallets:
+                config_file = generate_stake_config(wallet, 'sample.yml', stake_amount)
+                print(f"Generated config file: {config_file}")
+                by_owner.setdefault(wallet['owner_address'], []).append((wallet, config_file))
+            
+            for owner_address, entries in by_owner.items():
+                for start in range(0, len(entries), args.batch_size):
+                    chunk = entries[start:start + args.batch_size]
+                    items = [journal_item(wallet, stake_amount) for wallet, _ in chunk]
+                    for item in items:
+                        journal.record(item, STARTED)
+                    result = stake_wallets_batch(owner_address, [config_file for _, config_file in chunk],
+                                                 network, args.gas_per_msg, backend)
+                    for item in items:
+                        journal.record(item, SUCCEEDED if result['success'] else FAILED,
+                                       tx_hash=result['tx_hash'], error=result['error'])
+            return
         
-        try:
-            # stake the wallet
-            success = stake_wallet(wallet, config_file, network)
-            # wait for 30 seconds
-            # time.sleep(15)
-            # os.remove(config_file)
-            if not success:
-                print(f"Failed to stake for {wallet['operator_address']}")
-        except Exception as e:
-            print(f"Error staking for {wallet['operator_address']}: {e}")
-            pass
+        # Process each wallet
+        for wallet in wallets:
+            config_file = generate_stake_config(wallet, 'sample.yml', stake_amount)
+            print(f"Generated config file: {config_file}")
+            
+            item = journal_item(wallet, stake_amount)
+            journal.record(item, STARTED)
+            try:
+                # stake the wallet
+                result = stake_wallet(wallet, config_file, network, backend)
+                # wait for 30 seconds
+                # time.sleep(15)
+                # os.remove(config_file)
+                if not result['success']:
+                    print(f"Failed to stake for {wallet['operator_address']}")
+                journal.record(item, SUCCEEDED if result['success'] else FAILED,
+                               tx_hash=result['tx_hash'], error=result['error'])
+            except Exception as e:
+                print(f"Error staking for {wallet['operator_address']}: {e}")
+                journal.record(item, FAILED, error=str(e))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+"""
+On-disk cache of raw supplier records from the poktroll REST API.
+
+Entries are keyed by network plus operator address and stored in a small
+SQLite database so repeated runs of generate_supplier_config.py (tweaking
+revshare or allocation inputs) do not re-download every supplier.
+
+Modes:
+    normal   - serve entries younger than the TTL, fetch and store the rest
+    refresh  - ignore cached entries, fetch everything and store the results
+    offline  - serve any cached entry regardless of age, never hit the API
+
+Configuration (environment):
+    SUPPLIER_CACHE_PATH         database file (default: .cache/suppliers.sqlite)
+    SUPPLIER_CACHE_TTL          entry lifetime in seconds (default: 3600)
+    SUPPLIER_CACHE_MAX_ENTRIES  size bound, least recently used entries are evicted (default: 50000)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_CACHE_PATH = os.path.join('.cache', 'suppliers.sqlite')
+DEFAULT_TTL = 3600
+DEFAULT_MAX_ENTRIES = 50000
+
+MODES = ('normal', 'refresh', 'offline')
+
+
+class SupplierCache:
+    """SQLite-backed TTL + LRU cache of supplier records."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, mode: str = 'normal'):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode '{mode}', expected one of {MODES}")
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.mode = mode
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS suppliers ("
+            " network TEXT NOT NULL,"
+            " operator_address TEXT NOT NULL,"
+            " record TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " PRIMARY KEY (network, operator_address))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS suppliers_lru ON suppliers (last_access)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM suppliers").fetchone()[0]
+
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls, mode: str = 'normal') -> 'SupplierCache':
+        """Build a cache from the SUPPLIER_CACHE_* environment variables."""
+        return cls(
+            path=os.getenv('SUPPLIER_CACHE_PATH', DEFAULT_CACHE_PATH),
+            ttl=float(os.getenv('SUPPLIER_CACHE_TTL', DEFAULT_TTL)),
+            max_entries=int(os.getenv('SUPPLIER_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)),
+            mode=mode,
+        )
+
+    @property
+    def offline(self) -> bool:
+        return self.mode == 'offline'
+
+    def get(self, network: str, operator_address: str) -> Optional[Dict[str, Any]]:
+        """Return the cached record, or None if missing, expired or in refresh mode."""
+        if self.mode == 'refresh':
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record, fetched_at FROM suppliers WHERE network = ? AND operator_address = ?",
+                (network, operator_address),
+            ).fetchone()
+            if row is None or (not self.offline and now - row[1] > self.ttl):
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE suppliers SET last_access = ? WHERE network = ? AND operator_address = ?",
+                (now, network, operator_address),
+            )
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, network: str, operator_address: str, record: Dict[str, Any]) -> None:
+        """Store a record and evict least recently used entries beyond the size bound."""
+        now = time.time()
+        with self._lock:
+            existed = self._conn.execute(
+                "SELECT 1 FROM suppliers WHERE network = ? AND operator_address = ?",
+                (network, operator_address),
+            ).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO suppliers (network, operator_address, record, fetched_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (network, operator_address, json.dumps(record), now, now),
+            )
+            if not existed:
+                self._count += 1
+            if self._count > self.max_entries:
+                excess = self._count - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM suppliers WHERE rowid IN"
+                    " (SELECT rowid FROM suppliers ORDER BY last_access ASC LIMIT ?)",
+                    (excess,),
+                )
+                self._count -= excess
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': self._count}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
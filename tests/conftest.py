@@ -0,0 +1,7 @@
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The scripts are flat modules at the repo root; the mock API and fleet helpers live in tools/
+sys.path[:0] = [REPO_ROOT, os.path.join(REPO_ROOT, 'tools')]
@@ -0,0 +1,36 @@
+"""
+Config generation must not regress against a benchmark baseline.
+
+Runs the small 50x55 fleet of tools/bench_regression.py and compares it with
+tools/bench_baseline.json, or with the baseline named by BENCH_BASELINE.
+The committed reference was recorded on another machine, so timings only
+fail past BENCH_TIME_THRESHOLD (default 2.0: three times the baseline).
+Memory uses the script's threshold. CI sets BENCH_BASELINE to a baseline
+recorded on its own runner and lowers BENCH_TIME_THRESHOLD to match.
+"""
+
+import argparse
+import json
+import os
+
+import bench_regression
+
+SCALE = '50x55'
+
+
+def test_generation_does_not_regress(tmp_path, capsys):
+    with open(os.getenv('BENCH_BASELINE', bench_regression.REFERENCE_BASELINE)) as f:
+        baseline = json.load(f)['scales']
+    thresholds = argparse.Namespace(
+        threshold=float(os.getenv('BENCH_TIME_THRESHOLD', '2.0')),
+        memory_threshold=bench_regression.DEFAULT_MEMORY_THRESHOLD,
+        min_slowdown_ms=bench_regression.DEFAULT_MIN_SLOWDOWN_MS,
+        min_growth_mb=bench_regression.DEFAULT_MIN_GROWTH_MB,
+    )
+    customers, chains = bench_regression.parse_scale(SCALE)
+
+    label, results = bench_regression.run_scale(customers, chains, bench_regression.STAGES, 3, str(tmp_path))
+    regressions = bench_regression.compare(label, results, baseline, thresholds)
+
+    assert set(results) == set(baseline[SCALE])
+    assert not regressions, capsys.readouterr().out
@@ -0,0 +1,66 @@
+import argparse
+
+import pytest
+
+import cli_options
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog='script')
+    parser.add_argument('--amount', type=int)
+    parser.add_argument('--role', choices=['owner', 'operator'])
+    parser.add_argument('--output-dir')
+    parser.add_argument('--workers', type=cli_options.positive_int)
+    cli_options.add_common_args(parser)
+    return parser
+
+
+def parse_with_spec(tmp_path, text, argv=()):
+    spec = tmp_path / 'spec.yml'
+    spec.write_text(text)
+    return cli_options.parse_args(make_parser(), 'script', ['--job-spec', str(spec)] + list(argv))
+
+
+def test_spec_values_are_converted_like_flags(tmp_path):
+    args = parse_with_spec(tmp_path, "amount: '25'\nrole: owner\nyes: true\nscript:\n  output_dir: out\n")
+
+    assert (args.amount, args.role, args.yes, args.output_dir) == (25, 'owner', True, 'out')
+
+
+def test_command_line_wins_over_spec(tmp_path):
+    args = parse_with_spec(tmp_path, "amount: 25\n", ['--amount', '3'])
+
+    assert args.amount == 3
+
+
+@pytest.mark.parametrize('text', [
+    "role: Owner\n",        # not one of the choices
+    "amount: 1.5\n",        # would be truncated by int()
+    "amount: lots\n",
+    "workers: 0\n",        # counts must be at least 1
+    "yes: 'no'\n",          # flags need a boolean
+    "script:\n  unknown_option: 1\n",
+])
+def test_invalid_spec_values_are_rejected(tmp_path, text, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        parse_with_spec(tmp_path, text)
+
+    assert exit_info.value.code == 2
+    assert 'spec.yml' in capsys.readouterr().err
+
+
+def test_ask_with_yes_fails_instead_of_prompting(capsys):
+    args = make_parser().parse_args(['--yes'])
+
+    with pytest.raises(SystemExit):
+        cli_options.ask(args, 'amount', 'Amount: ', int)
+
+    assert '--amount is required with --yes' in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('value', ['0', '-2', 'two'])
+def test_positive_int_flags_reject_values_below_one(value, capsys):
+    with pytest.raises(SystemExit):
+        make_parser().parse_args(['--workers', value])
+
+    assert 'argument --workers' in capsys.readouterr().err
@@ -0,0 +1,98 @@
+import json
+import os
+import subprocess
+import sys
+
+from conftest import REPO_ROOT
+from job_journal import FAILED, STARTED, SUCCEEDED, JobJournal
+
+FAKE_POCKETD_DIR = os.path.join(REPO_ROOT, 'tools', 'fake_pocketd')
+OWNER = 'pokt1owner0000000000000000000000000000000'
+OPERATORS = [f"pokt1operator{i}00000000000000000000000000000" for i in range(3)]
+
+
+def test_entries_keep_latest_state_and_skip_partial_lines(tmp_path):
+    journal = JobJournal(str(tmp_path / 'nested' / 'job.jsonl'))
+    journal.record('a', STARTED)
+    journal.record('a', SUCCEEDED, tx_hash='ABC')
+    journal.record('b', STARTED)
+    journal.record('c', FAILED, error='boom')
+    with open(journal.path, 'a') as f:
+        f.write('{"item": "d", "sta')
+
+    entries = journal.entries()
+
+    assert set(entries) == {'a', 'b', 'c'}
+    assert entries['a']['tx_hash'] == 'ABC'
+    assert entries['c']['error'] == 'boom'
+    assert journal.items_in_state(STARTED) == {'b'}
+
+
+def run_fund(tmp_path, *extra, fail_match=None):
+    wallets = tmp_path / 'wallets.csv'
+    wallets.write_text('owner_address,operator_address\n' + ''.join(f"{OWNER},{op}\n" for op in OPERATORS))
+    env = dict(os.environ,
+               PATH=FAKE_POCKETD_DIR + os.pathsep + os.environ['PATH'],
+               FAKE_POCKETD_LOG=str(tmp_path / 'pocketd.log'))
+    env.pop('FAKE_POCKETD_ERROR_RATE', None)
+    if fail_match:
+        env['FAKE_POCKETD_FAIL_MATCH'] = fail_match
+    return subprocess.run(
+        [sys.executable, os.path.join(REPO_ROOT, 'fund_operator_wallets.py'), '--yes', '--network', 'beta',
+         '--wallets-csv', str(wallets), '--amount', '5', '--journal', str(tmp_path / 'fund.jsonl')] + list(extra),
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60)
+
+
+def sent_operators(tmp_path):
+    with open(tmp_path / 'pocketd.log') as f:
+        return [line.split()[4] for line in f if line.startswith('tx bank send')]
+
+
+def journal_states(tmp_path):
+    with open(tmp_path / 'fund.jsonl') as f:
+        lines = [json.loads(line) for line in f]
+    return [(entry['item'].split(':')[1], entry['state']) for entry in lines]
+
+
+def test_resume_retries_only_failed_transfers(tmp_path):
+    first = run_fund(tmp_path, fail_match=OPERATORS[1])
+    assert first.returncode == 0, first.stderr
+
+    states = dict(journal_states(tmp_path))
+    assert states == {OPERATORS[0]: SUCCEEDED, OPERATORS[1]: FAILED, OPERATORS[2]: SUCCEEDED}
+
+    os.remove(tmp_path / 'pocketd.log')
+    second = run_fund(tmp_path, '--resume')
+    assert second.returncode == 0, second.stderr
+
+    assert 'Resuming: 2 transfer(s) skipped, 1 remaining' in second.stdout
+    assert sent_operators(tmp_path) == [OPERATORS[1]]
+    assert dict(journal_states(tmp_path))[OPERATORS[1]] == SUCCEEDED
+
+
+def test_resume_skips_in_flight_transfers_unless_asked(tmp_path):
+    journal = JobJournal(str(tmp_path / 'fund.jsonl'))
+    for op in OPERATORS:
+        journal.record(f"{OWNER}:{op}:5", SUCCEEDED if op != OPERATORS[2] else STARTED)
+
+    skipped = run_fund(tmp_path, '--resume')
+    assert skipped.returncode == 0, skipped.stderr
+    assert 'was in flight' in skipped.stdout
+    assert not os.path.exists(tmp_path / 'pocketd.log')
+
+    retried = run_fund(tmp_path, '--resume', '--retry-in-flight')
+    assert retried.returncode == 0, retried.stderr
+    assert sent_operators(tmp_path) == [OPERATORS[2]]
+
+
+def test_stake_reports_missing_config_as_failed(tmp_path):
+    from stake_from_supplier_config import stake_files
+
+    journal = JobJournal(str(tmp_path / 'stake.jsonl'))
+    missing = str(tmp_path / 'customer_9.yml')
+
+    results = stake_files([missing], 'beta', is_owner=True, rate=1000, journal=journal)
+
+    assert results == [{'file': missing, 'from_address': None, 'success': False, 'tx_hash': None,
+                        'error': 'config file not found'}]
+    assert journal.entries() == {}
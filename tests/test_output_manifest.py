@@ -0,0 +1,135 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+import fleet
+from conftest import REPO_ROOT
+from mock_pokt_api import start_mock_server
+from output_manifest import (MANIFEST_NAME, OutputManifest, add_changed_files, clear_changed_files,
+                             load_changed_files)
+
+FAKE_POCKETD_DIR = os.path.join(REPO_ROOT, 'tools', 'fake_pocketd')
+CUSTOMERS = 3
+
+
+def write_manifest(directory, customers, pending=None, changed=()):
+    data = {
+        'version': 1,
+        'customers': {c: {'file': f"{c}.yml", 'input_hash': 'i', 'output_hash': 'o'} for c in customers},
+        'last_run': {'timestamp': 0, 'changed': list(changed), 'unchanged': []},
+    }
+    if pending is not None:
+        data['pending'] = pending
+    with open(os.path.join(directory, MANIFEST_NAME), 'w') as f:
+        json.dump(data, f)
+
+
+def test_pending_accumulates_across_saves(tmp_path):
+    write_manifest(tmp_path, ['a', 'b', 'c'], pending=['a'])
+
+    OutputManifest(str(tmp_path)).save(changed=['b'], unchanged=['a', 'c'])
+    OutputManifest(str(tmp_path)).save(changed=[], unchanged=['a', 'b', 'c'])
+
+    assert sorted(load_changed_files(str(tmp_path))) == ['a.yml', 'b.yml']
+
+
+def test_old_manifest_falls_back_to_last_run(tmp_path):
+    write_manifest(tmp_path, ['a', 'b'], changed=['b'])
+
+    assert load_changed_files(str(tmp_path)) == ['b.yml']
+
+
+def test_add_and_clear_changed_files(tmp_path):
+    write_manifest(tmp_path, ['a', 'b', 'c'], pending=['a'])
+
+    assert add_changed_files(str(tmp_path), ['c.yml', 'not-generated.yml']) == 1
+    assert sorted(load_changed_files(str(tmp_path))) == ['a.yml', 'c.yml']
+    assert clear_changed_files(str(tmp_path), ['a.yml']) == 1
+    assert load_changed_files(str(tmp_path)) == ['c.yml']
+
+
+def test_no_manifest(tmp_path):
+    assert load_changed_files(str(tmp_path)) is None
+    assert add_changed_files(str(tmp_path), ['a.yml']) is None
+    assert clear_changed_files(str(tmp_path), ['a.yml']) is None
+
+
+@pytest.fixture
+def env(tmp_path):
+    env = dict(os.environ,
+               NETWORK='beta',
+               PATH=FAKE_POCKETD_DIR + os.pathsep + os.environ['PATH'],
+               FAKE_POCKETD_HOME=str(tmp_path / '.fake-pocketd'))
+    env.pop('FAKE_POCKETD_ERROR_RATE', None)
+    return env
+
+
+@pytest.fixture
+def api(env):
+    server = start_mock_server(fleet_size=CUSTOMERS, seed=0)
+    env['POKT_API_URL'] = server.url
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def run_script(cwd, env, script, *args):
+    process = subprocess.run([sys.executable, os.path.join(REPO_ROOT, script), '--yes'] + list(args),
+                             cwd=cwd, env=env, capture_output=True, text=True, timeout=120)
+    assert process.returncode == 0, process.stdout + process.stderr
+    return process
+
+
+def generate(cwd, env):
+    run_script(cwd, env, 'generate_supplier_config.py', '--no-cache', '--operators-csv', 'operators.csv',
+               '--allocation-csv', 'NodeAllocation.csv', '--revshare-pct', '60', '--output-dir', 'output')
+
+
+def pending(directory):
+    return sorted(load_changed_files(str(directory)))
+
+
+def test_generate_rerun_keeps_unstaked_files_pending(tmp_path, env, api):
+    fleet.write_fleet(str(tmp_path), CUSTOMERS, chains=10)
+    shutil.copy(os.path.join(REPO_ROOT, 'sample.yml'), tmp_path)
+    output = tmp_path / 'output'
+
+    generate(tmp_path, env)
+    assert pending(output) == ['customer_1.yml', 'customer_2.yml', 'customer_3.yml']
+
+    clear_changed_files(str(output), ['customer_1.yml', 'customer_3.yml'])
+    # A rerun with identical inputs rewrites nothing but keeps the unstaked file pending
+    generate(tmp_path, env)
+    assert pending(output) == ['customer_2.yml']
+
+    (tmp_path / 'override.yml').write_text(json.dumps({'services': [{'service_id': 'eth', 'endpoints': [
+        {'publicly_exposed_url': 'https://relayminer.test.example.com', 'rpc_type': 'JSON_RPC'}]}]}))
+    run_script(tmp_path, env, 'override_customer_services_config_files.py', '--config-folder', 'output',
+               '--override-file', 'override.yml', '--files', 'customer_3*.yml')
+    assert pending(output) == ['customer_2.yml', 'customer_3.yml']
+
+
+def test_staking_clears_only_staked_files(tmp_path, env):
+    output = tmp_path / 'output'
+    output.mkdir()
+    customers = [fleet.operator_address(i) for i in range(CUSTOMERS)]
+    for operator in customers:
+        owner = fleet.owner_address(operator)
+        (output / f"{operator}.yml").write_text(
+            f"owner_address: {owner}\noperator_address: {operator}\nstake_amount: 60000000000upokt\n"
+            f"default_rev_share_percent:\n  {owner}: 40\n  {operator}: 60\n")
+    write_manifest(output, customers, pending=customers)
+
+    def stake_changed(**extra_env):
+        run_script(tmp_path, dict(env, **extra_env), 'stake_from_supplier_config.py', '--changed-only',
+                   '--role', 'owner', '--config-dir', 'output', '--rate', '1000', '--journal', 'stake.jsonl')
+
+    stake_changed(FAKE_POCKETD_FAIL_MATCH=f"{customers[1]}.yml")
+    assert pending(output) == [f"{customers[1]}.yml"]
+
+    stake_changed()
+    assert pending(output) == []
@@ -0,0 +1,33 @@
+import subprocess
+
+from pocketd_cli import broadcast_result, parse_tx_response
+
+TX_HASH = 'AB' * 32
+
+
+def completed(returncode=0, stdout='', stderr=''):
+    return subprocess.CompletedProcess(['pocketd'], returncode, stdout=stdout, stderr=stderr)
+
+
+def test_parse_tx_response_reads_yaml_json_and_mixed_output():
+    assert parse_tx_response(f"code: 0\nraw_log: ''\ntxhash: {TX_HASH}\n")['tx_hash'] == TX_HASH
+    assert parse_tx_response(f'{{"code": 5, "raw_log": "out of gas", "txhash": "{TX_HASH}"}}') == {
+        'tx_hash': TX_HASH, 'code': 5, 'raw_log': 'out of gas'}
+    mixed = f"gas estimate: 1234\n{{\"code\": 0, \"txhash\": \"{TX_HASH}\"\n"
+    assert parse_tx_response(mixed) == {'tx_hash': TX_HASH, 'code': 0, 'raw_log': ''}
+
+
+def test_broadcast_result_success():
+    assert broadcast_result(completed(stdout=f"code: 0\ntxhash: {TX_HASH}\n")) == {
+        'success': True, 'tx_hash': TX_HASH, 'error': None}
+
+
+def test_broadcast_result_failed_tx_keeps_hash():
+    result = broadcast_result(completed(stdout=f"code: 11\nraw_log: out of gas\ntxhash: {TX_HASH}\n"))
+
+    assert result == {'success': False, 'tx_hash': TX_HASH, 'error': 'code 11: out of gas'}
+
+
+def test_broadcast_result_nonzero_exit():
+    assert broadcast_result(completed(1, stderr='Error: key not found\n'))['error'] == 'Error: key not found'
+    assert broadcast_result(completed(2))['error'] == 'pocketd exited with code 2'
@@ -0,0 +1,151 @@
+import email.utils
+import time
+
+import pytest
+import requests
+
+import fleet
+import pokt_api
+from mock_pokt_api import start_mock_server
+from pokt_api import PoktApiClient
+from supplier_cache import SupplierCache
+
+
+def response(status, body=b'{}', headers=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = body
+    resp.headers.update(headers or {})
+    resp.url = 'http://api.test/x'
+    return resp
+
+
+class ScriptedSession:
+    """Stands in for requests.Session, answering each GET with the next scripted outcome."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    slept = []
+    monkeypatch.setattr(pokt_api.time, 'sleep', slept.append)
+    # Take the top of the jitter range so backoff delays are deterministic
+    monkeypatch.setattr(pokt_api.random, 'uniform', lambda low, high: high)
+    return slept
+
+
+def client_with(outcomes, **kwargs):
+    client = PoktApiClient('http://api.test/', **kwargs)
+    client.session = ScriptedSession(outcomes)
+    return client
+
+
+def test_transient_statuses_are_retried(sleeps):
+    client = client_with([response(503), response(502), response(200, b'{"ok": true}')])
+
+    assert client.get_json('/x') == {'ok': True}
+    assert client.session.calls == 3
+    assert sleeps == [0.5, 1.0]
+    assert client.latency_summary()['retries'] == 2
+
+
+def test_backoff_is_capped(sleeps):
+    client = client_with([response(500)] * 5 + [response(200)], backoff_factor=1.0, max_backoff=5.0)
+
+    client.get('/x')
+
+    assert sleeps == [1.0, 2.0, 4.0, 5.0, 5.0]
+
+
+@pytest.mark.parametrize('retry_after, expected', [
+    ('2', 2.0),
+    ('600', 30.0),           # capped at max_backoff
+    ('soon', 0.5),           # unparseable: normal backoff
+])
+def test_retry_after_is_honoured(sleeps, retry_after, expected):
+    client = client_with([response(429, headers={'Retry-After': retry_after}), response(200)])
+
+    client.get('/x')
+
+    assert sleeps == [expected]
+
+
+def test_retry_after_http_date(sleeps):
+    when = email.utils.formatdate(time.time() + 10, usegmt=True)
+    client = client_with([response(429, headers={'Retry-After': when}), response(200)])
+
+    client.get('/x')
+
+    assert 8 <= sleeps[0] <= 10
+
+
+def test_gives_up_after_max_retries(sleeps):
+    client = client_with([response(503)] * 3, max_retries=2)
+
+    with pytest.raises(requests.HTTPError):
+        client.get('/x')
+    assert client.session.calls == 3
+
+
+def test_connection_errors_are_retried_then_raised(sleeps):
+    error = requests.exceptions.ConnectionError('reset')
+    client = client_with([error, response(200)], max_retries=1)
+    assert client.get('/x').status_code == 200
+
+    client = client_with([error, error], max_retries=1)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get('/x')
+
+
+def test_client_errors_are_not_retried(sleeps):
+    client = client_with([response(404)])
+
+    with pytest.raises(requests.HTTPError):
+        client.get('/x')
+    assert sleeps == []
+
+
+@pytest.fixture
+def api(monkeypatch):
+    server = start_mock_server(fleet_size=25, seed=0)
+    monkeypatch.setenv('POKT_API_URL', server.url)
+    monkeypatch.setenv('NETWORK', 'beta')
+    monkeypatch.setattr(pokt_api, '_clients', {})
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_iter_pages_follows_next_key(api):
+    client = PoktApiClient(api.url)
+
+    pages = list(client.iter_pages('/pokt-network/poktroll/supplier/supplier', page_size=10))
+
+    assert [len(page['supplier']) for page in pages] == [10, 10, 5]
+    suppliers = [s['operator_address'] for page in pages for s in page['supplier']]
+    assert suppliers == [fleet.operator_address(i) for i in range(25)]
+
+
+def test_bulk_listing_stops_once_every_address_is_found(api, monkeypatch, tmp_path):
+    from generate_supplier_config import fetch_suppliers_bulk
+
+    monkeypatch.setenv('SUPPLIER_PAGE_SIZE', '10')
+    wanted = [fleet.operator_address(12), fleet.operator_address(3)]
+    cache = SupplierCache(str(tmp_path / 'suppliers.sqlite'))
+
+    found = fetch_suppliers_bulk(wanted, cache)
+
+    assert set(found) == set(wanted)
+    assert all(info['operator_address'] == address for address, info in found.items())
+    assert api.stats['requests'] == 2
+    assert cache.get('beta', wanted[0])['operator_address'] == wanted[0]
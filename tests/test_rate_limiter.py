@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+import rate_limiter
+from rate_limiter import TokenBucket
+
+
+class FakeTime:
+    """Monotonic clock that only moves when the code under test sleeps.
+
+    The tests use rates whose refill intervals are exact in binary floating point.
+    """
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', fake.monotonic)
+    monkeypatch.setattr(rate_limiter.time, 'sleep', fake.sleep)
+    return fake
+
+
+def test_burst_up_to_capacity_then_paced_at_rate(fake_time):
+    bucket = TokenBucket(rate=4, capacity=2)
+
+    for _ in range(4):
+        bucket.acquire()
+
+    assert fake_time.sleeps == [0.25, 0.25]
+    assert fake_time.now == pytest.approx(100.5)
+
+
+def test_idle_time_refills_only_up_to_capacity(fake_time):
+    bucket = TokenBucket(rate=4, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+
+    fake_time.now += 60
+    for _ in range(3):
+        bucket.acquire()
+    assert fake_time.sleeps == []
+
+    bucket.acquire()
+    assert fake_time.sleeps == [0.25]
+
+
+def test_capacity_defaults_to_rate_but_at_least_one():
+    assert TokenBucket(rate=5).capacity == 5
+    assert TokenBucket(rate=0.5).capacity == 1
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_threads_share_the_budget():
+    bucket = TokenBucket(rate=100, capacity=1)
+    start = time.monotonic()
+
+    threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(5)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 20 acquisitions with one token up front need at least 19 refills at 100/s
+    assert time.monotonic() - start >= 0.18
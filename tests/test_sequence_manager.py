@@ -0,0 +1,120 @@
+from sequence_manager import SequenceAllocator, parse_sequence_mismatch, submit_ordered
+
+ADDRESS = 'pokt1owner'
+
+
+class Chain:
+    """Account query stand-in: account number 7, sequence `sequence`, optionally failing."""
+
+    def __init__(self, sequence=0, fail=False):
+        self.sequence = sequence
+        self.fail = fail
+        self.queries = 0
+
+    def __call__(self, address):
+        self.queries += 1
+        if self.fail:
+            raise ConnectionError('connection refused')
+        return 7, self.sequence
+
+
+def mismatch(expected, got):
+    return {'success': False, 'tx_hash': None,
+            'error': f"account sequence mismatch, expected {expected}, got {got}: incorrect account sequence"}
+
+
+def ok(lease):
+    return {'success': True, 'tx_hash': f"TX{lease.sequence}", 'error': None}
+
+
+def test_parse_sequence_mismatch():
+    assert parse_sequence_mismatch(mismatch(5, 3)['error']) == (5, 3)
+    assert parse_sequence_mismatch('insufficient funds') is None
+    assert parse_sequence_mismatch(None) is None
+
+
+def test_allocates_consecutive_sequences_from_one_query():
+    chain = Chain(sequence=4)
+    allocator = SequenceAllocator(chain)
+
+    leases = [allocator.allocate(ADDRESS) for _ in range(3)]
+
+    assert [lease.sequence for lease in leases] == [4, 5, 6]
+    assert {lease.account_number for lease in leases} == {7}
+    assert chain.queries == 1
+
+
+def test_stale_sequence_resyncs_to_expected_and_retries():
+    allocator = SequenceAllocator(Chain(sequence=0))
+    attempts = []
+
+    def submit(lease):
+        attempts.append(lease.sequence)
+        return mismatch(9, lease.sequence) if lease.sequence < 9 else ok(lease)
+
+    result = submit_ordered(allocator, ADDRESS, submit, ahead_wait=0)
+
+    assert result == {'success': True, 'tx_hash': 'TX9', 'error': None}
+    assert attempts == [0, 9]
+    assert allocator.allocate(ADDRESS).sequence == 10
+
+
+def test_sequence_ahead_is_retried_unchanged_before_resyncing():
+    allocator = SequenceAllocator(Chain(sequence=3))
+    allocator.allocate(ADDRESS)  # sequence 3 is in flight elsewhere
+    attempts = []
+
+    def submit(lease):
+        attempts.append(lease.sequence)
+        return mismatch(3, 4) if len(attempts) < 2 else ok(lease)
+
+    result = submit_ordered(allocator, ADDRESS, submit, ahead_wait=0)
+
+    assert result['success']
+    assert attempts == [4, 4]
+
+
+def test_resync_ignores_leases_from_before_an_earlier_resync():
+    allocator = SequenceAllocator(Chain(sequence=0))
+    first, second = allocator.allocate(ADDRESS), allocator.allocate(ADDRESS)
+
+    allocator.resync(ADDRESS, first, expected=5)
+    allocator.resync(ADDRESS, second, expected=1)
+
+    assert allocator.allocate(ADDRESS).sequence == 5
+
+
+def test_gives_up_after_max_attempts():
+    allocator = SequenceAllocator(Chain(sequence=0))
+    calls = []
+
+    def submit(lease):
+        calls.append(lease.sequence)
+        return mismatch(lease.sequence + 1, lease.sequence)
+
+    result = submit_ordered(allocator, ADDRESS, submit, max_attempts=3, ahead_wait=0)
+
+    assert not result['success']
+    assert len(calls) == 3
+
+
+def test_non_sequence_errors_are_not_retried():
+    allocator = SequenceAllocator(Chain())
+    calls = []
+
+    def submit(lease):
+        calls.append(lease)
+        return {'success': False, 'tx_hash': None, 'error': 'insufficient funds'}
+
+    assert submit_ordered(allocator, ADDRESS, submit)['error'] == 'insufficient funds'
+    assert len(calls) == 1
+
+
+def test_account_query_failure_becomes_a_failed_result():
+    allocator = SequenceAllocator(Chain(fail=True))
+
+    result = submit_ordered(allocator, ADDRESS, ok)
+
+    assert result['success'] is False
+    assert result['tx_hash'] is None
+    assert 'connection refused' in result['error']
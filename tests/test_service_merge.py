@@ -0,0 +1,70 @@
+import pytest
+
+from service_merge import merge_services
+
+
+def service(service_id, *urls, rev_share=None):
+    definition = {'service_id': service_id,
+                  'endpoints': [{'publicly_exposed_url': url, 'rpc_type': 'JSON_RPC'} for url in urls]}
+    if rev_share is not None:
+        definition['rev_share_percent'] = rev_share
+    return definition
+
+
+EXISTING = [service('eth', 'https://a.example.com'), service('base', 'https://a.example.com')]
+ALLOCATED = [
+    service('base', 'https://a.example.com'),                 # identical
+    service('eth', 'https://b.example.com', rev_share={'pokt1r': 100}),
+    service('poly', 'https://b.example.com'),
+    service('poly', 'https://ignored.example.com'),           # duplicate: first entry wins
+]
+
+
+def urls(definition):
+    return [endpoint['publicly_exposed_url'] for endpoint in definition['endpoints']]
+
+
+def test_report_is_the_same_for_every_policy():
+    for policy in ('keep-existing', 'allocation-wins', 'union-endpoints'):
+        merged, report = merge_services(EXISTING, ALLOCATED, policy)
+
+        assert [s['service_id'] for s in merged] == ['eth', 'base', 'poly']
+        assert urls(merged[2]) == ['https://b.example.com']
+        assert report == {'added': ['poly'], 'kept': ['base'], 'conflicted': ['eth']}
+
+
+def test_keep_existing():
+    merged, _ = merge_services(EXISTING, ALLOCATED, 'keep-existing')
+
+    assert merged[0] == EXISTING[0]
+
+
+def test_allocation_wins():
+    merged, _ = merge_services(EXISTING, ALLOCATED, 'allocation-wins')
+
+    assert merged[0] == ALLOCATED[1]
+
+
+def test_union_endpoints_appends_new_endpoints_and_keeps_existing_fields():
+    merged, _ = merge_services(EXISTING, ALLOCATED, 'union-endpoints')
+
+    assert urls(merged[0]) == ['https://a.example.com', 'https://b.example.com']
+    assert merged[0]['rev_share_percent'] == {'pokt1r': 100}
+
+    existing = [service('eth', 'https://a.example.com', rev_share={'pokt1o': 100})]
+    merged, _ = merge_services(existing, [service('eth', 'https://a.example.com', rev_share={'pokt1r': 100})],
+                               'union-endpoints')
+    assert merged == existing
+
+
+def test_inputs_are_not_modified():
+    existing = [dict(s) for s in EXISTING]
+
+    merge_services(existing, ALLOCATED, 'allocation-wins')
+
+    assert existing == EXISTING
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        merge_services(EXISTING, ALLOCATED, 'newest')
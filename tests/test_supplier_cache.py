@@ -0,0 +1,102 @@
+import pytest
+
+import supplier_cache
+from supplier_cache import SupplierCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(supplier_cache.time, 'time', clock)
+    return clock
+
+
+def make_cache(tmp_path, **kwargs):
+    return SupplierCache(str(tmp_path / 'cache' / 'suppliers.sqlite'), **kwargs)
+
+
+def test_entries_expire_after_the_ttl(tmp_path, clock):
+    cache = make_cache(tmp_path, ttl=60)
+    cache.put('beta', 'pokt1a', {'operator_address': 'pokt1a'})
+
+    clock.now += 60
+    assert cache.get('beta', 'pokt1a') == {'operator_address': 'pokt1a'}
+    clock.now += 1
+    assert cache.get('beta', 'pokt1a') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': 1}
+
+
+def test_entries_are_keyed_by_network(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.put('beta', 'pokt1a', {'n': 'beta'})
+
+    assert cache.get('main', 'pokt1a') is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put('beta', 'pokt1a', {'n': 1})
+    clock.now += 1
+    cache.put('beta', 'pokt1b', {'n': 2})
+    clock.now += 1
+    cache.get('beta', 'pokt1a')
+    clock.now += 1
+
+    cache.put('beta', 'pokt1c', {'n': 3})
+
+    assert cache.get('beta', 'pokt1b') is None
+    assert cache.get('beta', 'pokt1a') == {'n': 1}
+    assert cache.get('beta', 'pokt1c') == {'n': 3}
+    assert cache.stats()['entries'] == 2
+
+
+def test_replacing_an_entry_does_not_grow_the_cache(tmp_path, clock):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put('beta', 'pokt1a', {'n': 1})
+    cache.put('beta', 'pokt1a', {'n': 2})
+    cache.put('beta', 'pokt1b', {'n': 3})
+
+    assert cache.get('beta', 'pokt1a') == {'n': 2}
+    assert cache.stats()['entries'] == 2
+
+
+def test_refresh_mode_ignores_entries_but_stores_new_ones(tmp_path, clock):
+    make_cache(tmp_path).put('beta', 'pokt1a', {'n': 1})
+    cache = make_cache(tmp_path, mode='refresh')
+
+    assert cache.get('beta', 'pokt1a') is None
+    cache.put('beta', 'pokt1a', {'n': 2})
+    assert make_cache(tmp_path).get('beta', 'pokt1a') == {'n': 2}
+
+
+def test_offline_mode_serves_expired_entries(tmp_path, clock):
+    make_cache(tmp_path, ttl=60).put('beta', 'pokt1a', {'n': 1})
+    clock.now += 3600
+
+    cache = make_cache(tmp_path, ttl=60, mode='offline')
+
+    assert cache.offline
+    assert cache.get('beta', 'pokt1a') == {'n': 1}
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        make_cache(tmp_path, mode='sometimes')
+
+
+def test_from_env(tmp_path, monkeypatch):
+    monkeypatch.setenv('SUPPLIER_CACHE_PATH', str(tmp_path / 'env.sqlite'))
+    monkeypatch.setenv('SUPPLIER_CACHE_TTL', '5')
+    monkeypatch.setenv('SUPPLIER_CACHE_MAX_ENTRIES', '7')
+
+    cache = SupplierCache.from_env('offline')
+
+    assert (cache.path, cache.ttl, cache.max_entries, cache.mode) == (str(tmp_path / 'env.sqlite'), 5.0, 7, 'offline')
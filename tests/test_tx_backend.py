@@ -0,0 +1,105 @@
+import math
+
+import pytest
+
+pytest.importorskip('cosmpy')
+
+from cosmpy.aerial.wallet import LocalWallet  # noqa: E402
+from cosmpy.crypto.keypairs import PrivateKey  # noqa: E402
+from cosmpy.protos.cosmos.tx.v1beta1.tx_pb2 import AuthInfo, Tx  # noqa: E402
+
+import mock_pokt_api  # noqa: E402
+import tx_backend  # noqa: E402
+
+
+@pytest.fixture
+def node(monkeypatch):
+    server = mock_pokt_api.start_mock_server(fleet_size=10)
+    monkeypatch.setenv('TX_NODE_URL', f"rest+{server.url}")
+    monkeypatch.setenv('CHAIN_ID', 'pocket-test')
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def wallet():
+    return LocalWallet(PrivateKey(bytes.fromhex('11' * 32)), prefix='pokt')
+
+
+def broadcast_auth_info(raw):
+    tx = Tx()
+    tx.ParseFromString(raw)
+    return tx, AuthInfo.FromString(tx.auth_info.SerializeToString())
+
+
+def test_send_simulates_signs_and_broadcasts(node, wallet):
+    backend = tx_backend.CosmpyBackend('beta', {str(wallet.address()): wallet})
+    recipient = 'pokt1untznuz40ax7wnmsngv55f84tgv0kd8w'
+
+    result = backend.send(str(wallet.address()), [recipient], 1000000)
+
+    assert result['success'], result['error']
+    assert len(node.broadcasts) == 1
+    tx, auth_info = broadcast_auth_info(node.broadcasts[0])
+    assert result['tx_hash'] == mock_pokt_api.hashlib.sha256(node.broadcasts[0]).hexdigest().upper()
+    assert len(tx.body.messages) == 1
+    assert tx.signatures
+
+
+def test_gas_adjustment_is_applied_once(node, wallet):
+    backend = tx_backend.CosmpyBackend('beta', {str(wallet.address()): wallet}, gas_adjustment=1.5)
+    recipients = [f"pokt1{i:038d}" for i in range(20)]
+
+    assert backend.send(str(wallet.address()), recipients, 1000000)['success']
+
+    raw = node.broadcasts[0]
+    _, auth_info = broadcast_auth_info(raw)
+    gas_limit = auth_info.fee.gas_limit
+    # The simulated tx only differs from the broadcast one by its (smaller) fee field
+    simulated_at_most = mock_pokt_api.SIMULATED_GAS_BASE + mock_pokt_api.SIMULATED_GAS_PER_BYTE * len(raw)
+    assert gas_limit <= math.ceil(simulated_at_most * 1.5)
+    assert gas_limit > simulated_at_most * 1.4
+    # Fee at the configured 1upokt minimum gas price
+    assert [(coin.denom, int(coin.amount)) for coin in auth_info.fee.amount] == [('upokt', gas_limit)]
+
+
+def test_sequences_increase_per_signer(node, wallet):
+    backend = tx_backend.CosmpyBackend('beta', {str(wallet.address()): wallet})
+    recipient = 'pokt1untznuz40ax7wnmsngv55f84tgv0kd8w'
+
+    for _ in range(3):
+        assert backend.send(str(wallet.address()), [recipient], 1)['success']
+
+    sequences = [broadcast_auth_info(raw)[1].signer_infos[0].sequence for raw in node.broadcasts]
+    assert sequences == [0, 1, 2]
+
+
+def test_stake_suppliers_builds_one_multi_message_tx(node, wallet):
+    backend = tx_backend.CosmpyBackend('beta', {str(wallet.address()): wallet})
+    owner = str(wallet.address())
+    configs = [{
+        'owner_address': owner,
+        'operator_address': operator,
+        'stake_amount': '60000000000upokt',
+        'default_rev_share_percent': {owner: 100},
+        'services': [{'service_id': 'eth', 'endpoints': [
+            {'publicly_exposed_url': 'https://relayminer.example.com', 'rpc_type': 'JSON_RPC'}]}],
+    } for operator in ('pokt15qcdteymjcrrwq57zxrynzr56xd296qr', 'pokt1untznuz40ax7wnmsngv55f84tgv0kd8w')]
+
+    result = backend.stake_suppliers(owner, configs)
+
+    assert result['success'], result['error']
+    tx, _ = broadcast_auth_info(node.broadcasts[0])
+    assert [message.type_url for message in tx.body.messages] == ['/pocket.supplier.MsgStakeSupplier'] * 2
+
+
+
+def test_missing_key_is_a_failed_result(node, wallet):
+    backend = tx_backend.CosmpyBackend('beta', {})
+
+    result = backend.send(str(wallet.address()), ['pokt1untznuz40ax7wnmsngv55f84tgv0kd8w'], 1)
+
+    assert not result['success']
+    assert 'No key loaded' in result['error']
+    assert node.broadcasts == []
@@ -0,0 +1,59 @@
+import os
+import stat
+
+import pytest
+
+from yaml_io import load_yaml_file, write_atomic, write_yaml_files
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.fixture
+def umask():
+    previous = os.umask(0o027)
+    yield 0o027
+    os.umask(previous)
+
+
+def test_new_file_gets_the_umask_mode(tmp_path, umask):
+    path = tmp_path / 'config.yml'
+
+    write_atomic(str(path), 'a: 1\n')
+
+    assert path.read_text() == 'a: 1\n'
+    assert mode(path) == 0o666 & ~umask
+
+
+def test_replace_keeps_the_existing_mode(tmp_path, umask):
+    path = tmp_path / 'config.yml'
+    path.write_text('old\n')
+    os.chmod(path, 0o600)
+
+    write_atomic(str(path), 'new\n')
+
+    assert path.read_text() == 'new\n'
+    assert mode(path) == 0o600
+    assert os.listdir(tmp_path) == ['config.yml']
+
+
+def test_failed_write_leaves_target_and_no_temp_file(tmp_path):
+    path = tmp_path / 'config.yml'
+    path.write_text('old\n')
+
+    with pytest.raises(TypeError):
+        write_atomic(str(path), None)
+
+    assert path.read_text() == 'old\n'
+    assert os.listdir(tmp_path) == ['config.yml']
+
+
+def test_write_yaml_files_round_trips_in_parallel(tmp_path):
+    items = [(str(tmp_path / f"customer_{i}.yml"), {'customer': i, 'services': [{'service_id': 'eth'}]})
+             for i in range(80)]
+
+    paths = write_yaml_files(items, workers=2)
+
+    assert paths == [path for path, _ in items]
+    assert load_yaml_file(paths[-1]) == items[-1][1]
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Regression benchmark for supplier config generation and overrides.
+
+Writes a synthetic fleet (tools/fleet.py) at each requested scale, seeds a
+supplier cache with its records, and times these stages in-process:
+
+    allocation  read NodeAllocation.csv, build the allocation matrix, slice every customer column
+    suppliers   parse every raw supplier record (parse_supplier_record)
+    generate    generate_supplier_config.main end to end (offline, from the seeded cache)
+    serialize   write_yaml_files over the generated configs
+    override    override_customer_services_config_files.process_config_files over them (the
+                configs already carry the override after the warm-up round, so this times
+                the load-and-compare pass that skips unchanged files)
+
+Each stage runs --rounds times and reports the median wall time; one extra
+round under tracemalloc records the peak Python heap of this process (YAML
+serialization for large batches happens in pool workers and is not counted). Results are compared
+with a baseline JSON and the script exits non-zero when any stage got slower
+(or bigger) than the baseline by more than the threshold, ignoring changes
+under an absolute noise floor:
+
+    python tools/bench_regression.py --scales 500x200 --save-baseline bench_baseline.json
+    python tools/bench_regression.py --scales 500x200 --baseline bench_baseline.json --threshold 0.2
+
+Timings are machine-specific: record the baseline on the machine that checks it.
+tools/bench_baseline.json is a reference run (its header names the machine);
+tests/test_bench_regression.py checks the 50x55 scale against it under pytest
+with a loose time threshold.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import fleet
+
+sys.path.insert(0, fleet.REPO_ROOT)
+
+import generate_supplier_config  # noqa: E402
+import override_customer_services_config_files  # noqa: E402
+from supplier_cache import SupplierCache  # noqa: E402
+from yaml_io import load_yaml_file, write_yaml_files  # noqa: E402
+
+NETWORK = 'beta'
+REVSHARE_PCT = 60
+STAGES = ('allocation', 'suppliers', 'generate', 'serialize', 'override')
+REFERENCE_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_baseline.json')
+
+# Regression thresholds: relative increase, plus an absolute floor below which changes are noise
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MEMORY_THRESHOLD = 0.10
+DEFAULT_MIN_SLOWDOWN_MS = 20.0
+DEFAULT_MIN_GROWTH_MB = 0.5
+
+OVERRIDE_SERVICES = {
+    'services': [
+        {'service_id': 'eth', 'endpoints': [{'publicly_exposed_url': 'https://relayminer.bench.example.com',
+                                             'rpc_type': 'JSON_RPC'}]},
+    ],
+}
+
+
+def parse_scale(value):
+    """'500x200' -> (500 customers, 200 chains)."""
+    try:
+        customers, chains = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"scale must look like CUSTOMERSxCHAINS, got '{value}'")
+    return customers, chains
+
+
+class Fleet:
+    """One synthetic fleet on disk plus the stage callables that run against it."""
+
+    def __init__(self, workdir, customers, chains):
+        self.workdir = workdir
+        self.customers = customers
+        self.paths = fleet.write_fleet(workdir, customers, chains)
+        with open(self.paths['suppliers']) as f:
+            self.suppliers = json.load(f)['supplier']
+        self.cache_path = os.path.join(workdir, 'cache', 'suppliers.sqlite')
+        cache = SupplierCache(self.cache_path)
+        for supplier in self.suppliers:
+            cache.put(NETWORK, supplier['operator_address'], supplier)
+        cache.close()
+        self.override_file = os.path.join(workdir, 'override.yml')
+        with open(self.override_file, 'w') as f:
+            json.dump(OVERRIDE_SERVICES, f)
+        self.output_dir = os.path.join(workdir, 'output')
+        self.generated = []
+
+    def allocation(self):
+        df = generate_supplier_config.read_allocation_sheet(self.paths['allocation'])
+        columns = [col for col in df.columns[3:] if col.isdigit()]
+        service_mapping = generate_supplier_config.load_service_mapping()
+        chains, allocated = generate_supplier_config.build_allocation_matrix(df, columns, service_mapping)
+        for column in columns:
+            generate_supplier_config.allocated_chains(chains, allocated, column)
+
+    def parse_suppliers(self):
+        for supplier in self.suppliers:
+            generate_supplier_config.parse_supplier_record(supplier)
+
+    def generate(self):
+        argv = ['generate_supplier_config.py', '--offline', '--force', '--yes', '--network', NETWORK,
+                '--operators-csv', self.paths['operators'], '--allocation-csv', self.paths['allocation'],
+                '--revshare-pct', str(REVSHARE_PCT), '--output-dir', self.output_dir]
+        saved_argv = sys.argv
+        sys.argv = argv
+        try:
+            generate_supplier_config.main()
+        finally:
+            sys.argv = saved_argv
+        if not self.generated:
+            self.generated = [(path, load_yaml_file(path))
+                              for path in sorted(os.path.join(self.output_dir, name)
+                                                 for name in os.listdir(self.output_dir) if name.endswith('.yml'))]
+
+    def serialize(self):
+        scratch = os.path.join(self.workdir, 'serialized')
+        os.makedirs(scratch, exist_ok=True)
+        write_yaml_files([(os.path.join(scratch, os.path.basename(path)), data) for path, data in self.generated])
+
+    def override(self):
+        override_customer_services_config_files.process_config_files(self.output_dir, self.override_file,
+                                                                      assume_yes=True)
+
+    def stage(self, name):
+        return {
+            'allocation': self.allocation,
+            'suppliers': self.parse_suppliers,
+            'generate': self.generate,
+            'serialize': self.serialize,
+            'override': self.override,
+        }[name]
+
+
+def measure(run, rounds):
+    """Median wall seconds over `rounds` runs, then the tracemalloc peak (MB) of one more.
+
+    An untimed warm-up run goes first so one-off imports (pandas) and cold caches do not count.
+    """
+    run()
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(timings), min(timings), peak / (1024 * 1024)
+
+
+def run_scale(customers, chains, stages, rounds, root):
+    label = f"{customers}x{chains}"
+    workdir = os.path.join(root, label)
+    bench_fleet = Fleet(workdir, customers, chains)
+    results = {}
+    saved_cwd, saved_env = os.getcwd(), dict(os.environ)
+    # load_service_mapping reads the mapping CSV from the working directory
+    os.chdir(workdir)
+    os.environ.update(NETWORK=NETWORK, SUPPLIER_CACHE_PATH=bench_fleet.cache_path)
+    try:
+        # Stages after 'generate' work on its output, so it always runs once first
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            if any(stage in ('serialize', 'override') for stage in stages) and 'generate' not in stages:
+                bench_fleet.generate()
+            for stage in stages:
+                median_s, min_s, peak_mb = measure(bench_fleet.stage(stage), rounds)
+                results[stage] = {'median_s': round(median_s, 4), 'min_s': round(min_s, 4),
+                                  'peak_mb': round(peak_mb, 2)}
+    finally:
+        os.chdir(saved_cwd)
+        os.environ.clear()
+        os.environ.update(saved_env)
+    return label, results
+
+
+def compare(label, results, baseline, args):
+    """Print one scale's results against the baseline; returns the regressed stage names.
+
+    A stage regresses when it is over the relative threshold *and* over the
+    absolute floor, so millisecond-scale stages do not fail on timer noise.
+    """
+    regressions = []
+    previous = baseline.get(label, {})
+    print(f"\n{label}")
+    print(f"  {'stage':<11} {'median_s':>9} {'base_s':>9} {'delta':>8} {'peak_mb':>9} {'base_mb':>9} {'delta':>8}")
+    for stage, result in results.items():
+        base = previous.get(stage)
+        time_delta = mem_delta = None
+        if base:
+            time_delta = result['median_s'] / base['median_s'] - 1 if base['median_s'] else 0.0
+            mem_delta = result['peak_mb'] / base['peak_mb'] - 1 if base['peak_mb'] else 0.0
+        flags = []
+        if (time_delta is not None and time_delta > args.threshold
+                and (result['median_s'] - base['median_s']) * 1000 > args.min_slowdown_ms):
+            flags.append('SLOWER')
+        if (mem_delta is not None and mem_delta > args.memory_threshold
+                and result['peak_mb'] - base['peak_mb'] > args.min_growth_mb):
+            flags.append('BIGGER')
+        if flags:
+            regressions.append(f"{label}/{stage}")
+
+        def fmt(value, spec):
+            return format(value, spec) if value is not None else '-'
+
+        print(f"  {stage:<11} {result['median_s']:>9.4f} {fmt(base and base['median_s'], '>9.4f'):>9} "
+              f"{fmt(time_delta, '>+8.1%'):>8} {result['peak_mb']:>9.2f} {fmt(base and base['peak_mb'], '>9.2f'):>9} "
+              f"{fmt(mem_delta, '>+8.1%'):>8}  {' '.join(flags)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time config generation stages and check them against a baseline.")
+    parser.add_argument('--scales', default='50x55,500x200',
+                        help="Comma-separated CUSTOMERSxCHAINS fleet sizes (default: 50x55,500x200)")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"Comma-separated stages to time (default: {','.join(STAGES)})")
+    parser.add_argument('--rounds', type=int, default=5, help="Timed runs per stage; the median counts (default: 5)")
+    parser.add_argument('--baseline', help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', metavar='PATH',
+                        help="Write (or update) a baseline JSON with these results")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed median time increase over the baseline, as a fraction (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--memory-threshold', type=float, default=DEFAULT_MEMORY_THRESHOLD,
+                        help="Allowed peak memory increase over the baseline, as a fraction "
+                             f"(default: {DEFAULT_MEMORY_THRESHOLD})")
+    parser.add_argument('--min-slowdown-ms', type=float, default=DEFAULT_MIN_SLOWDOWN_MS,
+                        help=f"Ignore slowdowns smaller than this many milliseconds (default: {DEFAULT_MIN_SLOWDOWN_MS:g})")
+    parser.add_argument('--min-growth-mb', type=float, default=DEFAULT_MIN_GROWTH_MB,
+                        help=f"Ignore peak memory growth smaller than this many MB (default: {DEFAULT_MIN_GROWTH_MB:g})")
+    parser.add_argument('--workdir', help="Directory for the fleets (default: a temporary directory, removed after)")
+    args = parser.parse_args()
+
+    try:
+        scales = [parse_scale(scale) for scale in args.scales.split(',') if scale.strip()]
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    baseline = {}
+    if args.baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)['scales']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error: could not read baseline {args.baseline}: {e}")
+            sys.exit(2)
+
+    root = args.workdir or tempfile.mkdtemp(prefix='pokt-regress-')
+    results = {}
+    regressions = []
+    try:
+        for customers, chains in scales:
+            label, results[label] = run_scale(customers, chains, stages, args.rounds, root)
+            regressions += compare(label, results[label], baseline, args)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    if args.save_baseline:
+        saved = {}
+        if os.path.exists(args.save_baseline):
+            with open(args.save_baseline) as f:
+                saved = json.load(f).get('scales', {})
+        for label, stage_results in results.items():
+            saved.setdefault(label, {}).update(stage_results)
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'python': platform.python_version(), 'platform': platform.platform(), 'scales': saved},
+                      f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if regressions:
+        print(f"\nRegressed past the threshold: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
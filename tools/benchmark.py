@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput benchmark over synthetic fleets.
+
+For each fleet size, writes a synthetic operator list, wallet CSV and
+allocation sheet, starts tools/mock_pokt_api.py in-process, puts
+tools/fake_pocketd first on PATH, and runs the pipeline stages as the real
+scripts (non-interactively, via their flags):
+
+    generate  generate_supplier_config.py against the mock API
+    override  override_customer_services_config_files.py on the generated configs
+    stake     stake_operator_wallet.py through the fake pocketd
+    fund      fund_operator_wallets.py through the fake pocketd
+
+Each stage records wall time, items per second, API requests or pocketd
+calls per second, and the stage process's peak RSS. Results are printed as
+a table and written to --output as JSON.
+
+    python tools/benchmark.py --sizes 100,1000 --stages generate,override
+    python tools/benchmark.py --sizes 1000 --stage-args "fund=--batch-size 50" --pocketd-latency-ms 100
+"""
+
+import argparse
+import json
+import os
+import platform
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import fleet
+from mock_pokt_api import start_mock_server
+
+REPO_ROOT = fleet.REPO_ROOT
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+FAKE_POCKETD_DIR = os.path.join(TOOLS_DIR, 'fake_pocketd')
+
+STAGES = ('generate', 'override', 'stake', 'fund')
+
+OVERRIDE_SERVICES = {
+    'services': [
+        {'service_id': 'eth', 'endpoints': [{'publicly_exposed_url': 'https://relayminer.bench.example.com',
+                                             'rpc_type': 'JSON_RPC'}]},
+        {'service_id': 'base', 'endpoints': [{'publicly_exposed_url': 'https://relayminer.bench.example.com',
+                                              'rpc_type': 'JSON_RPC'}]},
+    ],
+}
+
+
+def stage_command(stage, workdir):
+    """The script invocation for a stage, run from `workdir`."""
+    script = {
+        'generate': 'generate_supplier_config.py',
+        'override': 'override_customer_services_config_files.py',
+        'stake': 'stake_operator_wallet.py',
+        'fund': 'fund_operator_wallets.py',
+    }[stage]
+    args = {
+        'generate': ['--no-cache', '--operators-csv', 'operators.csv', '--allocation-csv', 'NodeAllocation.csv',
+                     '--revshare-pct', '60', '--output-dir', 'output'],
+        'override': ['--config-folder', 'output', '--override-file', 'override.yml'],
+        'stake': ['--wallets-csv', 'wallets.csv', '--stake-amount', '60000'],
+        'fund': ['--wallets-csv', 'wallets.csv', '--amount', '10'],
+    }[stage]
+    return [sys.executable, os.path.join(REPO_ROOT, script), '--yes'] + args
+
+
+def run_stage(command, cwd, env, log_path):
+    """Run a stage to completion; returns (exit code, wall seconds, peak RSS in MB)."""
+    with open(log_path, 'w') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=cwd, env=env, stdin=subprocess.DEVNULL,
+                                   stdout=log, stderr=subprocess.STDOUT)
+        # wait4 reports the resource usage of this child alone
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    peak_mb = usage.ru_maxrss / (1024 * 1024 if platform.system() == 'Darwin' else 1024)
+    return process.returncode, elapsed, peak_mb
+
+
+def count_lines(path):
+    try:
+        with open(path) as f:
+            return sum(1 for _ in f)
+    except FileNotFoundError:
+        return 0
+
+
+def prepare_fleet(workdir, size, chains):
+    fleet.write_fleet(workdir, size, chains)
+    shutil.copy(os.path.join(REPO_ROOT, 'sample.yml'), workdir)
+    with open(os.path.join(workdir, 'override.yml'), 'w') as f:
+        json.dump(OVERRIDE_SERVICES, f)
+
+
+def benchmark_size(size, args, root):
+    workdir = os.path.join(root, f"fleet-{size}")
+    prepare_fleet(workdir, size, args.chains)
+
+    server = start_mock_server(fleet_size=size, latency_ms=args.api_latency_ms, jitter_ms=args.api_jitter_ms,
+                               error_rate=args.api_error_rate, seed=0)
+    pocketd_log = os.path.join(workdir, 'pocketd-calls.log')
+    env = dict(os.environ,
+               NETWORK='beta',
+               POKT_API_URL=server.url,
+               PATH=FAKE_POCKETD_DIR + os.pathsep + os.environ.get('PATH', ''),
+               FAKE_POCKETD_HOME=os.path.join(workdir, '.fake-pocketd'),
+               FAKE_POCKETD_LOG=pocketd_log,
+               FAKE_POCKETD_LATENCY_MS=str(args.pocketd_latency_ms),
+               FAKE_POCKETD_ERROR_RATE=str(args.pocketd_error_rate),
+               PYTHONUNBUFFERED='1')
+
+    results = []
+    try:
+        for stage in args.stages:
+            command = stage_command(stage, workdir) + shlex.split(args.stage_args.get(stage, ''))
+            api_before, calls_before = server.stats['requests'], count_lines(pocketd_log)
+            code, elapsed, peak_mb = run_stage(command, workdir, env, os.path.join(workdir, f"{stage}.log"))
+            api_requests = server.stats['requests'] - api_before
+            pocketd_calls = count_lines(pocketd_log) - calls_before
+            requests = api_requests if stage == 'generate' else pocketd_calls
+            result = {
+                'size': size,
+                'stage': stage,
+                'exit_code': code,
+                'wall_s': round(elapsed, 3),
+                'items_per_s': round(size / elapsed, 1) if elapsed else None,
+                'api_requests': api_requests,
+                'pocketd_calls': pocketd_calls,
+                'requests_per_s': round(requests / elapsed, 1) if elapsed else None,
+                'peak_rss_mb': round(peak_mb, 1),
+            }
+            results.append(result)
+            status = '' if code == 0 else f"  (exit {code}, see {os.path.join(workdir, stage + '.log')})"
+            print(f"{size:>7} {stage:<9} {result['wall_s']:>9.2f} {result['items_per_s']:>10} "
+                  f"{result['requests_per_s']:>10} {result['peak_rss_mb']:>9}{status}")
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def parse_stage_args(values):
+    stage_args = {}
+    for value in values:
+        stage, _, extra = value.partition('=')
+        if stage not in STAGES:
+            raise argparse.ArgumentTypeError(f"unknown stage '{stage}' in --stage-args")
+        stage_args[stage] = extra
+    return stage_args
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline scripts against a mock API and fake pocketd.")
+    parser.add_argument('--sizes', default='100,1000,10000',
+                        help="Comma-separated fleet sizes (operators) to run (default: 100,1000,10000)")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"Comma-separated stages to run, in order (default: {','.join(STAGES)})")
+    parser.add_argument('--chains', type=int, default=55, help="Chain rows in the allocation sheet (default: 55)")
+    parser.add_argument('--api-latency-ms', type=float, default=20.0,
+                        help="Mock API latency per request (default: 20)")
+    parser.add_argument('--api-jitter-ms', type=float, default=0.0, help="Mock API latency jitter (default: 0)")
+    parser.add_argument('--api-error-rate', type=float, default=0.0,
+                        help="Fraction of mock API requests answered with 503 (default: 0)")
+    parser.add_argument('--pocketd-latency-ms', type=float, default=50.0,
+                        help="Fake pocketd latency per tx command (default: 50)")
+    parser.add_argument('--pocketd-error-rate', type=float, default=0.0,
+                        help="Fraction of fake pocketd tx commands that fail (default: 0)")
+    parser.add_argument('--stage-args', action='append', default=[], metavar='STAGE=ARGS',
+                        help="Extra flags for one stage's script, e.g. \"fund=--batch-size 50\" (repeatable)")
+    parser.add_argument('--workdir', help="Directory for fleets and logs (default: a temporary directory)")
+    parser.add_argument('--keep', action='store_true', help="Keep the temporary working directory")
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help="JSON results file (default: benchmark_results.json)")
+    args = parser.parse_args()
+    args.stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    try:
+        args.stage_args = parse_stage_args(args.stage_args)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    root = args.workdir or tempfile.mkdtemp(prefix='pokt-bench-')
+    print(f"Working directory: {root}\n")
+    print(f"{'size':>7} {'stage':<9} {'wall_s':>9} {'items/s':>10} {'req/s':>10} {'rss_mb':>9}")
+    results = []
+    try:
+        for size in sizes:
+            results.extend(benchmark_size(size, args, root))
+    finally:
+        if not args.workdir and not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': {key: getattr(args, key) for key in ('chains', 'api_latency_ms', 'api_jitter_ms',
+                                                           'api_error_rate', 'pocketd_latency_ms',
+                                                           'pocketd_error_rate', 'stage_args')},
+            'results': results,
+        }, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    if any(result['exit_code'] != 0 for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
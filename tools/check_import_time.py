@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Check that each CLI entry point imports within its startup budget.
+
+Runs `python -X importtime -c "import <module>"` for every entry point (best of
+--repeat runs, to smooth out disk-cache noise), compares the module's
+cumulative import time against its budget and lists the heaviest imports of
+any module that goes over. Exits non-zero if a budget is exceeded.
+
+    python tools/check_import_time.py                 # all entry points
+    python tools/check_import_time.py generate_supplier_config --repeat 5
+    python tools/check_import_time.py --scale 2       # slower machine: double every budget
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Startup budget per entry point, in milliseconds of cumulative import time
+BUDGETS_MS = {
+    'generate_supplier_config': 200,
+    'override_customer_services_config_files': 60,
+    'stake_from_supplier_config': 100,
+    'stake_operator_wallet': 100,
+    'fund_operator_wallets': 100,
+    'import_operator_to_keyring': 80,
+    'create_accounts': 200,
+    'extract_accounts_to_csv': 30,
+}
+
+
+def measure_import(module):
+    """Import `module` in a fresh interpreter.
+
+    Returns (cumulative microseconds, [(microseconds, name)] for each direct
+    dependency the module pulled in).
+    """
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                             cwd=REPO_ROOT, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1] if process.stderr.strip() else
+                           f"import exited with code {process.returncode}")
+    children = []
+    for line in process.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package (indented by nesting depth)
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        if depth == 1:
+            children.append((int(cumulative), name.strip()))
+        elif depth == 0:
+            # Children are printed before their parent
+            if name.strip() == module:
+                return int(cumulative), children
+            children = []
+    raise RuntimeError(f"no import time reported for {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check CLI entry point import times against their budgets.")
+    parser.add_argument('modules', nargs='*', default=list(BUDGETS_MS),
+                        help="Entry point modules to check (default: all)")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="Import each module this many times and keep the fastest run (default: 3)")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Multiply every budget by this factor, e.g. on slow CI machines (default: 1)")
+    args = parser.parse_args()
+
+    over_budget = []
+    for module in args.modules:
+        budget_ms = BUDGETS_MS.get(module, max(BUDGETS_MS.values())) * args.scale
+        try:
+            elapsed_us, dependencies = min(measure_import(module) for _ in range(max(1, args.repeat)))
+        except RuntimeError as e:
+            print(f"FAIL  {module}: import failed: {e}")
+            over_budget.append(module)
+            continue
+        elapsed_ms = elapsed_us / 1000
+        status = 'ok  ' if elapsed_ms <= budget_ms else 'FAIL'
+        print(f"{status}  {module}: {elapsed_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+        if elapsed_ms > budget_ms:
+            over_budget.append(module)
+            for us, name in sorted(dependencies, reverse=True)[:5]:
+                print(f"        {name}: {us / 1000:.1f} ms")
+
+    if over_budget:
+        print(f"\n{len(over_budget)} entry point(s) over their import budget: {', '.join(over_budget)}")
+        sys.exit(1)
+    print("\nAll entry points within their import budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic fleet data for the local benchmark tools.
+
+Addresses, supplier records and input CSVs are derived from indexes (or from
+the operator address itself) so the mock API, the fake pocketd and the
+benchmark harness agree on the same fleet without sharing any state.
+
+Run it directly to write a fleet's input files at any scale:
+
+    python tools/fleet.py --customers 500 --chains 200 --output-dir fleet-500x200
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import random
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAPPING_CSV = os.path.join(REPO_ROOT, 'morse_to_shannon_service_mapping.csv')
+
+# bech32 data characters, so synthetic addresses look like real pokt1... addresses
+_BECH32_CHARSET = 'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
+
+# Operators are spread over this many owner wallets, like a real fleet where
+# one owner funds and stakes many operators (and multi-send batches have work to do)
+OWNER_WALLETS = 10
+
+
+def synthetic_address(seed: str) -> str:
+    """Return a stable pokt1-prefixed address for `seed`."""
+    digest = hashlib.sha256(seed.encode('utf-8')).digest()
+    return 'pokt1' + ''.join(_BECH32_CHARSET[b % 32] for b in digest[:38])
+
+
+def operator_address(index: int) -> str:
+    return synthetic_address(f"operator:{index}")
+
+
+def owner_address(operator: str) -> str:
+    bucket = int.from_bytes(hashlib.sha256(operator.encode('utf-8')).digest()[:4], 'big') % OWNER_WALLETS
+    return synthetic_address(f"owner:{bucket}")
+
+
+def supplier_record(operator: str, services: int = 2) -> Dict:
+    """Return an on-chain supplier record for `operator`, shaped like the REST API's `supplier` object."""
+    owner = owner_address(operator)
+    revshare = synthetic_address(f"revshare:{operator}")
+    service_ids = ['eth', 'base', 'arb_one', 'poly', 'bsc', 'op', 'avax', 'solana']
+    return {
+        'owner_address': owner,
+        'operator_address': operator,
+        'stake': {'denom': 'upokt', 'amount': '60000000000'},
+        'services': [
+            {
+                'service_id': service_ids[i % len(service_ids)],
+                'endpoints': [{
+                    'url': f"https://relayminer.{operator[-8:]}.example.com",
+                    'rpc_type': 'JSON_RPC',
+                    'configs': [],
+                }],
+                'rev_share': [
+                    {'address': owner, 'rev_share_percentage': '40'},
+                    {'address': revshare, 'rev_share_percentage': '59'},
+                    {'address': operator, 'rev_share_percentage': '1'},
+                ],
+            }
+            for i in range(services)
+        ],
+        'unstake_session_end_height': '0',
+        'services_activation_heights_map': {},
+    }
+
+
+def write_operators_csv(path: str, operators: int) -> None:
+    """CSV with an operator_address column (generate_supplier_config.py input)."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['operator_address'])
+        for i in range(operators):
+            writer.writerow([operator_address(i)])
+
+
+def write_wallets_csv(path: str, operators: int) -> None:
+    """Wallet CSV in the create_accounts.py layout (stake_operator_wallet.py / fund_operator_wallets.py input)."""
+    fieldnames = ['customer_id', 'operator_address', 'mnemonic', 'owner_address', 'revshare_address',
+                  'publicly_exposed_url', 'stake_amount']
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for i in range(operators):
+            operator = operator_address(i)
+            writer.writerow({
+                'customer_id': f"customer_{i + 1}",
+                'operator_address': operator,
+                'mnemonic': '',
+                'owner_address': owner_address(operator),
+                'revshare_address': synthetic_address(f"revshare:{operator}"),
+                'publicly_exposed_url': f"https://relayminer.{operator[-8:]}.example.com",
+                'stake_amount': '',
+            })
+
+
+def fleet_chains(chains: int) -> List[Tuple[str, str]]:
+    """(Morse chain ID, Shannon service ID) pairs: the repo's real mapping first, then synthetic chains.
+
+    Synthetic chain IDs are 4 hex digits like the real ones, so the allocation
+    sheet's 'Name (F003)' pattern still matches them.
+    """
+    with open(MAPPING_CSV, 'r', newline='') as f:
+        pairs = [(row['Morse_Chain_Id'], row['Shannon_Service_id']) for row in csv.DictReader(f)][:chains]
+    taken = {chain_id for chain_id, _ in pairs}
+    candidate = 0
+    while len(pairs) < chains:
+        chain_id = f"{candidate:04X}"
+        candidate += 1
+        if chain_id not in taken:
+            pairs.append((chain_id, f"synthetic_{chain_id.lower()}"))
+    return pairs
+
+
+def write_mapping_csv(path: str, pairs: List[Tuple[str, str]]) -> None:
+    """Service mapping CSV in the morse_to_shannon_service_mapping.csv layout."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Morse_Chain_Id', 'Shannon_Service_id'])
+        writer.writerows(pairs)
+
+
+def write_supplier_payloads(path: str, operators: int, services: int = 2) -> None:
+    """Every operator's supplier record as one listing response ({"supplier": [...], "pagination": ...})."""
+    with open(path, 'w') as f:
+        json.dump({
+            'supplier': [supplier_record(operator_address(i), services) for i in range(operators)],
+            'pagination': {'next_key': None, 'total': str(operators)},
+        }, f)
+
+
+def write_allocation_csv(path: str, customers: int, chain_ids: List[str],
+                         chains_per_customer: int = 5, seed: int = 0) -> None:
+    """Node allocation sheet in PNF's layout: one row per chain, one numbered column per customer.
+
+    Like the real sheet it ends with a Total column and a totals row, both
+    of which generate_supplier_config.py drops.
+    """
+    rng = random.Random(seed)
+    grid = [[0] * customers for _ in chain_ids]
+    for customer in range(customers):
+        for row in rng.sample(range(len(chain_ids)), min(chains_per_customer, len(chain_ids))):
+            grid[row][customer] = rng.randint(1, 8)
+
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Chains', 'Node Type', 'StakeNodes'] + [str(c + 1) for c in range(customers)] + ['Total'])
+        for row, chain_id in enumerate(chain_ids):
+            stake_nodes = sum(grid[row])
+            node_type = 'HTC' if row % 3 else 'LTailC'
+            writer.writerow([f"Chain {row} ({chain_id})", node_type, stake_nodes]
+                            + [v or '' for v in grid[row]] + [stake_nodes])
+        column_totals = [sum(grid[row][c] for row in range(len(chain_ids))) for c in range(customers)]
+        writer.writerow(['', '', sum(column_totals)] + column_totals + [sum(column_totals)])
+
+
+def write_fleet(directory: str, customers: int, chains: int, chains_per_customer: int = 5,
+                services: int = 2, seed: int = 0) -> Dict[str, str]:
+    """Write a complete synthetic fleet into `directory`; returns the paths by role.
+
+    Files: operators.csv, wallets.csv, NodeAllocation.csv,
+    morse_to_shannon_service_mapping.csv and suppliers.json.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {
+        'operators': os.path.join(directory, 'operators.csv'),
+        'wallets': os.path.join(directory, 'wallets.csv'),
+        'allocation': os.path.join(directory, 'NodeAllocation.csv'),
+        'mapping': os.path.join(directory, 'morse_to_shannon_service_mapping.csv'),
+        'suppliers': os.path.join(directory, 'suppliers.json'),
+    }
+    pairs = fleet_chains(chains)
+    write_operators_csv(paths['operators'], customers)
+    write_wallets_csv(paths['wallets'], customers)
+    write_allocation_csv(paths['allocation'], customers, [chain_id for chain_id, _ in pairs],
+                         chains_per_customer, seed)
+    write_mapping_csv(paths['mapping'], pairs)
+    write_supplier_payloads(paths['suppliers'], customers, services)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic fleet input files at a given scale.")
+    parser.add_argument('--customers', type=int, default=500,
+                        help="Customer columns / operators (default: 500)")
+    parser.add_argument('--chains', type=int, default=200, help="Chain rows in the allocation sheet (default: 200)")
+    parser.add_argument('--chains-per-customer', type=int, default=5,
+                        help="Chains allocated to each customer (default: 5)")
+    parser.add_argument('--services', type=int, default=2,
+                        help="Existing on-chain services per supplier record (default: 2)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the allocation sheet (default: 0)")
+    parser.add_argument('--output-dir', default='fleet', help="Directory to write into (default: fleet)")
+    args = parser.parse_args()
+
+    paths = write_fleet(args.output_dir, args.customers, args.chains, args.chains_per_customer,
+                        args.services, args.seed)
+    for role, path in paths.items():
+        print(f"{role:<11} {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the poktroll REST API, for benchmarks and offline runs.
+
+Serves synthetic supplier records (see fleet.supplier_record) shaped like the
+real gateway's responses:
+
+    GET /pokt-network/poktroll/supplier/supplier/{operator_address}
+    GET /pokt-network/poktroll/supplier/supplier?pagination.limit=N&pagination.key=K
+    GET /cosmos/auth/v1beta1/accounts/{address}
+    POST /cosmos/tx/v1beta1/simulate   gas_used grows with the tx size
+    POST /cosmos/tx/v1beta1/txs        accepts any tx (code 0) and keeps its bytes in .broadcasts
+
+with configurable latency and failure injection. The two tx endpoints let the
+in-process cosmpy backend run against it (TX_NODE_URL=rest+http://host:port). Point the scripts at it with
+POKT_API_URL:
+
+    python tools/mock_pokt_api.py --port 1317 --latency-ms 50 --error-rate 0.05 &
+    POKT_API_URL=http://127.0.0.1:1317 python generate_supplier_config.py ...
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from fleet import operator_address, supplier_record
+
+SUPPLIER_PATH = '/pokt-network/poktroll/supplier/supplier'
+ACCOUNT_PATH = '/cosmos/auth/v1beta1/accounts/'
+SIMULATE_PATH = '/cosmos/tx/v1beta1/simulate'
+BROADCAST_PATH = '/cosmos/tx/v1beta1/txs'
+
+# Simulated gas: a fixed base plus a per-byte cost, so multi-message txs cost more
+SIMULATED_GAS_BASE = 50000
+SIMULATED_GAS_PER_BYTE = 20
+
+
+class MockPoktApi(ThreadingHTTPServer):
+    """Threaded HTTP server holding the mock's configuration and request counters."""
+
+    daemon_threads = True
+
+    def __init__(self, address, fleet_size=1000, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 throttle_rate=0.0, seed=None):
+        super().__init__(address, MockPoktApiHandler)
+        self.fleet_size = fleet_size
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'throttled': 0}
+        # Raw bytes of every broadcast tx, in arrival order
+        self.broadcasts = []
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def draw(self):
+        """Random draws for one request: (jitter, failure, throttle)."""
+        with self.lock:
+            return self.rng.random(), self.rng.random(), self.rng.random()
+
+
+class MockPoktApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _admit(self):
+        """Apply latency and failure injection; returns False once an error response has been sent."""
+        server = self.server
+        server.count('requests')
+        jitter, fail, throttle = server.draw()
+        delay = server.latency_ms + jitter * server.jitter_ms
+        if delay:
+            time.sleep(delay / 1000)
+
+        if fail < server.error_rate:
+            server.count('errors')
+            self._send_json(503, {'code': 14, 'message': 'mock: service unavailable'})
+            return False
+        if throttle < server.throttle_rate:
+            server.count('throttled')
+            self._send_json(429, {'code': 8, 'message': 'mock: rate limited'}, {'Retry-After': '1'})
+            return False
+        return True
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if not self._admit():
+            return
+        path = urlparse(self.path).path
+        try:
+            # Field names may come in proto (tx_bytes) or JSON (txBytes) form
+            request = json.loads(body or b'{}')
+            tx_bytes = base64.b64decode(request.get('tx_bytes') or request.get('txBytes') or '')
+        except ValueError as e:
+            return self._send_json(400, {'code': 3, 'message': f"mock: bad request: {e}"})
+        if not tx_bytes:
+            return self._send_json(400, {'code': 3, 'message': 'mock: tx_bytes is required'})
+        if path == SIMULATE_PATH:
+            gas_used = SIMULATED_GAS_BASE + SIMULATED_GAS_PER_BYTE * len(tx_bytes)
+            return self._send_json(200, {'gas_info': {'gas_wanted': '0', 'gas_used': str(gas_used)}})
+        if path == BROADCAST_PATH:
+            with self.server.lock:
+                self.server.broadcasts.append(tx_bytes)
+            return self._send_json(200, {'tx_response': {
+                'txhash': hashlib.sha256(tx_bytes).hexdigest().upper(),
+                'height': '0',
+                'code': 0,
+                'raw_log': '',
+            }})
+        return self._send_json(501, {'code': 12, 'message': f"mock: {path} not implemented"})
+
+    def do_GET(self):
+        if not self._admit():
+            return
+
+        url = urlparse(self.path)
+        if url.path == SUPPLIER_PATH:
+            return self._list_suppliers(parse_qs(url.query))
+        if url.path.startswith(SUPPLIER_PATH + '/'):
+            address = url.path[len(SUPPLIER_PATH) + 1:]
+            if not address.startswith('pokt1'):
+                return self._send_json(404, {'code': 5, 'message': f"supplier {address} not found"})
+            return self._send_json(200, {'supplier': supplier_record(address)})
+        if url.path.startswith(ACCOUNT_PATH):
+            address = url.path[len(ACCOUNT_PATH):]
+            return self._send_json(200, {'account': {
+                '@type': '/cosmos.auth.v1beta1.BaseAccount',
+                'address': address,
+                'pub_key': None,
+                'account_number': str(int.from_bytes(address.encode('utf-8')[-4:], 'big') % 1000000),
+                'sequence': '0',
+            }})
+        return self._send_json(501, {'code': 12, 'message': f"mock: {url.path} not implemented"})
+
+    def _list_suppliers(self, query):
+        limit = int(query.get('pagination.limit', ['100'])[0])
+        key = query.get('pagination.key', [''])[0]
+        offset = int(base64.b64decode(key).decode('utf-8')) if key else 0
+        end = min(offset + limit, self.server.fleet_size)
+        next_key = base64.b64encode(str(end).encode('utf-8')).decode('ascii') if end < self.server.fleet_size else None
+        self._send_json(200, {
+            'supplier': [supplier_record(operator_address(i)) for i in range(offset, end)],
+            'pagination': {'next_key': next_key, 'total': str(self.server.fleet_size)},
+        })
+
+
+def start_mock_server(port=0, **config):
+    """Start the mock API on a background thread; returns the server (see .url, .stats, .shutdown())."""
+    server = MockPoktApi(('127.0.0.1', port), **config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock poktroll REST API with synthetic suppliers.")
+    parser.add_argument('--port', type=int, default=1317, help="Port to listen on (default: 1317)")
+    parser.add_argument('--fleet-size', type=int, default=1000,
+                        help="Number of suppliers in the paginated listing (default: 1000)")
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="Added latency per request (default: 0)")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Extra random latency up to this value (default: 0)")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="Fraction of requests answered with 503 (default: 0)")
+    parser.add_argument('--throttle-rate', type=float, default=0.0,
+                        help="Fraction of requests answered with 429 and Retry-After: 1 (default: 0)")
+    parser.add_argument('--seed', type=int, help="Random seed for latency jitter and failure injection")
+    args = parser.parse_args()
+
+    server = MockPoktApi(('127.0.0.1', args.port), fleet_size=args.fleet_size, latency_ms=args.latency_ms,
+                         jitter_ms=args.jitter_ms, error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                         seed=args.seed)
+    print(f"Mock poktroll API listening on {server.url} (export POKT_API_URL={server.url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Served: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+In-process transaction signing and broadcasting with cosmpy.
+
+An alternative to forking `pocketd` for every transaction: keys are loaded
+once from a CSV of mnemonics or private keys, a single LedgerClient keeps one
+pooled gRPC (or REST) channel open, account sequences are handed out by a
+SequenceAllocator so several txs per signer can be in flight, and
+transactions are simulated, signed and broadcast without any subprocess.
+
+Configuration (environment):
+    TX_NODE_URL  cosmpy-style node URL, e.g. grpc+https://host:443 or
+                 rest+http://127.0.0.1:1317 for a local mock node
+                 (default: derived from RPC_ENDPOINT, then the network's grove gRPC host)
+    CHAIN_ID     chain id (default: pocket-alpha / pocket-beta / pocket for alpha / beta / main)
+"""
+
+import csv
+import math
+import os
+from typing import Any, Dict, List
+from urllib.parse import urlparse
+
+from cosmpy.aerial.client import Account, LedgerClient, NetworkConfig
+from cosmpy.aerial.tx import SigningCfg, Transaction, TxFee
+from cosmpy.aerial.wallet import LocalWallet
+from cosmpy.crypto.keypairs import PrivateKey
+from cosmpy.protos.cosmos.bank.v1beta1.bank_pb2 import Input, Output
+from cosmpy.protos.cosmos.bank.v1beta1.tx_pb2 import MsgMultiSend, MsgSend
+from cosmpy.protos.cosmos.base.v1beta1.coin_pb2 import Coin
+from cosmpy.protos.cosmos.tx.v1beta1.service_pb2 import SimulateRequest
+
+import metrics
+from pocket_protos import stake_supplier_msg
+from sequence_manager import SequenceAllocator, submit_ordered
+
+CHAIN_IDS = {'alpha': 'pocket-alpha', 'beta': 'pocket-beta', 'main': 'pocket'}
+DENOM = 'upokt'
+
+# CSV columns holding key material, and the address column each one belongs to
+KEY_COLUMNS = (
+    ('mnemonic', 'operator_address'),
+    ('owner_address_mnemonic', 'owner_address'),
+    ('shannon_private_key', 'shannon_address'),
+)
+
+
+def node_url(network: str) -> str:
+    """Return the cosmpy node URL for a network (see TX_NODE_URL / RPC_ENDPOINT)."""
+    if os.getenv('TX_NODE_URL'):
+        return os.getenv('TX_NODE_URL')
+    endpoint = os.getenv('RPC_ENDPOINT') or f"https://shannon-testnet-grove-grpc.{network}.poktroll.com"
+    parsed = urlparse(endpoint)
+    scheme = 'grpc+https' if parsed.scheme == 'https' else 'grpc+http'
+    port = parsed.port or (443 if parsed.scheme == 'https' else 9090)
+    return f"{scheme}://{parsed.hostname}:{port}"
+
+
+def network_config(network: str) -> NetworkConfig:
+    return NetworkConfig(
+        chain_id=os.getenv('CHAIN_ID') or CHAIN_IDS.get(network, network),
+        url=node_url(network),
+        fee_minimum_gas_price=1,
+        fee_denomination=DENOM,
+        staking_denomination=DENOM,
+    )
+
+
+def load_wallets(csv_file: str) -> Dict[str, LocalWallet]:
+    """Load every key found in a CSV (mnemonic, owner_address_mnemonic, shannon_private_key columns)."""
+    wallets = {}
+    with open(csv_file, 'r') as f:
+        for row in csv.DictReader(f):
+            for key_column, address_column in KEY_COLUMNS:
+                secret = (row.get(key_column) or '').strip()
+                if not secret:
+                    continue
+                if key_column == 'shannon_private_key':
+                    wallet = LocalWallet(PrivateKey(bytes.fromhex(secret)), prefix='pokt')
+                else:
+                    wallet = LocalWallet.from_mnemonic(secret, prefix='pokt')
+                address = str(wallet.address())
+                if row.get(address_column) and row[address_column] != address:
+                    print(f"Warning: {key_column} in {csv_file} derives {address}, not {row[address_column]}")
+                wallets[address] = wallet
+    return wallets
+
+
+class CosmpyBackend:
+    """Sign and broadcast transactions in-process for the signers in `wallets`."""
+
+    def __init__(self, network: str, wallets: Dict[str, LocalWallet], gas_adjustment: float = 1.5):
+        self.client = LedgerClient(network_config(network))
+        self.wallets = wallets
+        self.gas_adjustment = gas_adjustment
+        self.sequences = SequenceAllocator(self._query_account)
+
+    def _wallet(self, address: str) -> LocalWallet:
+        if address not in self.wallets:
+            raise KeyError(f"No key loaded for {address}")
+        return self.wallets[address]
+
+    def _query_account(self, address: str):
+        account = self.client.query_account(self._wallet(address).address())
+        return account.number, account.sequence
+
+    def _seal_and_sign(self, tx: Transaction, wallet: LocalWallet, account: Account, fee: TxFee) -> None:
+        tx.seal(SigningCfg.direct(wallet.public_key(), account.sequence), fee=fee)
+        tx.sign(wallet.signer(), self.client.network_config.chain_id, account.number)
+        tx.complete()
+
+    def _simulate_gas(self, tx: Transaction) -> int:
+        """Gas used by a signed tx as the node reports it, without any multiplier."""
+        # Sent as tx_bytes: a REST node would otherwise need the poktroll message types to JSON-encode the tx
+        response = self.client.txs.Simulate(SimulateRequest(tx_bytes=tx.tx.SerializeToString()))
+        return int(response.gas_info.gas_used)
+
+    def _submit(self, signer: str, msgs: List[Any], lease) -> str:
+        wallet = self._wallet(signer)
+        account = Account(address=wallet.address(), number=lease.account_number, sequence=lease.sequence)
+
+        tx = Transaction()
+        for msg in msgs:
+            tx.add_message(msg)
+        # Simulate with a zero fee, then re-seal the same tx with the real one. Only
+        # gas_adjustment is applied: cosmpy's simulate_tx would add its own 1.65x on top.
+        self._seal_and_sign(tx, wallet, account, TxFee([], 0))
+        with metrics.timer('tx_simulate', backend='cosmpy'):
+            gas_limit = math.ceil(self._simulate_gas(tx) * self.gas_adjustment)
+        self._seal_and_sign(tx, wallet, account,
+                            TxFee(amount=self.client.estimate_fee_from_gas(gas_limit), gas_limit=gas_limit))
+        with metrics.timer('tx_broadcast', backend='cosmpy'):
+            return self.client.broadcast_tx(tx).tx_hash
+
+    def broadcast(self, signer: str, msgs: List[Any]) -> Dict[str, Any]:
+        """Simulate, sign and broadcast `msgs` from `signer` as one tx.
+
+        Returns a result dict with the success flag, tx hash and error
+        message. Sequences come from the allocator, which resyncs and retries
+        on an account sequence mismatch.
+        """
+        def submit(lease):
+            try:
+                return {'success': True, 'tx_hash': self._submit(signer, msgs, lease), 'error': None}
+            except Exception as e:
+                return {'success': False, 'tx_hash': None, 'error': str(e)}
+
+        return submit_ordered(self.sequences, signer, submit)
+
+    def send(self, from_address: str, to_addresses: List[str], amount_upokt: int) -> Dict[str, Any]:
+        """Send `amount_upokt` to each recipient (MsgSend for one, MsgMultiSend for several)."""
+        coins = [Coin(denom=DENOM, amount=str(amount_upokt))]
+        if len(to_addresses) == 1:
+            msg = MsgSend(from_address=from_address, to_address=to_addresses[0], amount=coins)
+        else:
+            total = [Coin(denom=DENOM, amount=str(amount_upokt * len(to_addresses)))]
+            msg = MsgMultiSend(
+                inputs=[Input(address=from_address, coins=total)],
+                outputs=[Output(address=to_address, coins=coins) for to_address in to_addresses],
+            )
+        return self.broadcast(from_address, [msg])
+
+    def stake_suppliers(self, signer: str, configs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Stake one or more supplier configs (parsed stake YAML) in a single tx signed by `signer`."""
+        return self.broadcast(signer, [stake_supplier_msg(config, signer) for config in configs])
+
+
+def create_backend(network: str, keys_csv: str) -> CosmpyBackend:
+    """Build a CosmpyBackend for `network` with the keys in `keys_csv`."""
+    wallets = load_wallets(keys_csv)
+    print(f"Loaded {len(wallets)} signing keys from {keys_csv}")
+    return CosmpyBackend(network, wallets)
@@ -0,0 +1,101 @@
+"""
+Shared YAML reading and writing for the config scripts.
+
+Uses the libyaml-backed CSafeLoader/CDumper when PyYAML was built with
+libyaml, falling back to the pure-Python classes otherwise. Files are written
+atomically (temp file in the same directory, then rename) so a crash never
+leaves a truncated config behind for the staking scripts to read, and large
+batches are serialized across a process pool.
+"""
+
+import os
+import stat
+import uuid
+from typing import Any, Dict, Iterable, List, Tuple
+
+import yaml
+
+import metrics
+
+try:
+    from yaml import CDumper as Dumper, CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import Dumper, SafeLoader
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_WRITE_THRESHOLD = 64
+
+def load_yaml(stream: Any) -> Any:
+    """Parse YAML from a string or open file (safe loader)."""
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def load_yaml_file(path: str) -> Any:
+    """Read and parse a YAML file (safe loader)."""
+    with metrics.timer('yaml_load'), open(path, 'r', encoding='utf-8') as f:
+        return load_yaml(f)
+
+
+def dump_yaml(data: Any, **kwargs: Any) -> str:
+    """Serialize data in the block style used by every generated config."""
+    kwargs.setdefault('sort_keys', False)
+    kwargs.setdefault('default_flow_style', False)
+    return yaml.dump(data, Dumper=Dumper, **kwargs)
+
+
+def write_atomic(path: str, text: str) -> None:
+    """Write text to path via a temp file and rename, so readers never see a partial file.
+
+    A replaced file keeps its permissions; a new one gets the mode open() would give it.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp_path = os.path.join(directory, f".{os.path.basename(path)}.{uuid.uuid4().hex[:12]}.tmp")
+    # Created with 0o666 like open(), so the process umask applies without being read or changed
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_yaml_file(path: str, data: Any, **kwargs: Any) -> str:
+    """Serialize data and write it atomically to path. Returns the path."""
+    write_atomic(path, dump_yaml(data, **kwargs))
+    return path
+
+
+def _write_item(item: Tuple[str, Any, Dict[str, Any]]) -> str:
+    path, data, kwargs = item
+    return write_yaml_file(path, data, **kwargs)
+
+
+def write_yaml_files(items: Iterable[Tuple[str, Any]], workers: int = None, **kwargs: Any) -> List[str]:
+    """Write many (path, data) pairs atomically, serializing across a process pool.
+
+    `workers` defaults to the YAML_WRITE_WORKERS environment variable, then the
+    CPU count. Small batches (or workers=1) are written in-process. Returns the
+    written paths in input order.
+    """
+    jobs = [(path, data, kwargs) for path, data in items]
+    workers = workers or int(os.getenv('YAML_WRITE_WORKERS', 0)) or os.cpu_count() or 1
+
+    metrics.inc('yaml_files_written', len(jobs))
+    if workers <= 1 or len(jobs) < PARALLEL_WRITE_THRESHOLD:
+        with metrics.timer('yaml_write', mode='in_process'):
+            return [_write_item(job) for job in jobs]
+
+    chunksize = max(1, len(jobs) // (workers * 4))
+    # Imported here: multiprocessing is only needed for large batches
+    from concurrent.futures import ProcessPoolExecutor
+    with metrics.timer('yaml_write', mode='pool'), ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_write_item, jobs, chunksize=chunksize))